@@ -2,8 +2,150 @@
 # Copyright (c) MIT
 # Lucas Zunho <lucaszunho17@gmail.com>
 
-from loveiswar import main
-    
+import argparse
+import json
+import os
+import sys
+
+# Keeps stdout clean for the JSON reports
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from loveiswar import main, settings
+
+def parse_args():
+    """Interpreta as opções de linha de comando do jogo."""
+    parser = argparse.ArgumentParser(description='Love is War - engine no estilo DOOM.')
+    parser.add_argument('--compare-walls', metavar='FRAMES', type=int, nargs='?', const=30,
+                        help='compara o tempo dos renderizadores de paredes e sai')
+    parser.add_argument('--bench', action='store_true',
+                        help='executa o benchmark sem display e imprime o resultado em JSON')
+    parser.add_argument('--bench-frames', metavar='N', type=int, default=300,
+                        help='frames medidos por caminho de câmera (padrão: 300)')
+    parser.add_argument('--bench-sprites', metavar='N', type=int, default=0,
+                        help='espalha N sprites decorativos pelo mapa durante o benchmark')
+    parser.add_argument('--bench-output', metavar='FILE',
+                        help='salva o resultado do benchmark em FILE')
+    parser.add_argument('--bench-baseline', metavar='FILE',
+                        help='falha caso alguma etapa fique mais lenta que no resultado salvo em FILE')
+    parser.add_argument('--bench-tolerance', metavar='RATIO', type=float, default=0.15,
+                        help='aumento relativo permitido da mediana de cada etapa (padrão: 0.15)')
+    parser.add_argument('--ray-scaling', metavar='WORKERS', type=int, nargs='?', const=0,
+                        help='mede o raycasting paralelo com 1 a WORKERS workers e sai')
+    parser.add_argument('--ray-pool', choices=('thread', 'process'), default=settings.RAYCASTING_POOL,
+                        help='pool utilizado por --ray-scaling (padrão: %(default)s)')
+    parser.add_argument('--env-scaling', metavar='WORKERS', type=int, nargs='?', const=0,
+                        help='mede os passos por segundo do ambiente em lote com 1 a WORKERS processos e sai')
+    parser.add_argument('--env-instances', metavar='N', type=int, default=256,
+                        help='instâncias simuladas por --env-scaling (padrão: %(default)s)')
+    parser.add_argument('--headless-sim', metavar='SECONDS', type=float,
+                        help='simula SECONDS de jogo sem display, o mais rápido possível, e sai')
+    parser.add_argument('--headless-render', metavar='TICKS', type=int, default=0,
+                        help='desenha um frame a cada TICKS passos em --headless-sim (padrão: 0, sem desenho)')
+    parser.add_argument('--pipeline', action='store_true', default=settings.PIPELINE,
+                        help='calcula o próximo frame em paralelo ao desenho (ver PIPELINE)')
+    parser.add_argument('--pipeline-compare', metavar='FRAMES', type=int, nargs='?', const=300,
+                        help='compara a vazão e a latência do loop serial e com pipeline e sai')
+    parser.add_argument('--bake-assets', action='store_true',
+                        help='grava o cache de texturas escalonadas (TEXTURE_CACHE_DIR) e sai')
+    parser.add_argument('--pack-atlas', action='store_true',
+                        help='empacota os sprites em atlas (ATLAS_PATH) e sai')
+    parser.add_argument('--map', metavar='FILE',
+                        help='carrega o mapa binário FILE (ver MAP_PATH)')
+    parser.add_argument('--make-map', metavar='FILE',
+                        help='grava o mapa embutido (ou um mapa gerado, com --map-size) em FILE e sai')
+    parser.add_argument('--map-size', metavar=('WIDTH', 'HEIGHT'), type=int, nargs=2,
+                        help='gera um mapa procedural WIDTH x HEIGHT com --make-map')
+    parser.add_argument('--floor', choices=('flat', 'textured'), default=settings.FLOOR_RENDERER,
+                        help='renderizador do chão (padrão: %(default)s, ver FLOOR_RENDERER)')
+    parser.add_argument('--map-seed', metavar='SEED', type=int, default=0,
+                        help='semente do mapa gerado com --map-size (padrão: 0)')
+    return parser.parse_args()
+
+def bench(args):
+    """Executa o benchmark (:py:mod:`loveiswar.bench`) e retorna o código de saída."""
+    from loveiswar import bench
+
+    game = main.Game(headless=True)
+    results = bench.run_benchmark(game, frames=args.bench_frames, sprites=args.bench_sprites)
+    output = json.dumps(results, indent=4)
+    if args.bench_output:
+        with open(args.bench_output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.bench_baseline:
+        with open(args.bench_baseline) as f:
+            regressions = bench.compare(results, json.load(f), args.bench_tolerance)
+        for regression in regressions:
+            print(f'REGRESSÃO: {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.map:
+        settings.MAP_PATH = args.map
+    settings.FLOOR_RENDERER = args.floor
+    settings.PIPELINE = args.pipeline
+    if args.make_map:
+        import numpy as np
+        from loveiswar import map, mapfile
+
+        if args.map_size:
+            mapfile.generate(args.make_map, *args.map_size, seed=args.map_seed)
+        else:
+            mapfile.write(args.make_map, {'walls': np.array(map.mini_map, dtype=np.uint8)})
+        print(f'Mapa gravado em {args.make_map} ({os.path.getsize(args.make_map)} bytes)')
+        sys.exit(0)
+    if args.bench:
+        sys.exit(bench(args))
+    if args.headless_sim is not None:
+        game = main.Game(headless=True)
+        # Walks forward, sliding along the walls
+        game.player.keys = (True, False, False, False)
+        print(json.dumps(game.run_headless(args.headless_sim, args.headless_render), indent=4))
+        sys.exit(0)
+    if args.pipeline_compare:
+        from loveiswar import pipeline
+
+        game = main.Game(headless=True)
+        print(json.dumps(pipeline.compare(game, args.pipeline_compare), indent=4))
+        sys.exit(0)
+    if args.pack_atlas:
+        import pygame
+        from loveiswar import atlas
+
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))
+        manifest = atlas.pack()
+        print(f"{len(manifest['frames'])} quadros em {len(manifest['atlases'])} atlas: {settings.ATLAS_PATH}")
+        sys.exit(0)
+    if args.bake_assets:
+        from loveiswar import object_renderer, texture_cache
+
+        main.Game(headless=True).assets.wait()
+        for path in texture_cache.bake(object_renderer.ObjectRenderer.texture_assets()):
+            print(path)
+        sys.exit(0)
+    if args.ray_scaling is not None:
+        from loveiswar import map, parallel
+
+        grid = map.Map(None).grid
+        print(json.dumps(parallel.scaling_report(grid, (9.5, 4.5, 0.3), args.ray_scaling or None,
+                                                 mode=args.ray_pool), indent=4))
+        sys.exit(0)
+    if args.env_scaling is not None:
+        from loveiswar import env
+
+        print(json.dumps(env.scaling_report(args.env_instances, max_workers=args.env_scaling or None), indent=4))
+        sys.exit(0)
     game = main.Game()
-    game.run()
+    if args.compare_walls:
+        game.assets.wait()
+        game.raycasting.update()
+        print(json.dumps(game.object_renderer.compare_wall_renderers(args.compare_walls), indent=4))
+    else:
+        game.run()
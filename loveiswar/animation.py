@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Quadros de animação compartilhados e relógio global de animação.
+
+Esse módulo apresenta as classes :py:class:`loveiswar.animation.FrameStore`, que
+carrega cada diretório de animação uma única vez e compartilha os quadros entre
+todas as instâncias, e :py:class:`loveiswar.animation.AnimationClock`, que
+calcula o quadro atual de todas as animações de uma só vez a partir do tempo
+decorrido e da fase de cada animação.
+"""
+
+import os
+
+import numpy as np
+import pygame
+
+from loveiswar.assets import load_image
+
+class FrameStore:
+    """Quadros de animação indexados pelo diretório, carregados uma única vez.
+
+    Attributes:
+        loader (loveiswar.assets.AssetLoader): `Loader` utilizado para decodificar
+            os quadros em paralelo (``None`` para decodificação serial).
+        atlas (loveiswar.atlas.Atlas): Atlas consultado antes dos arquivos
+            (``None`` para sempre carregar os arquivos).
+        animations (dict): Quadros (`pygame.Surface` tuple) de cada diretório.
+    """
+    def __init__(self, loader=None, atlas=None):
+        """Args:
+            loader (loveiswar.assets.AssetLoader): `Loader` dos quadros.
+            atlas (loveiswar.atlas.Atlas): Atlas dos quadros.
+        """
+        self.loader = loader
+        self.atlas = atlas
+        self.animations = {}
+
+    def __len__(self):
+        return len(self.animations)
+
+    def get(self, path):
+        """Retorna os quadros de um diretório de animação, carregando-os no primeiro uso.
+
+        Args:
+            path (str): Diretório dos quadros.
+
+        Returns:
+            `pygame.Surface` tuple: Quadros da animação, na ordem dos nomes dos
+                arquivos, compartilhados entre as chamadas.
+        """
+        frames = self.animations.get(path)
+        if frames is None and self.atlas is not None and self.atlas.has_animation(path):
+            frames = self.animations[path] = self.atlas.animation(path)[0]
+        if frames is None:
+            # Frames follow the file name order
+            files = [os.path.join(path, filename) for filename in sorted(os.listdir(path))
+                     if os.path.isfile(os.path.join(path, filename))]
+            if self.loader is not None:
+                frames = tuple(self.loader.map(load_image, files))
+            else:
+                frames = tuple(load_image(filename) for filename in files)
+            self.animations[path] = frames
+        return frames
+
+class AnimationClock:
+    """Relógio único de todas as animações do jogo.
+
+    Cada animação registrada ocupa uma posição (`slot`) em matrizes paralelas de
+    quantidade de quadros, duração de cada quadro e fase. A cada frame,
+    :py:meth:`update` calcula o quadro de todas as animações em uma única passada
+    do NumPy, ``((tempo + fase) // duração) % quadros``.
+
+    Attributes:
+        time (int): Tempo (ms) do último :py:meth:`update`.
+        frame_count (numpy.ndarray): Quantidade de quadros de cada animação.
+        frame_time (numpy.ndarray): Duração (ms) de cada quadro de cada animação.
+        phase (numpy.ndarray): Fase (ms) de cada animação.
+        index (numpy.ndarray): Quadro atual de cada animação.
+        changed (numpy.ndarray): Define, para cada animação, se o quadro mudou no
+            último :py:meth:`update`.
+    """
+    def __init__(self):
+        self.time = 0
+        self.frame_count = np.empty(0, dtype=np.int64)
+        self.frame_time = np.empty(0, dtype=np.int64)
+        self.phase = np.empty(0, dtype=np.int64)
+        self.index = np.empty(0, dtype=np.int64)
+        self.changed = np.empty(0, dtype=bool)
+
+    def __len__(self):
+        return len(self.index)
+
+    def register(self, frame_count, frame_time, phase=0):
+        """Registra uma animação.
+
+        Args:
+            frame_count (int): Quantidade de quadros.
+            frame_time (int): Duração (ms) de cada quadro.
+            phase (int): Deslocamento (ms) da animação em relação ao relógio.
+
+        Returns:
+            int: `Slot` da animação.
+        """
+        slot = len(self.index)
+        self.frame_count = np.append(self.frame_count, max(1, frame_count))
+        self.frame_time = np.append(self.frame_time, max(1, frame_time))
+        self.phase = np.append(self.phase, phase)
+        self.index = np.append(self.index, (self.time + phase) // max(1, frame_time) % max(1, frame_count))
+        self.changed = np.append(self.changed, False)
+        return slot
+
+    def update(self, time=None):
+        """Calcula o quadro atual de todas as animações.
+
+        Args:
+            time (int): Tempo (ms) do relógio (padrão: ``pygame.time.get_ticks()``).
+        """
+        self.time = pygame.time.get_ticks() if time is None else time
+        index = (self.time + self.phase) // self.frame_time % self.frame_count
+        self.changed = index != self.index
+        self.index = index
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Carregamento de `assets` em segundo plano.
+
+Esse módulo apresenta a classe :py:class:`loveiswar.assets.AssetLoader`, que
+decodifica imagens em um `pool` de `threads` enquanto o jogo já é executado com
+superfícies provisórias (:py:func:`placeholder`). Os resultados são entregues
+por `callbacks` executadas na `thread` principal, em :py:meth:`AssetLoader.poll`,
+de modo que a troca das superfícies nunca ocorre no meio de um frame.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from loveiswar import settings
+
+def load_image(path):
+    """Carrega uma imagem de sprite com `per pixel alpha`.
+
+    Args:
+        path (str): Caminho do arquivo de imagem.
+
+    Returns:
+        pygame.Surface: Imagem convertida para o formato da tela.
+    """
+    return pygame.image.load(path).convert_alpha()
+
+def placeholder(size, color=settings.PLACEHOLDER_COLOR):
+    """Cria uma superfície provisória de cor sólida.
+
+    Args:
+        size (int tuple): Tamanho da superfície.
+        color (str): Cor da superfície (``None`` para uma superfície transparente).
+
+    Returns:
+        pygame.Surface: Superfície provisória.
+    """
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    if color is not None:
+        surface.fill(color)
+    return surface
+
+def placeholder_mipmaps(size, min_size=settings.MIPMAP_MIN_SIZE, color=settings.PLACEHOLDER_COLOR):
+    """Cria a pirâmide de `mipmaps` provisória de uma textura quadrada, sem filtragem.
+
+    Args:
+        size (int): Tamanho do nível ``0``.
+        min_size (int): Menor tamanho de um nível.
+        color (str): Cor dos níveis.
+
+    Returns:
+        `pygame.Surface` list: Níveis da pirâmide, com os mesmos tamanhos de
+            :py:func:`loveiswar.cache.build_mipmaps`.
+    """
+    levels = [placeholder((size, size), color)]
+    while size // 2 >= min_size:
+        size //= 2
+        levels.append(placeholder((size, size), color))
+    return levels
+
+class AssetLoader:
+    """Decodifica `assets` em um `pool` de `threads`, medindo cada decodificação.
+
+    Attributes:
+        workers (int): Quantidade de `threads` do `pool`.
+        total (int): Quantidade de `assets` solicitados.
+        loaded (int): Quantidade de `assets` já entregues às suas `callbacks`.
+        timings (dict): Tempo de decodificação (ms) de cada `asset`, indexado pelo nome.
+        start_time (float): Instante (``time.perf_counter``) da criação do `loader`.
+        ready_time (float): Tempo (segundos) até a entrega do último `asset`
+            (``None`` enquanto houver `assets` pendentes).
+    """
+    def __init__(self, workers=settings.ASSET_WORKERS):
+        """Args:
+            workers (int): Quantidade de `threads` (``0`` utiliza todos os núcleos).
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.total = 0
+        self.loaded = 0
+        self.timings = {}
+        self.start_time = time.perf_counter()
+        self.ready_time = None
+        self._pending = []
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='assets')
+        self._font = None
+
+    def _timed(self, name, load, args):
+        start = time.perf_counter()
+        result = load(*args)
+        self.timings[name] = (time.perf_counter() - start) * 1000
+        return result
+
+    def submit(self, name, load, *args, callback=None):
+        """Agenda a decodificação de um `asset`.
+
+        Args:
+            name (str): Nome do `asset` (ex.: caminho da imagem), utilizado nos relatórios.
+            load (callable): Função executada no `pool`, que retorna o `asset` pronto.
+            *args: Argumentos de ``load``.
+            callback (callable): Função chamada com o resultado na `thread`
+                principal, em :py:meth:`poll`.
+
+        Returns:
+            concurrent.futures.Future: Resultado futuro de ``load``.
+        """
+        future = self._pool.submit(self._timed, name, load, args)
+        self._pending.append((future, callback))
+        self.total += 1
+        self.ready_time = None
+        return future
+
+    def map(self, load, items):
+        """Decodifica vários `assets` em paralelo, aguardando todos.
+
+        Args:
+            load (callable): Função executada no `pool` para cada item.
+            items (list): Argumento de ``load`` para cada `asset` (também utilizado
+                como nome do `asset` nos relatórios).
+
+        Returns:
+            list: Resultados de ``load``, na ordem de ``items``.
+        """
+        futures = [self._pool.submit(self._timed, str(item), load, (item,)) for item in items]
+        return [future.result() for future in futures]
+
+    def poll(self):
+        """Entrega os `assets` prontos às suas `callbacks` (chamado a cada frame).
+
+        Returns:
+            int: Quantidade de `assets` entregues.
+
+        Raises:
+            Exception: Erros ocorridos na decodificação são propagados aqui.
+        """
+        if not self._pending:
+            return 0
+        pending = []
+        for future, callback in self._pending:
+            if not future.done():
+                pending.append((future, callback))
+                continue
+            result = future.result()
+            if callback is not None:
+                callback(result)
+            self.loaded += 1
+        delivered = len(self._pending) - len(pending)
+        self._pending = pending
+        if not pending:
+            self.ready_time = time.perf_counter() - self.start_time
+        return delivered
+
+    def wait(self):
+        """Aguarda a decodificação de todos os `assets` pendentes e os entrega."""
+        for future, _ in self._pending:
+            future.exception()
+        self.poll()
+
+    @property
+    def progress(self):
+        """float: Proporção dos `assets` solicitados já entregues."""
+        return self.loaded / self.total if self.total else 1.0
+
+    def report(self):
+        """Resume o carregamento dos `assets`.
+
+        Returns:
+            dict: `Threads`, `assets` entregues e solicitados, tempo até a entrega
+                do último `asset` e o tempo de decodificação de cada `asset` (ms).
+        """
+        return {
+            'workers': self.workers,
+            'loaded': self.loaded,
+            'total': self.total,
+            'ready_ms': self.ready_time * 1000 if self.ready_time is not None else None,
+            'timings': dict(self.timings),
+        }
+
+    def draw_progress(self, screen):
+        """Desenha o progresso do carregamento no rodapé da tela enquanto houver `assets` pendentes.
+
+        Args:
+            screen (pygame.Surface): Superfície de destino.
+        """
+        if not self._pending:
+            return
+        if self._font is None:
+            self._font = pygame.font.Font(None, 22)
+        width, height = screen.get_size()
+        pygame.draw.rect(screen, 'darkgray', (0, height - 6, width, 6))
+        pygame.draw.rect(screen, 'yellow', (0, height - 6, int(width * self.progress), 6))
+        text = f'Carregando: {self.loaded}/{self.total}'
+        screen.blit(self._font.render(text, True, 'yellow', 'black'), (8, height - 26))
+
+    def close(self):
+        """Encerra o `pool`, descartando os `assets` ainda não iniciados."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Atlas de sprites: empacotamento (`build`) e carregamento em tempo de execução.
+
+O empacotamento (:py:func:`pack`) combina as imagens de sprite e os quadros das
+animações em poucas imagens de atlas, descritas por um manifesto JSON::
+
+    {
+        "version": 1,
+        "atlases": ["atlas_0.png", ...],
+        "frames": {"<caminho da imagem>": {"atlas": 0, "rect": [x, y, w, h]}, ...},
+        "animations": {"<diretório>": {"frames": ["<caminho>", ...], "frame_time": 120}, ...}
+    }
+
+Em tempo de execução, :py:class:`loveiswar.atlas.Atlas` carrega cada atlas uma
+única vez com :py:class:`loveiswar.sprite_object.SpriteSheet` e entrega os quadros
+(`subsurfaces` do atlas) pelo caminho da imagem original.
+"""
+
+import json
+import os
+
+import pygame
+
+from loveiswar import settings
+from loveiswar.sprite_object import SpriteSheet
+
+MANIFEST_VERSION = 1
+"""int: Versão do formato do manifesto."""
+
+def collect_sprites(root='assets/sprites'):
+    """Lista as imagens de sprite e os diretórios de animação de uma pasta.
+
+    Cada subdiretório de ``root`` é percorrido: as imagens soltas em ``static``
+    são sprites estáticos, e os demais diretórios que contêm imagens são animações
+    (um quadro por arquivo, na ordem dos nomes).
+
+    Args:
+        root (str): Pasta base dos sprites.
+
+    Returns:
+        tuple: Caminhos das imagens estáticas e dicionário de quadros de cada animação.
+    """
+    static, animations = [], {}
+    for directory, _, filenames in sorted(os.walk(root)):
+        images = [os.path.join(directory, filename).replace(os.sep, '/')
+                  for filename in sorted(filenames) if filename.lower().endswith('.png')]
+        if not images:
+            continue
+        if os.path.basename(directory) == 'static':
+            static += images
+        else:
+            animations[directory.replace(os.sep, '/')] = images
+    return static, animations
+
+def shelf_pack(sizes, max_size, padding):
+    """Distribui retângulos em atlas com o algoritmo de prateleiras.
+
+    Os retângulos são posicionados do mais alto ao mais baixo, da esquerda para a
+    direita, iniciando uma nova prateleira quando a largura acaba e um novo atlas
+    quando a altura acaba.
+
+    Args:
+        sizes (int tuple list): Tamanho ``(w, h)`` de cada retângulo.
+        max_size (int): Tamanho máximo (largura e altura) de cada atlas.
+        padding (int): Espaço em pixels entre os retângulos.
+
+    Returns:
+        tuple: Posição ``(atlas, x, y)`` de cada retângulo (na ordem de ``sizes``)
+            e o tamanho ``(w, h)`` utilizado de cada atlas.
+    """
+    placements = [None] * len(sizes)
+    atlases = []
+    x = y = shelf = 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        width, height = sizes[i]
+        if not atlases:
+            atlases.append([0, 0])
+        if x + width > max_size and x > 0:
+            x, y, shelf = 0, y + shelf + padding, 0
+        if y + height > max_size and y > 0:
+            atlases.append([0, 0])
+            x = y = shelf = 0
+        placements[i] = (len(atlases) - 1, x, y)
+        atlases[-1][0] = max(atlases[-1][0], x + width)
+        atlases[-1][1] = max(atlases[-1][1], y + height)
+        x += width + padding
+        shelf = max(shelf, height)
+    return placements, [tuple(size) for size in atlases]
+
+def pack(output=settings.ATLAS_PATH, root='assets/sprites', max_size=settings.ATLAS_MAX_SIZE,
+         padding=1, frame_time=settings.ANIMATION_FRAME_TIME):
+    """Empacota as imagens de sprite e de animação em atlas e grava o manifesto.
+
+    Requer um `display` inicializado (as imagens são convertidas com `per pixel alpha`).
+
+    Args:
+        output (str): Caminho do manifesto (as imagens são gravadas na mesma pasta).
+        root (str): Pasta base dos sprites (ver :py:func:`collect_sprites`).
+        max_size (int): Tamanho máximo de cada atlas.
+        padding (int): Espaço em pixels entre os quadros.
+        frame_time (int): Duração (ms) de cada quadro das animações.
+
+    Returns:
+        dict: Manifesto gravado.
+    """
+    static, animations = collect_sprites(root)
+    paths = list(dict.fromkeys(static + [path for frames in animations.values() for path in frames]))
+    images = [pygame.image.load(path).convert_alpha() for path in paths]
+    placements, sizes = shelf_pack([image.get_size() for image in images], max_size, padding)
+
+    directory = os.path.dirname(output) or '.'
+    os.makedirs(directory, exist_ok=True)
+    surfaces = [pygame.Surface(size, pygame.SRCALPHA) for size in sizes]
+    frames = {}
+    for path, image, (atlas, x, y) in zip(paths, images, placements):
+        # RGBA_MAX over the transparent atlas copies the pixels without blending
+        surfaces[atlas].blit(image, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+        frames[path] = {'atlas': atlas, 'rect': [x, y, *image.get_size()]}
+
+    names = [f'atlas_{i}.png' for i in range(len(surfaces))]
+    for name, surface in zip(names, surfaces):
+        pygame.image.save(surface, os.path.join(directory, name))
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'atlases': names,
+        'frames': frames,
+        'animations': {path: {'frames': images, 'frame_time': frame_time}
+                       for path, images in animations.items()},
+    }
+    with open(output, 'w') as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+class Atlas:
+    """Carregamento dos atlas de sprites descritos por um manifesto.
+
+    Attributes:
+        manifest (dict): Manifesto carregado (ver :py:mod:`loveiswar.atlas`).
+        sheets (`pygame.Surface` list): Imagens de cada atlas, convertidas com
+            `per pixel alpha` uma única vez (cache de :py:class:`loveiswar.sprite_object.SpriteSheet`).
+    """
+    def __init__(self, path=settings.ATLAS_PATH):
+        """Leitura do manifesto e carregamento das imagens dos atlas.
+
+        Args:
+            path (str): Caminho do manifesto.
+
+        Raises:
+            ValueError: Caso a versão do manifesto não seja suportada.
+        """
+        with open(path) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('version') != MANIFEST_VERSION:
+            raise ValueError(f'Versão de manifesto de atlas não suportada: {path}')
+        directory = os.path.dirname(path) or '.'
+        self.sheets = [SpriteSheet.load_sheet(os.path.join(directory, name), alpha=True)
+                       for name in self.manifest['atlases']]
+        self._frames = {}
+
+    @classmethod
+    def load(cls, path=settings.ATLAS_PATH):
+        """Carrega os atlas caso o manifesto exista.
+
+        Args:
+            path (str): Caminho do manifesto.
+
+        Returns:
+            loveiswar.atlas.Atlas: Atlas carregado, ou ``None`` sem manifesto.
+        """
+        if not path or not os.path.isfile(path):
+            return None
+        return cls(path)
+
+    def __contains__(self, name):
+        return name in self.manifest['frames']
+
+    def frame(self, name):
+        """Retorna um quadro do atlas.
+
+        Args:
+            name (str): Caminho da imagem original do quadro.
+
+        Returns:
+            pygame.Surface: `Subsurface` do atlas com o quadro.
+
+        Raises:
+            KeyError: Caso o quadro não esteja no atlas.
+        """
+        image = self._frames.get(name)
+        if image is None:
+            entry = self.manifest['frames'][name]
+            image = self._frames[name] = SpriteSheet.cut(self.sheets[entry['atlas']],
+                                                         pygame.Rect(entry['rect']))[0]
+        return image
+
+    def has_animation(self, path):
+        """Verifica se um diretório de animação está no atlas.
+
+        Args:
+            path (str): Diretório da animação.
+
+        Returns:
+            bool: ``True`` caso a animação esteja no atlas.
+        """
+        return path.rstrip('/') in self.manifest['animations']
+
+    def animation(self, path):
+        """Retorna os quadros e a duração dos quadros de uma animação.
+
+        Args:
+            path (str): Diretório da animação.
+
+        Returns:
+            tuple: Quadros (`pygame.Surface` tuple) e duração (ms) de cada quadro.
+
+        Raises:
+            KeyError: Caso a animação não esteja no atlas.
+        """
+        entry = self.manifest['animations'][path.rstrip('/')]
+        return tuple(self.frame(name) for name in entry['frames']), entry['frame_time']
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Benchmark determinístico e sem display da engine.
+
+O benchmark executa o :py:class:`loveiswar.main.Game` com o driver de vídeo
+``dummy`` do SDL, conduzindo o player por caminhos de câmera fixos
+(:py:data:`CAMERA_PATHS`) com `delta-time` fixo, e mede o tempo de cada etapa
+da renderização de um frame. O resultado é um dicionário serializável em JSON
+que pode ser comparado com um resultado salvo anteriormente (`baseline`).
+"""
+
+import math
+import time
+
+import numpy as np
+
+from loveiswar import settings
+
+STAGES = ('ray_cast', 'get_objects_to_render', 'sprite_projection',
+          'draw_background', 'render_game_objects', 'frame')
+"""str tuple: Etapas medidas em cada frame (``'frame'`` é a soma de todas)."""
+
+def corridor_sweep(frames):
+    """Percorre o corredor superior do mapa oscilando o ângulo de visão.
+
+    Args:
+        frames (int): Quantidade de poses do caminho.
+
+    Returns:
+        tuple list: Poses ``(x, y, angle)`` do caminho.
+    """
+    return [(1.5 + 13 * i / frames, 1.5, 0.4 * math.sin(i * math.tau / frames))
+            for i in range(frames)]
+
+def spin(frames):
+    """Gira 360° em torno de um ponto fixo no centro do mapa.
+
+    Args:
+        frames (int): Quantidade de poses do caminho.
+
+    Returns:
+        tuple list: Poses ``(x, y, angle)`` do caminho.
+    """
+    return [(9.5, 4.5, i * math.tau / frames) for i in range(frames)]
+
+def close_to_wall(frames):
+    """Encara a parede esquerda do mapa a curta distância, oscilando o ângulo.
+
+    Args:
+        frames (int): Quantidade de poses do caminho.
+
+    Returns:
+        tuple list: Poses ``(x, y, angle)`` do caminho.
+    """
+    return [(1.15, 6.5, math.pi + 0.3 * math.sin(i * math.tau / frames))
+            for i in range(frames)]
+
+def idle(frames):
+    """Mantém a câmera parada no centro do mapa.
+
+    Args:
+        frames (int): Quantidade de poses do caminho.
+
+    Returns:
+        tuple list: Poses ``(x, y, angle)`` do caminho.
+    """
+    return [(9.5, 4.5, 1.0)] * frames
+
+def aim(frames, step=3):
+    """Gira a câmera parada em passos de ``step`` `rays`, alternando o sentido.
+
+    Args:
+        frames (int): Quantidade de poses do caminho.
+        step (int): Passo, em múltiplos de :py:data:`loveiswar.settings.DELTA_ANGLE`.
+
+    Returns:
+        tuple list: Poses ``(x, y, angle)`` do caminho.
+    """
+    poses, angle = [], 1.0
+    for i in range(frames):
+        angle += step * settings.DELTA_ANGLE * (1 if i % 60 < 30 else -1)
+        poses.append((9.5, 4.5, angle))
+    return poses
+
+CAMERA_PATHS = {
+    'corridor_sweep': corridor_sweep,
+    'spin': spin,
+    'close_to_wall': close_to_wall,
+    'idle': idle,
+    'aim': aim,
+}
+"""dict: Geradores das poses de cada caminho de câmera do benchmark."""
+
+def summarize(samples):
+    """Resume as amostras de tempo de uma etapa.
+
+    Args:
+        samples (float list): Tempos em segundos.
+
+    Returns:
+        dict: Mínimo, mediana, p95 e p99 em milissegundos.
+    """
+    ms = np.asarray(samples) * 1000
+    return {
+        'min': float(ms.min()),
+        'median': float(np.median(ms)),
+        'p95': float(np.percentile(ms, 95)),
+        'p99': float(np.percentile(ms, 99)),
+    }
+
+def run_frame(game):
+    """Executa as etapas de renderização de um frame, medindo cada uma.
+
+    Args:
+        game (loveiswar.main.Game): Jogo em execução.
+
+    Returns:
+        dict: Tempo em segundos de cada etapa de :py:data:`STAGES`.
+    """
+    raycasting = game.raycasting
+    renderer = game.object_renderer
+    times = {}
+    game.map.update()
+
+    start = time.perf_counter()
+    raycasting.ray_cast()
+    times['ray_cast'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    raycasting.refresh_objects_to_render()
+    times['get_objects_to_render'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    raycasting.sprites_to_render = []
+    # Animations advance with the fixed delta-time
+    game.animation_clock.update(game.animation_clock.time + int(game.dt))
+    game.sprite_manager.update()
+    times['sprite_projection'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    renderer.draw_background()
+    times['draw_background'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    renderer.render_game_objects()
+    times['render_game_objects'] = time.perf_counter() - start
+
+    times['frame'] = sum(times.values())
+    return times
+
+def scatter_sprites(game, count, seed=0, path='assets/sprites/static/real_heart.png'):
+    """Espalha sprites decorativos em posições determinísticas das células livres do mapa.
+
+    Args:
+        game (loveiswar.main.Game): Jogo em execução.
+        count (int): Quantidade de sprites.
+        seed (int): Semente do gerador de posições.
+        path (str): Imagem dos sprites.
+    """
+    rng = np.random.default_rng(seed)
+    free_y, free_x = np.nonzero(game.map.grid == 0)
+    cells = rng.integers(len(free_x), size=count)
+    positions = np.column_stack((free_x[cells], free_y[cells])) + game.map.origin + rng.uniform(0.2, 0.8, (count, 2))
+    game.sprite_manager.add(path, positions, scale=0.3)
+
+def run_benchmark(game, frames=300, warmup=10, dt=1000 / settings.FPS, sprites=0):
+    """Executa todos os caminhos de câmera e resume o tempo de cada etapa.
+
+    Args:
+        game (loveiswar.main.Game): Jogo em execução (normalmente sem display).
+        frames (int): Quantidade de frames medidos por caminho.
+        warmup (int): Quantidade de frames executados e descartados antes de cada caminho.
+        dt (float): `Delta-time` fixo (milissegundos) utilizado em todos os frames.
+        sprites (int): Quantidade de sprites decorativos adicionados (ver
+            :py:func:`scatter_sprites`).
+
+    Returns:
+        dict: Configuração do benchmark, o tempo de inicialização
+            (:py:meth:`loveiswar.main.Game.startup_report`), o resumo (:py:func:`summarize`) de cada
+            etapa em cada caminho, o reaproveitamento do `raycasting` em cada
+            caminho (:py:meth:`loveiswar.raycasting.RayCasting.reuse_stats`), os
+            pixels preenchidos por frame e o `overdraw` do plano de fundo em cada
+            caminho (ver :py:attr:`loveiswar.object_renderer.ObjectRenderer.background_stats`), os
+            contadores do cache de colunas e a memória dos `mipmaps` de parede.
+    """
+    if game.first_frame_time is None:
+        run_frame(game)
+        game.first_frame_time = time.perf_counter() - game.start_time
+    # Frames are only measured with the final textures
+    game.assets.wait()
+    if sprites:
+        scatter_sprites(game, sprites)
+    results = {
+        'config': {
+            'frames': frames,
+            'sprites': len(game.sprite_manager),
+            'dt': dt,
+            'resolution': list(game.view.size),
+            'num_rays': game.view.num_rays,
+            'quality_level': game.quality.level,
+            'raycasting_backend': game.raycasting.backend,
+            'wall_renderer': game.object_renderer.wall_renderer,
+            'floor_renderer': game.object_renderer.floor_renderer,
+            'background_spans': settings.BACKGROUND_SPANS,
+        },
+        'startup': game.startup_report(),
+        'paths': {},
+        'ray_reuse': {},
+        'background': {},
+    }
+    player = game.player
+    raycasting = game.raycasting
+    for name, path in CAMERA_PATHS.items():
+        poses = path(frames)
+        raycasting.invalidate()
+        samples = {stage: [] for stage in STAGES}
+        filled, visible = [], []
+        for i, (x, y, angle) in enumerate(poses[:warmup] + poses):
+            player.x, player.y, player.angle = x, y, angle
+            player.rel = 0
+            game.dt = dt
+            times = run_frame(game)
+            if i >= warmup:
+                for stage in STAGES:
+                    samples[stage].append(times[stage])
+                filled.append(game.object_renderer.background_stats['filled'])
+                visible.append(game.object_renderer.background_stats['visible'])
+            if i == warmup - 1:
+                raycasting.reuse_counts = dict.fromkeys(raycasting.reuse_counts, 0)
+                raycasting.rays_cast = raycasting.rays_total = 0
+        results['ray_reuse'][name] = raycasting.reuse_stats()
+        results['background'][name] = {
+            'filled_px': float(np.mean(filled)),
+            'visible_px': float(np.mean(visible)),
+            'overdraw': float(np.sum(filled) / np.sum(visible)) if np.sum(visible) else 1.0,
+        }
+        results['paths'][name] = {stage: summarize(samples[stage]) for stage in STAGES}
+
+    results['column_cache'] = game.object_renderer.column_cache.cache.stats()
+    results['sprite_cache'] = game.object_renderer.sprite_cache.cache.stats()
+    results['mipmap_memory'] = game.object_renderer.mipmap_memory()
+    return results
+
+def compare(results, baseline, tolerance=0.15, noise_ms=0.05):
+    """Compara um resultado do benchmark com um resultado salvo.
+
+    Uma regressão ocorre quando a mediana de uma etapa supera a mediana do
+    `baseline` em mais que ``tolerance`` (proporção) e em mais que ``noise_ms``
+    (evitando falsos alarmes em etapas de poucos microssegundos).
+
+    Args:
+        results (dict): Resultado de :py:func:`run_benchmark`.
+        baseline (dict): Resultado salvo anteriormente.
+        tolerance (float): Aumento relativo permitido da mediana.
+        noise_ms (float): Aumento absoluto (ms) sempre permitido da mediana.
+
+    Returns:
+        str list: Descrição de cada regressão encontrada.
+    """
+    regressions = []
+    for name, stages in baseline['paths'].items():
+        for stage, stats in stages.items():
+            current = results['paths'].get(name, {}).get(stage)
+            if current is None:
+                continue
+            limit = stats['median'] * (1 + tolerance)
+            if current['median'] > limit and current['median'] - stats['median'] > noise_ms:
+                regressions.append(
+                    f"{name}/{stage}: mediana {current['median']:.3f} ms > "
+                    f"{limit:.3f} ms (baseline {stats['median']:.3f} ms)")
+    return regressions
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Caches de superfícies reutilizadas entre frames.
+
+Esse módulo apresenta a estrutura genérica :py:class:`loveiswar.cache.LRUCache`,
+limitada pela memória ocupada, e os caches específicos de renderização que a
+utilizam.
+"""
+
+import itertools
+import weakref
+
+import pygame
+from collections import OrderedDict
+
+from loveiswar import settings
+
+def surface_bytes(surface):
+    """Calcula a memória aproximada ocupada pelos pixels de uma `Surface`.
+
+    Args:
+        surface (pygame.Surface): Superfície a ser medida.
+
+    Returns:
+        int: Quantidade de bytes dos pixels da superfície.
+    """
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+def build_mipmaps(surface, min_size):
+    """Constrói a pirâmide de `mipmaps` de uma superfície.
+
+    Cada nível é a redução pela metade (com filtragem) do nível anterior,
+    até que a menor dimensão atinja ``min_size``.
+
+    Args:
+        surface (pygame.Surface): Superfície do nível ``0`` (8, 24 ou 32 bits).
+        min_size (int): Menor tamanho em pixels de um nível.
+
+    Returns:
+        `pygame.Surface` list: Níveis da pirâmide, começando pela própria superfície.
+    """
+    levels = [surface]
+    width, height = surface.get_size()
+    while min(width, height) // 2 >= min_size:
+        width, height = width // 2, height // 2
+        levels.append(pygame.transform.smoothscale(levels[-1], (width, height)))
+    return levels
+
+class LRUCache:
+    """Cache `least recently used` limitado pela quantidade de bytes armazenados.
+
+    Attributes:
+        max_bytes (int): Limite de memória das entradas armazenadas.
+        size (int): Memória ocupada atualmente pelas entradas.
+        hits (int): Quantidade de consultas atendidas pelo cache.
+        misses (int): Quantidade de consultas não atendidas pelo cache.
+        evictions (int): Quantidade de entradas descartadas por falta de espaço.
+    """
+    def __init__(self, max_bytes):
+        """Args:
+            max_bytes (int): Limite de memória das entradas armazenadas.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Consulta uma entrada, marcando-a como a mais recente.
+
+        Args:
+            key (hashable): Chave da entrada.
+
+        Returns:
+            object: Valor armazenado, ou ``None`` caso a chave não esteja no cache.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, size):
+        """Armazena uma entrada, descartando as menos recentes caso necessário.
+
+        Args:
+            key (hashable): Chave da entrada.
+            value (object): Valor a armazenar.
+            size (int): Memória ocupada pelo valor, em bytes.
+        """
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+        self._entries[key] = (value, size)
+        self.size += size
+        while self.size > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= evicted
+            self.evictions += 1
+
+    def clear(self):
+        """Descarta todas as entradas (os contadores são mantidos)."""
+        self._entries.clear()
+        self.size = 0
+
+    @property
+    def hit_rate(self):
+        """float: Proporção das consultas atendidas pelo cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """Retorna os contadores do cache, para dimensionamento.
+
+        Returns:
+            dict: Entradas, bytes ocupados, limite, acertos, falhas, descartes e
+                taxa de acerto.
+        """
+        return {
+            'entries': len(self._entries),
+            'bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate,
+        }
+
+class WallColumnCache:
+    """Cache das colunas de parede já escalonadas para renderização.
+
+    No carregamento, cada nível de `mipmap` das texturas de parede é fatiado em
+    colunas (`subsurfaces`, sem cópia dos pixels) com a largura equivalente a
+    :py:data:`loveiswar.settings.SCALE` pixels do nível ``0``. Durante o jogo, o
+    nível utilizado é o menor cuja altura não seja inferior à altura projetada da
+    parede, e as colunas escalonadas são servidas por um
+    :py:class:`loveiswar.cache.LRUCache` com chave ``(textura, nível, coluna,
+    altura quantizada, largura da ray)`` (no caso de paredes maiores que a tela, a
+    chave usa a altura da fatia visível da textura), evitando a maioria das chamadas a
+    ``pygame.transform.scale``.
+
+    Attributes:
+        columns (dict): Colunas pré-fatiadas de cada nível de cada textura,
+            indexadas pelo id da textura.
+        quant (int): Passo de quantização da altura projetada, em pixels.
+        cache (loveiswar.cache.LRUCache): Cache das colunas escalonadas.
+        generation (int): Quantidade de substituições de texturas, utilizada para
+            invalidar listas de colunas já montadas.
+    """
+    def __init__(self, mipmaps, max_bytes=settings.COLUMN_CACHE_BYTES, quant=settings.COLUMN_CACHE_QUANT):
+        """Fatiamento das texturas em colunas.
+
+        Args:
+            mipmaps (dict): Níveis de `mipmap` das texturas de parede indexados pelo
+                id da textura (ver :py:meth:`loveiswar.object_renderer.ObjectRenderer.build_mipmaps`).
+            max_bytes (int): Limite de memória das colunas escalonadas.
+            quant (int): Passo de quantização da altura projetada, em pixels.
+        """
+        self.columns = {texture: [self.slice_columns(surface, max(1, settings.SCALE >> level))
+                                  for level, surface in enumerate(levels)]
+                        for texture, levels in mipmaps.items()}
+        self.quant = quant
+        self.cache = LRUCache(max_bytes)
+        self.generation = 0
+
+    def set_texture(self, texture, levels):
+        """Substitui os níveis de uma textura (ex.: textura provisória já carregada).
+
+        As colunas escalonadas armazenadas são descartadas.
+
+        Args:
+            texture (int): Id da textura.
+            levels (`pygame.Surface` list): Novos níveis de `mipmap` da textura.
+        """
+        self.columns[texture] = [self.slice_columns(surface, max(1, settings.SCALE >> level))
+                                 for level, surface in enumerate(levels)]
+        self.cache.clear()
+        self.generation += 1
+
+    @staticmethod
+    def slice_columns(surface, width=settings.SCALE):
+        """Fatia uma textura em colunas.
+
+        Args:
+            surface (pygame.Surface): Textura de parede.
+            width (int): Largura em pixels de cada coluna.
+
+        Returns:
+            `pygame.Surface` list: `Subsurfaces` de cada coluna da textura.
+        """
+        surface_width, height = surface.get_size()
+        return [surface.subsurface(x, 0, width, height)
+                for x in range(0, surface_width - width + 1, width)]
+
+    @staticmethod
+    def select_level(projection_height, levels):
+        """Escolhe o nível de `mipmap` para uma altura projetada.
+
+        Args:
+            projection_height (float): Altura projetada da parede.
+            levels (int): Quantidade de níveis disponíveis.
+
+        Returns:
+            int: Menor nível cuja altura não é inferior a ``projection_height``.
+        """
+        level = 0
+        size = settings.TEXTURE_SIZE // 2
+        while level + 1 < levels and size >= projection_height:
+            level += 1
+            size //= 2
+        return level
+
+    def get(self, texture, offset, projection_height, scale=settings.SCALE, screen_height=settings.HEIGHT):
+        """Retorna a coluna escalonada de uma `ray` e sua posição vertical na tela.
+
+        Args:
+            texture (int): Id da textura atingida pela `ray`.
+            offset (float): Deslocamento horizontal na textura, entre 0 e 1.
+            projection_height (float): Altura projetada da parede.
+            scale (int): Largura em pixels da coluna escalonada.
+            screen_height (int): Altura da superfície de destino.
+
+        Returns:
+            tuple: Coluna escalonada (`pygame.Surface`) e posição 'Y' na tela.
+        """
+        levels = self.columns[texture]
+        level = self.select_level(projection_height, len(levels))
+        columns = levels[level]
+        size = settings.TEXTURE_SIZE >> level
+        width = max(1, settings.SCALE >> level)
+        column = min(int(offset * (size - width)) // width, len(columns) - 1)
+
+        clipped = projection_height >= screen_height
+        if not clipped:
+            height = max(self.quant, int(projection_height / self.quant + 0.5) * self.quant)
+            top = screen_height // 2 - height // 2
+        else:
+            # Only the visible rows of the texture are scaled
+            height = max(1, int(size * screen_height / projection_height))
+            top = 0
+
+        key = (texture, level, column, height, clipped, scale, screen_height)
+        wall_column = self.cache.get(key)
+        if wall_column is None:
+            if not clipped:
+                wall_column = pygame.transform.scale(columns[column], (scale, height))
+            else:
+                wall_column = columns[column].subsurface(0, size // 2 - height // 2, width, height)
+                wall_column = pygame.transform.scale(wall_column, (scale, screen_height))
+            self.cache.put(key, wall_column, surface_bytes(wall_column))
+        return wall_column, top
+
+class SpriteScaleCache:
+    """Cache das imagens de sprite escalonadas para a projeção.
+
+    Cada imagem recebe, no primeiro uso, uma pirâmide de reduções pela metade
+    (ver :py:func:`loveiswar.cache.build_mipmaps`), de modo que sprites distantes
+    nunca são escalonados a partir da imagem em resolução total. As pirâmides e as
+    imagens escalonadas dividem o mesmo :py:class:`loveiswar.cache.LRUCache`, com
+    chaves ``(imagem,)`` e ``(imagem, largura, altura quantizadas)``.
+
+    Cada imagem é identificada por um número sequencial, associado à imagem por
+    referência fraca: as entradas não mantêm a imagem viva e o número de uma
+    imagem descartada (ex.: textura provisória substituída) nunca é reutilizado,
+    então suas entradas apenas envelhecem no cache.
+
+    Attributes:
+        quant (int): Passo de quantização da altura projetada, em pixels.
+        cache (loveiswar.cache.LRUCache): Cache das pirâmides e das imagens escalonadas.
+    """
+    def __init__(self, max_bytes=settings.SPRITE_CACHE_BYTES, quant=settings.SPRITE_CACHE_QUANT):
+        """Args:
+            max_bytes (int): Limite de memória das pirâmides e imagens escalonadas.
+            quant (int): Passo de quantização da altura projetada, em pixels.
+        """
+        self.quant = quant
+        self.cache = LRUCache(max_bytes)
+        self._tokens = weakref.WeakKeyDictionary()
+        self._counter = itertools.count()
+
+    def token(self, image):
+        """Retorna o número que identifica uma imagem nas chaves do cache.
+
+        Args:
+            image (pygame.Surface): Imagem do sprite.
+
+        Returns:
+            int: Número da imagem, fixo enquanto ela existir.
+        """
+        token = self._tokens.get(image)
+        if token is None:
+            token = self._tokens[image] = next(self._counter)
+        return token
+
+    def pyramid(self, image, token):
+        """Retorna os níveis de `mipmap` de uma imagem, construindo-os caso necessário.
+
+        Args:
+            image (pygame.Surface): Imagem do sprite (nível ``0``).
+            token (int): Número da imagem (ver :py:meth:`token`).
+
+        Returns:
+            `pygame.Surface` list: Níveis da pirâmide, começando pela própria imagem.
+        """
+        # The cached entry leaves out level 0 so it never keeps the image alive
+        reduced = self.cache.get((token,))
+        if reduced is None:
+            reduced = tuple(build_mipmaps(image, settings.MIPMAP_MIN_SIZE)[1:])
+            self.cache.put((token,), reduced, sum(surface_bytes(level) for level in reduced))
+        return [image, *reduced]
+
+    def get(self, image, width, height):
+        """Retorna a imagem escalonada para o tamanho projetado.
+
+        Args:
+            image (pygame.Surface): Imagem original do sprite.
+            width (float): Largura projetada.
+            height (float): Altura projetada.
+
+        Returns:
+            pygame.Surface: Imagem escalonada para o tamanho quantizado mais próximo.
+        """
+        quantized = max(self.quant, int(height / self.quant + 0.5) * self.quant)
+        # The width follows the height so the aspect ratio is kept
+        width = max(1, int(width * quantized / height + 0.5)) if height > 0 else 1
+        height = quantized
+        token = self.token(image)
+        key = (token, width, height)
+        scaled = self.cache.get(key)
+        if scaled is None:
+            levels = self.pyramid(image, token)
+            source = levels[0]
+            for level in levels[1:]:
+                if level.get_height() < height:
+                    break
+                source = level
+            scaled = pygame.transform.scale(source, (width, height))
+            self.cache.put(key, scaled, surface_bytes(scaled))
+        return scaled
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Ambiente sem display para agentes e simulações em lote.
+
+Esse módulo apresenta a classe :py:class:`loveiswar.env.BatchEnv`, que simula N
+instâncias independentes do jogo a partir de ações (sem display e sem leitura
+do teclado ou do mouse) e retorna, para cada instância, a pose do player e as
+observações do `raycasting`. O movimento e a colisão são os de
+:py:class:`loveiswar.player.Player` sobre um :py:class:`loveiswar.map.Map`, e as
+`rays` de todas as instâncias são calculadas em lote por
+:py:func:`loveiswar.raycasting.cast_rays`.
+
+As instâncias compartilham a grade do mapa e podem ser divididas em faixas
+entre os processos de um `pool` (com a grade em memória compartilhada, como em
+:py:class:`loveiswar.parallel.ParallelRayCaster`), de modo que os passos por
+segundo acompanham a quantidade de núcleos (ver :py:func:`scaling_report`).
+"""
+
+import atexit
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from loveiswar import map, player, settings
+from loveiswar.parallel import split_bands
+from loveiswar.raycasting import cast_rays
+
+ACTIONS = ('forward', 'backward', 'left', 'right', 'turn')
+"""tuple: Colunas de cada ação: as teclas de movimento (diferente de ``0`` para
+	pressionada) e o movimento do mouse (ver :py:attr:`loveiswar.player.Player.turn`)."""
+
+_worker = {}
+"""dict: Memória compartilhada e instâncias de cada processo do `pool`."""
+
+def load_grid():
+    """Lê a grade inteira do mapa em uso (embutido ou :py:data:`loveiswar.settings.MAP_PATH`).
+
+    Returns:
+        numpy.ndarray: Grade ``(linhas, colunas)`` do mapa.
+    """
+    world = map.Map(None)
+    try:
+        if world.streamer is None:
+            return world.grid
+        return world.region(0, 0, world.width, world.height)
+    finally:
+        world.close()
+
+def _attach(grid_name, grid_shape, rays, ticks):
+    """Inicializador dos processos: abre a grade compartilhada criada pelo ambiente.
+
+    Args:
+        grid_name (str): Nome da memória compartilhada da grade do mapa.
+        grid_shape (tuple): Formato ``(linhas, colunas)`` da grade.
+        rays (int): Quantidade de `rays` por instância.
+        ticks (int): Passos de simulação por ação.
+    """
+    block = shared_memory.SharedMemory(name=grid_name)
+    _worker['block'] = block
+    _worker['shard'] = Shard(np.ndarray(grid_shape, np.uint8, block.buf), rays, ticks)
+
+def _call_shard(method, *args):
+    """Chama um método de :py:class:`Shard` sobre a faixa de instâncias de um processo do `pool`."""
+    return getattr(_worker['shard'], method)(*args)
+
+class Shard:
+    """Faixa de instâncias simuladas por um mesmo processo.
+
+    Substitui o :py:class:`loveiswar.main.Game` como contexto do mapa e do player:
+    um único :py:class:`loveiswar.player.Player` é posicionado na pose de cada
+    instância, simulado e tem a pose resultante copiada de volta. O estado de
+    cada instância é apenas a sua pose, mantida por :py:class:`BatchEnv`.
+
+    Attributes:
+        map (loveiswar.map.Map): Mapa compartilhado pelas instâncias.
+        player (loveiswar.player.Player): Player reposicionado em cada instância.
+        rays (int): Quantidade de `rays` por instância.
+        ticks (int): Passos de simulação de :py:data:`loveiswar.settings.TICK_TIME`
+            por ação.
+    """
+    def __init__(self, grid, rays=settings.ENV_RAYS, ticks=1):
+        """Args:
+            grid (numpy.ndarray): Grade ``(linhas, colunas)`` do mapa.
+            rays (int): Quantidade de `rays` por instância.
+            ticks (int): Passos de simulação por ação.
+        """
+        self.map = map.Map(self, grid)
+        self.player = player.Player(self)
+        self.rays = rays
+        self.ticks = ticks
+        self._steps = np.arange(rays) * (settings.FOV / rays)
+
+    def step(self, poses, actions):
+        """Aplica uma ação a cada instância e calcula as observações.
+
+        Args:
+            poses (numpy.ndarray): Pose ``(x, y, angle)`` de cada instância.
+            actions (numpy.ndarray): Ação de cada instância (colunas de :py:data:`ACTIONS`).
+
+        Returns:
+            tuple: Novas poses, observações (ver :py:meth:`observe`), tempo de
+                simulação (segundos) de cada instância e tempo do `raycasting`
+                da faixa.
+        """
+        player = self.player
+        out = np.empty_like(poses)
+        sim_time = np.empty(len(poses))
+        for i, (pose, action) in enumerate(zip(poses.tolist(), actions.tolist())):
+            start = time.perf_counter()
+            player.x, player.y, player.angle = pose
+            player.keys = tuple(key != 0 for key in action[:4])
+            player.turn = action[4]
+            for _ in range(self.ticks):
+                player.step(settings.TICK_TIME)
+            out[i] = player.pose
+            sim_time[i] = time.perf_counter() - start
+        start = time.perf_counter()
+        depth, texture = self.observe(out)
+        return out, depth, texture, sim_time, time.perf_counter() - start
+
+    def observe(self, poses):
+        """Calcula as `rays` de todas as instâncias, em lotes de até
+        	:py:data:`loveiswar.settings.ENV_CAST_RAYS` `rays`.
+
+        Os valores são os mesmos de :py:meth:`loveiswar.raycasting.RayCasting.ray_cast_numpy`
+        com :py:attr:`rays` `rays`.
+
+        Args:
+            poses (numpy.ndarray): Pose ``(x, y, angle)`` de cada instância.
+
+        Returns:
+            tuple: Profundidade (com correção de olho de peixe) e textura de cada
+                `ray`, no formato ``(instâncias, rays)``.
+        """
+        count, rays = len(poses), self.rays
+        angles = poses[:, 2:3]
+        ray_angles = angles - settings.HALF_FOV + 0.0001 + self._steps
+        depth = np.empty((count, rays), np.float32)
+        texture = np.empty((count, rays), np.uint8)
+        batch = max(settings.ENV_CAST_RAYS // rays, 1)
+        for start in range(0, count, batch):
+            part = slice(start, start + batch)
+            shape = ray_angles[part].shape
+            values, textures, _ = cast_rays(self.map.grid, np.repeat(poses[part, 0], rays),
+                                            np.repeat(poses[part, 1], rays), ray_angles[part].ravel())
+            depth[part] = values.reshape(shape) * np.cos(angles[part] - ray_angles[part])
+            texture[part] = textures.reshape(shape)
+        return depth, texture
+
+class BatchEnv:
+    """N instâncias do jogo simuladas em lote a partir de ações.
+
+    Exemplo::
+
+        env = BatchEnv(64, workers=4)
+        observations = env.reset()
+        actions = np.zeros((64, len(ACTIONS)))
+        actions[:, 0] = 1
+        observations, timings = env.step(actions)
+        env.close()
+
+    Attributes:
+        count (int): Quantidade de instâncias.
+        rays (int): Quantidade de `rays` observadas por instância.
+        ticks (int): Passos de simulação por ação.
+        workers (int): Quantidade de processos do `pool` (``0`` simula no próprio processo).
+        shards (tuple list): Intervalos ``(start, stop)`` das instâncias de cada processo.
+        poses (numpy.ndarray): Pose ``(x, y, angle)`` atual de cada instância.
+        steps (int): Quantidade de ações aplicadas desde o último :py:meth:`reset`.
+    """
+    def __init__(self, count, rays=settings.ENV_RAYS, ticks=1, workers=0, grid=None):
+        """Criação das instâncias e, com ``workers``, do `pool` e da memória compartilhada.
+
+        Args:
+            count (int): Quantidade de instâncias.
+            rays (int): Quantidade de `rays` observadas por instância.
+            ticks (int): Passos de simulação de :py:data:`loveiswar.settings.TICK_TIME`
+                por ação.
+            workers (int): Quantidade de processos (``0`` simula no próprio processo).
+            grid (numpy.ndarray): Grade do mapa (padrão: :py:func:`load_grid`).
+
+        Raises:
+            ValueError: Caso ``count``, ``rays`` ou ``ticks`` não sejam positivos.
+        """
+        if count < 1 or rays < 1 or ticks < 1:
+            raise ValueError(f'Ambiente inválido: {count} instâncias, {rays} rays, {ticks} passos.')
+        grid = np.ascontiguousarray(load_grid() if grid is None else grid, dtype=np.uint8)
+        self.count = count
+        self.rays = rays
+        self.ticks = ticks
+        self.workers = workers
+        self.poses = np.empty((count, 3))
+        self.steps = 0
+        self._block = None
+        self._pool = None
+        self._shard = None
+
+        if workers:
+            self.shards = split_bands(count, workers)
+            self._block = shared_memory.SharedMemory(create=True, size=grid.nbytes)
+            np.ndarray(grid.shape, np.uint8, self._block.buf)[:] = grid
+            self._pool = ProcessPoolExecutor(workers, initializer=_attach,
+                                             initargs=(self._block.name, grid.shape, rays, ticks))
+        else:
+            self.shards = [(0, count)]
+            self._shard = Shard(grid, rays, ticks)
+        atexit.register(self.close)
+        self.reset()
+
+    def reset(self, poses=None):
+        """Reposiciona todas as instâncias.
+
+        Args:
+            poses (numpy.ndarray): Pose ``(x, y, angle)`` de cada instância (padrão:
+                :py:data:`loveiswar.settings.PLAYER_POS` e :py:data:`loveiswar.settings.PLAYER_ANGLE`).
+
+        Returns:
+            dict: Observações das novas poses (ver :py:meth:`step`).
+        """
+        if poses is None:
+            self.poses[:] = (*settings.PLAYER_POS, settings.PLAYER_ANGLE)
+        else:
+            self.poses[:] = poses
+        self.steps = 0
+        results = self.dispatch('observe', self.poses)
+        return {
+            'pose': self.poses.copy(),
+            'depth': np.concatenate([result[0] for result in results]),
+            'texture': np.concatenate([result[1] for result in results]),
+        }
+
+    def dispatch(self, method, *arrays):
+        """Chama um método de :py:class:`Shard` sobre cada faixa de instâncias.
+
+        Args:
+            method (str): Nome do método.
+            *arrays (numpy.ndarray): Vetores por instância, divididos entre as faixas.
+
+        Returns:
+            list: Resultado de cada faixa, na ordem de :py:attr:`shards`.
+        """
+        if self._shard is not None:
+            return [getattr(self._shard, method)(*arrays)]
+        futures = [self._pool.submit(_call_shard, method, *(values[start:stop] for values in arrays))
+                   for start, stop in self.shards]
+        return [future.result() for future in futures]
+
+    def step(self, actions):
+        """Aplica uma ação a cada instância.
+
+        Args:
+            actions (numpy.ndarray): Ações ``(instâncias, len(ACTIONS))``; as quatro
+                primeiras colunas são as teclas W, S, A e D e a última o movimento
+                do mouse (ver :py:data:`ACTIONS`).
+
+        Returns:
+            tuple: Observações (dicionário com a pose ``(instâncias, 3)``, a
+                profundidade e a textura ``(instâncias, rays)`` de cada instância) e
+                tempos (dicionário com o tempo de simulação e de `raycasting` de
+                cada instância e o tempo total do passo, em ms).
+
+        Raises:
+            ValueError: Caso o formato das ações não seja ``(instâncias, len(ACTIONS))``.
+        """
+        actions = np.asarray(actions, dtype=np.float64)
+        if actions.shape != (self.count, len(ACTIONS)):
+            raise ValueError(f'Formato das ações inválido: {actions.shape} (esperado '
+                             f'{(self.count, len(ACTIONS))}).')
+        start = time.perf_counter()
+        results = self.dispatch('step', self.poses, actions)
+        self.poses = np.concatenate([result[0] for result in results])
+        self.steps += 1
+        observations = {
+            'pose': self.poses.copy(),
+            'depth': np.concatenate([result[1] for result in results]),
+            'texture': np.concatenate([result[2] for result in results]),
+        }
+        # The cast time of a shard is split evenly between its instances
+        timings = {
+            'sim_ms': np.concatenate([result[3] for result in results]) * 1000,
+            'cast_ms': np.concatenate([np.full(stop - first, result[4] * 1000 / (stop - first))
+                                       for (first, stop), result in zip(self.shards, results)]),
+            'step_ms': (time.perf_counter() - start) * 1000,
+        }
+        return observations, timings
+
+    def close(self):
+        """Encerra o `pool` e libera a memória compartilhada."""
+        atexit.unregister(self.close)
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._block is not None:
+            self._block.close()
+            self._block.unlink()
+            self._block = None
+
+def scaling_report(count=256, steps=100, max_workers=None, rays=settings.ENV_RAYS, seed=0):
+    """Mede os passos por segundo do ambiente no próprio processo e com 1 a ``max_workers`` processos.
+
+    As instâncias andam para frente e giram aleatoriamente (mesma sequência de
+    ações em todas as configurações).
+
+    Args:
+        count (int): Quantidade de instâncias.
+        steps (int): Quantidade de ações medidas em cada configuração.
+        max_workers (int): Maior quantidade de processos medida (padrão: núcleos disponíveis).
+        rays (int): Quantidade de `rays` observadas por instância.
+        seed (int): Semente das ações.
+
+    Returns:
+        dict: Para cada configuração, passos (instância x ação) por segundo, a
+            mediana do tempo de cada ação (ms) e o ganho em relação ao próprio processo.
+    """
+    rng = np.random.default_rng(seed)
+    actions = np.zeros((steps, count, len(ACTIONS)))
+    actions[:, :, 0] = 1
+    actions[:, :, 4] = rng.uniform(-settings.MOUSE_MAX_REL, settings.MOUSE_MAX_REL, (steps, count))
+    grid = load_grid()
+
+    def measure(workers):
+        env = BatchEnv(count, rays, workers=workers, grid=grid)
+        try:
+            env.step(actions[0])
+            samples = []
+            start = time.perf_counter()
+            for step_actions in actions:
+                samples.append(env.step(step_actions)[1]['step_ms'])
+            elapsed = time.perf_counter() - start
+        finally:
+            env.close()
+        return {'sps': count * steps / elapsed, 'step_ms': float(np.median(samples))}
+
+    report = {'instances': count, 'rays': rays, 'cpu_count': os.cpu_count(), 'local': measure(0),
+              'workers': {}}
+    for workers in range(1, (max_workers or os.cpu_count() or 1) + 1):
+        result = measure(workers)
+        result['speedup'] = result['sps'] / report['local']['sps']
+        report['workers'][workers] = result
+    return report
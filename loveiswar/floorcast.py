@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Renderização vetorizada de chão e teto texturizados (`floor casting`).
+
+Esse módulo apresenta a classe :py:class:`loveiswar.floorcast.FloorCaster`,
+alternativa ao chão de cor plana de
+:py:meth:`loveiswar.object_renderer.ObjectRenderer.draw_background`.
+"""
+
+import numpy as np
+import pygame
+
+from loveiswar import settings
+
+class FloorCaster:
+    """Renderiza o chão (e, opcionalmente, o teto) com texturas, uma linha de distância por vez.
+
+    A distância até o chão de cada linha abaixo do horizonte depende apenas da
+    resolução em uso e é calculada uma única vez (:py:attr:`row_distance`); a
+    direção de cada `ray` depende apenas do ângulo do player. A cada frame, a
+    posição no mapa (e na textura) de todos os pixels visíveis do chão é
+    calculada com operações vetorizadas sobre essas duas tabelas, e o resultado
+    é escrito de uma só vez nos pixels da tela (``pygame.surfarray.pixels2d``).
+    Os pixels cobertos pela parede de cada `ray` (ver
+    :py:attr:`loveiswar.raycasting.RayCasting.wall_tops` e
+    :py:attr:`loveiswar.raycasting.RayCasting.wall_bottoms`) não são calculados
+    nem escritos.
+
+    O teto é o reflexo do chão em relação ao horizonte, com a mesma tabela de
+    distâncias.
+
+    Attributes:
+        size (int): Tamanho em pixels das texturas extraídas (potência de 2).
+        floor (numpy.ndarray): Pixels ``(u, v)`` da textura do chão, no formato da tela.
+        ceiling (numpy.ndarray): Pixels ``(u, v)`` da textura do teto (``None``
+            mantém o céu).
+        row_distance (numpy.ndarray): Distância até o chão de cada linha abaixo do
+            horizonte, ao longo do eixo da câmera.
+        pixels (int): Quantidade de pixels escritos no último frame.
+    """
+    def __init__(self, floor, screen, ceiling=None):
+        """Extração dos pixels das texturas.
+
+        Args:
+            floor (pygame.Surface): Textura do chão.
+            screen (pygame.Surface): Superfície de destino (formato de pixel).
+            ceiling (pygame.Surface): Textura do teto (``None`` mantém o céu).
+        """
+        self.size = settings.FLOOR_TEXTURE_SIZE
+        self.floor = None
+        self.ceiling = None
+        self.set_texture('floor', floor, screen)
+        if ceiling is not None:
+            self.set_texture('ceiling', ceiling, screen)
+        self.row_distance = None
+        self.pixels = 0
+        self._rows_key = None
+        self._rays_key = None
+        self._directions = None
+
+    def set_texture(self, plane, surface, screen):
+        """Extrai (ou substitui) os pixels da textura de um plano.
+
+        Args:
+            plane (str): ``'floor'`` ou ``'ceiling'``.
+            surface (pygame.Surface): Textura do plano.
+            screen (pygame.Surface): Superfície de destino (formato de pixel).
+        """
+        if surface.get_size() != (self.size, self.size):
+            surface = pygame.transform.scale(surface, (self.size, self.size))
+        setattr(self, plane, pygame.surfarray.array2d(surface.convert(screen)).ravel())
+
+    def rows(self, view):
+        """Retorna a tabela de distâncias das linhas abaixo do horizonte.
+
+        Args:
+            view (loveiswar.quality.View): Resolução em uso.
+
+        Returns:
+            numpy.ndarray: Distância até o chão de cada linha (a partir do horizonte).
+        """
+        key = (view.height, view.screen_dist)
+        if key != self._rows_key:
+            # A wall of height 1 seen by a camera at height 0.5 projects screen_dist / depth
+            rows = np.arange(view.height - view.half_height, dtype=np.float32)
+            self.row_distance = 0.5 * view.screen_dist / (rows + 0.5)
+            self._rows_key = key
+        return self.row_distance
+
+    def directions(self, angle, view):
+        """Retorna a direção de cada `ray`, dividida pela correção de `fisheye`.
+
+        Multiplicada pela distância de uma linha, resulta no deslocamento no mapa
+        (a partir do player) do pixel dessa linha em cada `ray`.
+
+        Args:
+            angle (float): Ângulo do player.
+            view (loveiswar.quality.View): Resolução em uso.
+
+        Returns:
+            tuple: Componentes ``(x, y)`` da direção de cada `ray`.
+        """
+        key = (angle, view.num_rays, view.delta_angle)
+        if key != self._rays_key:
+            ray_angles = angle - settings.HALF_FOV + 0.0001 + np.arange(view.num_rays) * view.delta_angle
+            correction = np.cos(angle - ray_angles)
+            self._directions = ((np.cos(ray_angles) / correction).astype(np.float32),
+                                (np.sin(ray_angles) / correction).astype(np.float32))
+            self._rays_key = key
+        return self._directions
+
+    def lookup(self, texels, pos, distance, dx, dy):
+        """Lê os texels dos pixels a uma distância e direção do player.
+
+        Args:
+            texels (numpy.ndarray): Pixels de uma textura (:py:attr:`floor` ou :py:attr:`ceiling`).
+            pos (tuple): Posição ``(x, y)`` do player.
+            distance (numpy.ndarray): Distância de cada pixel (ver :py:attr:`row_distance`).
+            dx (numpy.ndarray): Componente 'X' da direção de cada pixel.
+            dy (numpy.ndarray): Componente 'Y' da direção de cada pixel.
+
+        Returns:
+            numpy.ndarray: Texel de cada pixel, no formato da tela.
+        """
+        # One texture repeat per map cell
+        u = ((pos[0] + distance * dx) * self.size).astype(np.int32) & (self.size - 1)
+        v = ((pos[1] + distance * dy) * self.size).astype(np.int32) & (self.size - 1)
+        return np.take(texels, u * self.size + v)
+
+    def draw(self, screen, view, pos, angle, tops, bottoms):
+        """Escreve os pixels visíveis do chão (e do teto) na tela.
+
+        Args:
+            screen (pygame.Surface): Superfície de destino.
+            view (loveiswar.quality.View): Resolução em uso.
+            pos (tuple): Posição ``(x, y)`` do player.
+            angle (float): Ângulo do player.
+            tops (numpy.ndarray): Primeira linha coberta pela parede de cada `ray`.
+            bottoms (numpy.ndarray): Linha seguinte à última coberta pela parede de cada `ray`.
+        """
+        width, height = screen.get_size()
+        scale = view.scale
+        rays = min(len(tops), width // scale)
+        distance = self.rows(view)
+        dx, dy = self.directions(angle, view)
+        horizon = height // 2
+
+        pixels = pygame.surfarray.pixels2d(screen)
+        columns = pixels[:rays * scale].reshape(rays, scale, height)
+        self.pixels = 0
+        # Floor rows start at the wall bottom, ceiling rows (counted upwards) above its top
+        planes = [(self.floor, bottoms[:rays] - horizon, 1, height - horizon)]
+        if self.ceiling is not None:
+            planes.append((self.ceiling, horizon - tops[:rays], -1, horizon))
+        # Columns past the last ray have no wall: they are cast along the next ray
+        bare = min(rays, len(dx) - 1) if rays * scale < width else None
+        for texels, start, direction, count in planes:
+            visible = np.arange(count)[None, :] >= start[:, None]
+            ray, row = np.nonzero(visible)
+            if ray.size:
+                y = horizon + row if direction > 0 else horizon - 1 - row
+                columns[ray, :, y] = self.lookup(texels, pos, distance[row], dx[ray], dy[ray])[:, None]
+                self.pixels += ray.size * scale
+            if bare is not None:
+                row = np.arange(count)
+                y = horizon + row if direction > 0 else horizon - 1 - row
+                pixels[rays * scale:, y] = self.lookup(texels, pos, distance[row], dx[bare], dy[bare])[None, :]
+                self.pixels += (width - rays * scale) * count
+        del columns, pixels
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Renderização vetorizada direto nos pixels da tela (`surfarray`).
+
+Esse módulo apresenta a classe :py:class:`loveiswar.framebuffer.FramebufferWallRenderer`,
+alternativa à renderização de paredes coluna a coluna de
+:py:meth:`loveiswar.object_renderer.ObjectRenderer.render_game_objects`.
+"""
+
+import numpy as np
+import pygame
+
+from loveiswar import settings
+
+class FramebufferWallRenderer:
+    """Renderiza a camada de paredes com uma única leitura vetorizada das texturas.
+
+    As texturas de parede são extraídas uma única vez para uma matriz
+    ``(textura, u, v)`` de pixels já no formato da tela. A cada frame, a posição
+    na textura de todos os pixels cobertos por paredes é calculada a partir da
+    textura, do deslocamento e da altura projetada de cada `ray`, e o resultado é
+    escrito de uma só vez nos pixels da tela (``pygame.surfarray.pixels2d``).
+
+    Attributes:
+        size (int): Tamanho em pixels das texturas extraídas.
+        texels (numpy.ndarray): Pixels das texturas no formato ``(textura, u, v)``,
+            indexados pelo id da textura.
+    """
+    def __init__(self, textures, screen):
+        """Extração dos pixels das texturas.
+
+        Args:
+            textures (dict): Texturas de parede indexadas pelo id da textura.
+            screen (pygame.Surface): Superfície de destino, cujo formato de pixel
+                é utilizado na extração.
+        """
+        self.size = settings.TEXTURE_SIZE
+        self.texels = np.zeros((max(textures) + 1, self.size, self.size), dtype=np.uint32)
+        for texture, surface in textures.items():
+            self.set_texture(texture, surface, screen)
+        # Render targets are never taller than the display
+        self.rows = np.arange(settings.HEIGHT, dtype=np.float32)
+
+    def set_texture(self, texture, surface, screen):
+        """Extrai (ou substitui) os pixels de uma textura.
+
+        Args:
+            texture (int): Id da textura.
+            surface (pygame.Surface): Textura de parede.
+            screen (pygame.Surface): Superfície de destino (formato de pixel).
+        """
+        self.texels[texture] = pygame.surfarray.array2d(surface.convert(screen))
+
+    def draw(self, screen, projection_heights, textures, offsets, scale=settings.SCALE):
+        """Escreve todas as colunas de parede nos pixels da tela.
+
+        O cálculo é feito sobre a matriz ``(ray, linha)`` da tela: cada linha coberta
+        pela parede de uma `ray` recebe o texel correspondente, e as demais mantêm o
+        que já estava na tela (plano de fundo).
+
+        Args:
+            screen (pygame.Surface): Superfície de destino.
+            projection_heights (numpy.ndarray): Altura projetada de cada `ray`.
+            textures (numpy.ndarray): Id da textura de cada `ray`.
+            offsets (numpy.ndarray): Deslocamento horizontal (0 a 1) de cada `ray`.
+            scale (int): Largura em pixels de cada `ray`.
+        """
+        size = self.size
+        width, height = screen.get_size()
+        # Rays past the right edge of the surface are not drawn
+        rays = min(len(projection_heights), width // scale)
+        projection_heights = projection_heights[:rays].astype(np.float32)
+
+        top = height // 2 - projection_heights / 2
+        # Only the band of rows reached by the tallest wall is processed
+        first = int(max(0, top.min()))
+        last = int(min(height, np.ceil(height - top.min())))
+        v = (self.rows[first:last] - top[:, None]) * (size / projection_heights)[:, None]
+        covered = (v >= 0) & (v < size)
+        v = v.astype(np.int32)
+        np.clip(v, 0, size - 1, out=v)
+
+        u = (offsets[:rays] * (size - scale)).astype(np.int32) // scale * scale
+        v += ((textures[:rays].astype(np.int32) * size + u) * size)[:, None]
+        wall = np.take(self.texels.reshape(-1), v)
+
+        pixels = pygame.surfarray.pixels2d(screen)
+        columns = pixels[:rays * scale, first:last].reshape(rays, scale, -1)
+        np.copyto(columns, wall[:, None, :], where=covered[:, None, :])
+        del columns, pixels
@@ -9,8 +9,11 @@ no caso de execução.
 	.. todo:: Opção de linha de comando para alterar a visibilidade para modo 2D.
 """
 
+import os
 import pygame
 import sys
+import time
+from collections import deque
 from pygame.locals import *
 
 from loveiswar import settings
@@ -19,6 +22,13 @@ from loveiswar import player
 from loveiswar import raycasting
 from loveiswar import object_renderer
 from loveiswar import sprite_object
+from loveiswar import profiler
+from loveiswar import assets
+from loveiswar import animation
+from loveiswar import atlas
+from loveiswar import quality
+from loveiswar import minimap
+from loveiswar import pipeline
 
 class Game:
     """Representação da montagem e atualização de todo o contexto do jogo.
@@ -30,17 +40,53 @@ class Game:
 
     Attributes:
     	screen (pygame.Surface): Estrutura de controle do `display` do pygame.
+        view (loveiswar.quality.View): Parâmetros de renderização do nível de
+        	qualidade em uso (resolução interna, `rays`, escala).
+        target (pygame.Surface): Superfície de renderização interna, do tamanho de
+        	:py:attr:`view` (a própria :py:attr:`screen` em resolução nativa).
+        quality (loveiswar.quality.QualityController): Controle adaptativo da
+        	resolução dinâmica.
+        work_time (float): Tempo de trabalho do último frame, sem a espera do
+        	`framerate` (segundos, ``None`` até o primeiro frame).
+        headless (bool): Define se o jogo roda sem display (a entrada do player
+        	não é lida).
         clock (pygame.time.Clock): Objeto utilizado para controle de tempo.
-        dt (int): delta-time.
+        fps (int): Limite de frames por segundo do clock (``0`` sem limite).
+        dt (float): delta-time, duração (ms) de cada passo de simulação
+        	(:py:data:`loveiswar.settings.TICK_TIME`).
+        frame_time (int): Duração (ms) do último frame, medida pelo clock.
+        accumulator (float): Tempo (ms) ainda não simulado, menor que um passo.
+        alpha (float): Fração (0 a 1) do próximo passo já decorrida, utilizada na
+        	interpolação da pose do player.
+        ticks (int): Quantidade de passos de simulação executados.
+        latency (collections.deque): Tempo (segundos) entre a leitura da pose e a
+        	exibição de cada frame.
         map (loveiswar.map.Map): Controle e desenho do mapa.
+        minimap (loveiswar.minimap.Minimap): Minimapa ao redor do player.
         player (loveiswar.player.Player): Objeto de controle do `player`.
         raycasting (loveiswar.raycasting.RayCasting): Objeto de controle
         	do sistema de raycasting.
-        static_sprite (loveiswar.sprite_object.SpriteObject): Objeto de
-        	controle e desenho de sprites.
+        sprite_manager (loveiswar.sprite_object.SpriteManager): Objeto de
+        	controle e desenho dos sprites estáticos.
+        pipeline (loveiswar.pipeline.RenderPipeline): Cálculo do próximo frame em
+        	paralelo ao desenho (``None`` no loop serial, ver
+        	:py:data:`loveiswar.settings.PIPELINE`).
+        profiler (loveiswar.profiler.FrameProfiler): Medição das etapas de cada frame.
+        assets (loveiswar.assets.AssetLoader): Carregamento das texturas e imagens
+        	em segundo plano.
+        atlas (loveiswar.atlas.Atlas): Atlas de sprites (``None`` caso o manifesto
+        	não tenha sido gerado).
+        animation_frames (loveiswar.animation.FrameStore): Quadros de animação
+        	compartilhados entre os sprites animados.
+        animation_clock (loveiswar.animation.AnimationClock): Relógio de todas as
+        	animações do jogo.
+        start_time (float): Instante (``time.perf_counter``) do início da inicialização.
+        startup_time (float): Tempo de inicialização do jogo, em segundos.
+        first_frame_time (float): Tempo entre o início da inicialização e o fim do
+            primeiro frame desenhado, em segundos (``None`` até o primeiro frame).
         
     """
-    def __init__(self):
+    def __init__(self, headless=False):
         """Inicialização do pygame e configurações básicas do contexto da janela.
 
         As definições de display feitas no construtor são orientadas pelo módulo
@@ -48,19 +94,48 @@ class Game:
         e :py:data:`loveiswar.settings.FULLSCREEN`. Todos os outros objetos
         utilizados pela classe para controlar o contexto do jogo também utilizam
         esse mesmo módulo para orientar suas definições.
+
+        Args:
+            headless (bool): Utiliza o driver de vídeo ``dummy`` do SDL e uma janela
+                (não `fullscreen`) de :py:data:`loveiswar.settings.RES`, permitindo
+                executar o jogo sem display (ver :py:mod:`loveiswar.bench`).
         """
+        self.start_time = time.perf_counter()
+        self.first_frame_time = None
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
         pygame.init()
         pygame.mouse.set_visible(False)
 
-        self.screen = pygame.display.set_mode(settings.RES, pygame.FULLSCREEN)
+        self.screen = pygame.display.set_mode(settings.RES, 0 if headless else pygame.FULLSCREEN)
         """pygame.display: Inicialização do display pygame, destruindo quaisquer
         	outros que possivelmente existam (importante para isolar o contexto
         	pygame do jogo de outras instâncias do pygame - é o procedimento
         	padrão)."""
+        # Sheets converted for a previous display are stale
+        sprite_object.SpriteSheet.clear_cache()
         
+        self.headless = headless
         self.clock = pygame.time.Clock()
-        self.dt = 1
+        self.fps = settings.FPS
+        self.dt = settings.TICK_TIME
+        self.frame_time = 0
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.ticks = 0
+        self.latency = deque(maxlen=settings.PROFILER_WINDOW)
+        self._scene_input = None
+        self._drawn_input = None
+        self.view = quality.View(*settings.QUALITY_LEVELS[0])
+        self.target = self.screen
+        self.quality = quality.QualityController(self)
+        self.work_time = None
+        self._tick_end = None
+        self.profiler = profiler.FrameProfiler()
+        self.assets = assets.AssetLoader()
         self.new_game()
+        self.startup_time = time.perf_counter() - self.start_time
         
     def new_game(self):
         """Atribuição dos objetos auxiliares do jogo à classe.
@@ -72,46 +147,236 @@ class Game:
         """
         self.map = map.Map(self)
         self.player = player.Player(self)
+        self.minimap = minimap.Minimap(self)
+        self.atlas = atlas.Atlas.load()
+        self.animation_frames = animation.FrameStore(self.assets, self.atlas)
+        self.animation_clock = animation.AnimationClock()
         self.object_renderer = object_renderer.ObjectRenderer(self)
         self.raycasting = raycasting.RayCasting(self)
-        self.static_sprite = sprite_object.SpriteObject(self, path='assets/sprites/static/real_heart.png', pos=(10.5, 3.5), scale=0.5)
+        self.sprite_manager = sprite_object.SpriteManager(self)
+        self.sprite_manager.add('assets/sprites/static/real_heart.png', (10.5, 3.5), scale=0.5)
+        self.pipeline = None
+        self.set_pipeline(settings.PIPELINE)
+
+    def set_pipeline(self, enabled):
+        """Alterna entre o loop serial e o loop com :py:class:`loveiswar.pipeline.RenderPipeline`.
+
+        Args:
+            enabled (bool): Calcula o próximo frame em paralelo ao desenho.
+        """
+        if enabled and self.pipeline is None:
+            self.pipeline = pipeline.RenderPipeline(self)
+        elif not enabled and self.pipeline is not None:
+            self.pipeline.close()
+            self.pipeline = None
+
+    def set_view(self, resolution, scale):
+        """Altera a resolução interna de renderização e a largura de cada `ray`.
+
+        Em resolução nativa, a renderização é feita direto na tela; nas demais, em
+        uma superfície intermediária escalonada para a tela em :py:meth:`draw`.
+
+        Args:
+            resolution (float): Proporção da resolução interna em relação a
+                :py:data:`loveiswar.settings.RES`.
+            scale (int): Largura em pixels de cada `ray`.
+        """
+        self.view.set(resolution, scale)
+        if self.view.size == self.screen.get_size():
+            self.target = self.screen
+        elif self.target.get_size() != self.view.size:
+            self.target = pygame.Surface(self.view.size, 0, self.screen)
+        self.object_renderer.screen = self.target
     
+    def simulate(self, elapsed):
+        """Avança a simulação em passos fixos de :py:data:`loveiswar.settings.TICK_TIME`.
+
+        O tempo decorrido é somado ao :py:attr:`accumulator`, e cada passo completo
+        é simulado com a mesma duração, independente do framerate (frames longos
+        resultam em mais passos, não em passos maiores). O player é então
+        posicionado entre os dois últimos passos, na fração :py:attr:`alpha` do
+        próximo passo, para o desenho do frame.
+
+        Args:
+            elapsed (float): Tempo (ms) decorrido desde a última chamada.
+
+        Returns:
+            int: Quantidade de passos simulados.
+        """
+        self.player.begin_steps()
+        self.accumulator += min(elapsed, settings.MAX_TICKS_PER_FRAME * settings.TICK_TIME)
+        steps = 0
+        # Tolerates the rounding of summed frame times
+        while self.accumulator >= settings.TICK_TIME - 1e-9:
+            self.player.step(settings.TICK_TIME)
+            self.accumulator -= settings.TICK_TIME
+            steps += 1
+        self.ticks += steps
+        self.accumulator = max(self.accumulator, 0.0)
+        self.alpha = self.accumulator / settings.TICK_TIME
+        self.player.interpolate(self.alpha)
+        return steps
+
     def update(self):
         """Realiza a atualização plana de todos os objetos fundamentais.
 
-        Esse método chama os métodos `update` dos objetos construidos na inicialização
-        do jogo e realiza as operações de atualização de display e tempo do pygame.
+        Esse método lê a entrada, avança a simulação (:py:meth:`simulate`) pelo tempo
+        do frame anterior, chama os métodos `update` dos objetos de renderização
+        (:py:meth:`update_scene`, ou :py:meth:`loveiswar.pipeline.RenderPipeline.update`
+        com :py:attr:`pipeline`) e realiza as operações de atualização de display
+        e tempo do pygame. O nível de qualidade é ajustado no início do frame, antes
+        de qualquer cálculo de renderização, a partir do tempo de trabalho do frame
+        anterior.
         """
-        self.player.update()
-        self.raycasting.update()
-        self.static_sprite.update()
-        pygame.display.flip()
+        if self.work_time is not None:
+            self.quality.record(self.work_time)
+        if self.profiler.enabled:
+            self.profiler.gauge('quality', self.quality.level)
+            self.profiler.gauge('rays', self.view.num_rays)
+            self.profiler.gauge('ray_reuse', f"{self.raycasting.reuse_stats()['hit_rate']:.0%}")
+        with self.profiler.stage('assets'):
+            self.assets.poll()
+        with self.profiler.stage('player'):
+            if not self.headless:
+                self.player.read_input()
+            steps = self.simulate(self.frame_time)
+        self.profiler.gauge('ticks', steps)
+        if self.pipeline is None:
+            self._scene_input = time.perf_counter()
+            self.update_scene()
+        else:
+            with self.profiler.stage('map'):
+                self.map.update()
+            self._scene_input = self.pipeline.update().input_time
+        with self.profiler.stage('flip'):
+            pygame.display.flip()
+        # The flip shows the frame drawn after the previous update
+        if self._drawn_input is not None:
+            self.latency.append(time.perf_counter() - self._drawn_input)
+            self.profiler.gauge('latency_ms', round(self.latency[-1] * 1000, 1))
         
-        self.dt = self.clock.tick(settings.FPS)
-        """int: Definição do `delta-time` (milissegundos) através do framerate
+        tick_start = time.perf_counter()
+        if self._tick_end is not None:
+            self.work_time = tick_start - self._tick_end
+        with self.profiler.stage('tick'):
+            self.frame_time = self.clock.tick(self.fps)
+        """int: Duração (milissegundos) do frame, através do framerate
         	anteriormente definido (limitação do tempo de execução).
         """
+        self._tick_end = time.perf_counter()
         
         pygame.display.set_caption(f'{self.clock.get_fps() :.1f}')
+
+    def update_scene(self):
+        """Atualiza o mapa, o `raycasting` e os sprites para a pose desenhada do player."""
+        with self.profiler.stage('map'):
+            self.map.update()
+        with self.profiler.stage('raycast'):
+            self.raycasting.update()
+        with self.profiler.stage('sprites'):
+            self.animation_clock.update()
+            self.sprite_manager.update()
         
     def draw(self):
-        """Renderiza definições básicas do display e as que serão sobrepostas. """
+        """Renderiza definições básicas do display e as que serão sobrepostas.
+
+        Abaixo da resolução nativa, a cena é escalonada para a tela antes das
+        sobreposições (minimapa, progresso de carregamento e `overlay` do profiler).
+        """
         # self.screen.fill('black')
+        self._drawn_input = self._scene_input
         self.object_renderer.draw()
-        #self.map.draw()
-        #self.player.draw()
+        if self.target is not self.screen:
+            with self.profiler.stage('upscale'):
+                pygame.transform.scale(self.target, self.screen.get_size(), self.screen)
+        if self.minimap.enabled:
+            with self.profiler.stage('minimap'):
+                self.map.draw()
+        self.assets.draw_progress(self.screen)
+        self.profiler.draw_overlay(self.screen)
         
+    def startup_report(self):
+        """Resume o tempo de inicialização do jogo.
+
+        Returns:
+            dict: Tempo de inicialização e até o primeiro frame (ms), os contadores
+                do cache de texturas (:py:class:`loveiswar.texture_cache.TextureCache`),
+                o carregamento do mapa (:py:meth:`loveiswar.map.Map.stats`) e o
+                carregamento dos `assets` (:py:meth:`loveiswar.assets.AssetLoader.report`).
+        """
+        return {
+            'startup_ms': self.startup_time * 1000,
+            'first_frame_ms': self.first_frame_time * 1000 if self.first_frame_time is not None else None,
+            'texture_cache': self.object_renderer.texture_cache.stats(),
+            'map': self.map.stats(),
+            'assets': self.assets.report(),
+        }
+
+    def run_headless(self, seconds, frame_ticks=0):
+        """Simula ``seconds`` de jogo o mais rápido possível, sem esperar o clock.
+
+        Sem display, a entrada do player não é lida: os passos utilizam
+        :py:attr:`loveiswar.player.Player.keys` e :py:attr:`loveiswar.player.Player.turn`
+        definidos pelo chamador.
+
+        Args:
+            seconds (float): Tempo de jogo simulado, em segundos.
+            frame_ticks (int): Atualiza e desenha a cena a cada ``frame_ticks``
+                passos (``0`` apenas simula).
+
+        Returns:
+            dict: Passos e frames executados, tempo simulado e real (ms), passos
+                por segundo e a razão entre o tempo simulado e o real.
+        """
+        ticks = round(seconds * 1000 / settings.TICK_TIME)
+        frames = 0
+        start = time.perf_counter()
+        for tick in range(1, ticks + 1):
+            self.simulate(settings.TICK_TIME)
+            if frame_ticks and tick % frame_ticks == 0:
+                self.update_scene()
+                self.draw()
+                frames += 1
+        elapsed = time.perf_counter() - start
+        return {
+            'ticks': ticks,
+            'frames': frames,
+            'sim_ms': ticks * settings.TICK_TIME,
+            'wall_ms': elapsed * 1000,
+            'ticks_per_second': ticks / elapsed if elapsed else float('inf'),
+            'realtime_factor': ticks * settings.TICK_TIME / (elapsed * 1000) if elapsed else float('inf'),
+        }
+
     def check_events(self):
         """Verifica os eventos gerais do `display` e chama os métodos necessários. """
         for event in pygame.event.get():
             if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
                 pygame.quit()
                 sys.exit()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.profiler.overlay = not self.profiler.overlay
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
+                self.minimap.enabled = not self.minimap.enabled
     
     def run(self):
         """Loop principal do jogo. Roda as ações de atualização e renderização do
         	jogo até o evento de saída."""
+        assets_reported = False
         while True:
             self.check_events()
             self.update()
             self.draw()
+            if self.first_frame_time is None:
+                self.first_frame_time = time.perf_counter() - self.start_time
+                report = self.startup_report()
+                print(f"Primeiro frame em {report['first_frame_ms']:.0f} ms "
+                      f"(texturas do cache: {report['texture_cache']['hits']}, "
+                      f"decodificadas: {report['texture_cache']['misses']})")
+            if not assets_reported and self.assets.ready_time is not None:
+                assets_reported = True
+                report = self.assets.report()
+                timings = ', '.join(f'{name} {ms:.0f} ms' for name, ms in report['timings'].items())
+                print(f"Assets carregados em {report['ready_ms']:.0f} ms "
+                      f"({report['workers']} threads): {timings}")
+            self.profiler.end_frame({'pos': self.player.pos, 'angle': self.player.angle,
+                                     'quality': self.quality.level})
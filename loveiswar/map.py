@@ -2,7 +2,14 @@
 # Copyright (c) MIT
 # Lucas Zunho <lucaszunho17@gmail.com>
 
-import pygame
+import math
+import time
+import numpy as np
+from collections.abc import Mapping
+
+from loveiswar import settings
+from loveiswar.mapfile import MapFile
+from loveiswar.streaming import ChunkStreamer
 
 _ = False
 mini_map = [
@@ -21,6 +28,41 @@ mini_map = [
     :meta hide-value:
 """
 
+class WorldMapView(Mapping):
+    """Visão de compatibilidade da grade do mapa como dicionário ``{(x, y): textura}``.
+
+    Nenhuma cópia é feita: as consultas são repassadas à grade densa do
+    :py:class:`loveiswar.map.Map`, portanto a visão acompanha qualquer alteração
+    no mapa. Células vazias (``0``) ou fora dos limites não fazem parte da visão.
+    Em mapas carregados de arquivo, a iteração percorre apenas a grade residente
+    ao redor do player.
+
+    Attributes:
+        map (loveiswar.map.Map): Mapa consultado pela visão.
+    """
+    def __init__(self, world):
+        """Args:
+            world (loveiswar.map.Map): Mapa com a grade densa a ser consultada.
+        """
+        self.map = world
+
+    def __getitem__(self, pos):
+        value = self.map.get(*pos)
+        if not value:
+            raise KeyError(pos)
+        return value
+
+    def __contains__(self, pos):
+        return bool(self.map.get(*pos))
+
+    def __iter__(self):
+        ox, oy = self.map.origin
+        for y, x in np.argwhere(self.map.grid):
+            yield int(x) + ox, int(y) + oy
+
+    def __len__(self):
+        return int(np.count_nonzero(self.map.grid))
+
 class Map:
     """Representação de mapa do jogo com sua interface de renderização.
 
@@ -29,42 +71,282 @@ class Map:
     a quaisquer eventuais atualizações que o usuário possa fazer em relação
     ao mapa do jogo pelo andamento da história do mesmo.
 
+    O mapa é o embutido (:py:data:`mini_map`) ou um arquivo binário
+    (:py:mod:`loveiswar.mapfile`) de qualquer tamanho. Neste caso, apenas os
+    blocos ao redor do player formam a grade densa (:py:attr:`grid`), e os demais
+    são lidos sob demanda por um :py:class:`loveiswar.streaming.ChunkStreamer`.
+
     Attributes:
     	game (loveiswar.main.Game): Objeto `Game` do contexto em execução.
         mini_map (int matrix):Representação do mapa e suas texturas.
-        world_map (int list): Representação do mapa e suas texturas com um index
-        	de tuplas para representar suas coordenadas.
+        width (int): Quantidade de colunas do mapa.
+        height (int): Quantidade de linhas do mapa.
+        cells (bytearray): Grade densa do mapa (ou da região residente), linha a
+            linha (``y * largura + x``), com o id da textura de cada célula
+            (``0`` para células vazias).
+        grid (numpy.ndarray): Visão ``(linhas, colunas)`` em `uint8` da mesma memória
+            de :py:attr:`cells`, para consultas vetorizadas.
+        origin (tuple): Coordenadas ``(x, y)`` do mapa da célula ``(0, 0)`` de
+            :py:attr:`grid` (``(0, 0)`` no mapa embutido).
+        world_map (loveiswar.map.WorldMapView): Visão de compatibilidade do mapa
+            como dicionário de tuplas ``(x, y)`` para texturas.
+        load_time (float): Tempo (segundos) de carregamento do mapa.
+        map_file (loveiswar.mapfile.MapFile): Arquivo do mapa (``None`` no mapa embutido).
+        streamer (loveiswar.streaming.ChunkStreamer): Blocos residentes do arquivo
+            (``None`` no mapa embutido).
+        version (int): Quantidade de alterações feitas no mapa (ver :py:meth:`set`).
+        listeners (list): Funções ``listener(x, y, value)`` chamadas a cada célula
+            alterada (ex.: :py:meth:`loveiswar.minimap.Minimap.mark_dirty`).
     """
-    def __init__(self, game):
+    def __init__(self, game, grid=None):
         """Atribuição das variáveis do atual contexto do jogo e indexação do
-        	mapa alvo.
+        	mapa alvo (:py:data:`loveiswar.settings.MAP_PATH` ou o mapa embutido).
 
         Args:
         	game (loveiswar.main.Game): Obj. `Game` em execução.
+            grid (numpy.ndarray): Grade do mapa inteiro já carregada, utilizada
+            	no lugar do mapa alvo (ver :py:meth:`load_grid`).
         """
         self.game = game
         self.mini_map = mini_map
-        self.world_map = {}
-        self.get_map()
+        self.world_map = WorldMapView(self)
+        self.origin = (0, 0)
+        self.map_file = None
+        self.streamer = None
+        self.version = 0
+        self.listeners = []
+        start = time.perf_counter()
+        if grid is not None:
+            self.load_grid(grid)
+        elif settings.MAP_PATH:
+            self.open(settings.MAP_PATH)
+        else:
+            self.get_map()
+        self.load_time = time.perf_counter() - start
         
     def get_map(self):
         """Indexação do arquivo de mapa.
 
         Transforma a lista de inteiros que representa o mapa e suas texturas em
-        uma lista de inteiros com tuplas como chave, facilitando para o
-        reconhecimento de suas coordenadas.
+        uma grade densa (:py:attr:`cells` e :py:attr:`grid`), permitindo consultas
+        por índice em tempo constante sem a criação de tuplas.
         """
+        self.height = len(self.mini_map)
+        self.width = max(len(row) for row in self.mini_map)
+        self.cells = bytearray(self.width * self.height)
         for j, row in enumerate(self.mini_map):
             for i, val in enumerate(row):
                 if val:
-                    self.world_map[(i, j)] = val
-                    
+                    self.cells[j * self.width + i] = val
+        self.grid = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.height, self.width)
+
+    def load_grid(self, grid):
+        """Utiliza uma grade já carregada como o mapa inteiro, sem cópia.
+
+        A grade pode estar em memória compartilhada entre processos (ver
+        :py:class:`loveiswar.env.BatchEnv`).
+
+        Args:
+            grid (numpy.ndarray): Grade ``(linhas, colunas)`` contígua em `uint8`.
+        """
+        self.height, self.width = grid.shape
+        self.grid = grid
+        self.cells = memoryview(grid).cast('B')
+
+    def open(self, path):
+        """Abre um arquivo de mapa e carrega a região ao redor da posição inicial do player.
+
+        Apenas o cabeçalho do arquivo é lido; a grade residente tem tamanho fixo
+        (:py:data:`loveiswar.settings.MAP_WINDOW_RADIUS`), independente do
+        tamanho do mapa.
+
+        Args:
+            path (str): Arquivo de mapa.
+        """
+        self.map_file = MapFile(path)
+        self.streamer = ChunkStreamer(self.map_file)
+        self.width, self.height = self.map_file.width, self.map_file.height
+        self.chunk_size = self.map_file.chunk_size
+        side = (2 * settings.MAP_WINDOW_RADIUS + 1) * self.chunk_size
+        self.cells = bytearray(side * side)
+        self.grid = np.frombuffer(self.cells, dtype=np.uint8).reshape(side, side)
+        self._center = None
+        self._last_pos = settings.PLAYER_POS
+        self.load_window(self.chunk_at(*settings.PLAYER_POS))
+
+    def chunk_at(self, x, y):
+        """Retorna o bloco que contém uma posição do mapa.
+
+        Args:
+            x (float): Coordenada 'X'.
+            y (float): Coordenada 'Y'.
+
+        Returns:
+            tuple: Bloco ``(cx, cy)``.
+        """
+        return int(x) // self.chunk_size, int(y) // self.chunk_size
+
+    def window_chunks(self, center):
+        """Lista os blocos da grade residente ao redor de um bloco.
+
+        Args:
+            center (tuple): Bloco ``(cx, cy)`` central.
+
+        Returns:
+            tuple list: Blocos ``(cx, cy)`` da grade, linha a linha.
+        """
+        radius = settings.MAP_WINDOW_RADIUS
+        return [(center[0] + dx, center[1] + dy)
+                for dy in range(-radius, radius + 1) for dx in range(-radius, radius + 1)]
+
+    def load_window(self, center):
+        """Monta a grade residente ao redor de um bloco.
+
+        Args:
+            center (tuple): Bloco ``(cx, cy)`` central.
+        """
+        radius = settings.MAP_WINDOW_RADIUS
+        size = self.chunk_size
+        x0, y0 = (center[0] - radius) * size, (center[1] - radius) * size
+        for cx, cy in self.window_chunks(center):
+            x, y = cx * size - x0, cy * size - y0
+            self.grid[y:y + size, x:x + size] = self.streamer.get(cx, cy)
+        self.origin = (x0, y0)
+        self._center = center
+
+    def update(self):
+        """Acompanha o player em mapas de arquivo.
+
+        A grade residente é remontada quando o player muda de bloco, e os blocos
+        das próximas grades no sentido do movimento são lidos antecipadamente
+        (:py:data:`loveiswar.settings.MAP_PREFETCH_CHUNKS`).
+        """
+        if self.streamer is None:
+            return
+        x, y = self.game.player.pos
+        center = self.chunk_at(x, y)
+        if center != self._center:
+            self.load_window(center)
+
+        dx, dy = x - self._last_pos[0], y - self._last_pos[1]
+        self._last_pos = (x, y)
+        length = math.hypot(dx, dy)
+        if not length:
+            return
+        ahead = []
+        for step in range(1, settings.MAP_PREFETCH_CHUNKS + 1):
+            target = (center[0] + round(dx / length * step), center[1] + round(dy / length * step))
+            ahead += self.window_chunks(target)
+        self.streamer.prefetch(ahead)
+
+    def stats(self):
+        """Resume o carregamento do mapa.
+
+        Returns:
+            dict: Arquivo, tamanho do mapa, tempo de carregamento (ms), bytes da
+                grade residente e, em mapas de arquivo, o uso dos blocos
+                (:py:meth:`loveiswar.streaming.ChunkStreamer.stats`).
+        """
+        return {
+            'path': self.map_file.path if self.map_file else None,
+            'size': [self.width, self.height],
+            'load_ms': self.load_time * 1000,
+            'grid_bytes': len(self.cells),
+            'chunks': self.streamer.stats() if self.streamer else None,
+        }
+
+    def close(self):
+        """Encerra a leitura dos blocos e fecha o arquivo do mapa, se houver."""
+        if self.streamer is not None:
+            self.streamer.close()
+            self.streamer = None
+
+    def get(self, x, y):
+        """Retorna a textura da célula ``(x, y)`` do mapa.
+
+        Args:
+            x (int): Coluna da célula.
+            y (int): Linha da célula.
+
+        Returns:
+            int: Id da textura da célula, ou ``0`` caso ela esteja vazia ou fora
+                dos limites do mapa.
+        """
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return 0
+        if self.streamer is None:
+            return self.cells[y * self.width + x]
+        height, width = self.grid.shape
+        gx, gy = x - self.origin[0], y - self.origin[1]
+        if 0 <= gx < width and 0 <= gy < height:
+            return self.cells[gy * width + gx]
+        return int(self.streamer.get(x // self.chunk_size, y // self.chunk_size)[y % self.chunk_size, x % self.chunk_size])
+
+    def set(self, x, y, value):
+        """Altera a textura de uma célula do mapa.
+
+        Único ponto de alteração do mapa durante o jogo: a grade residente e, em
+        mapas de arquivo, o bloco da célula são atualizados, :py:attr:`version` é
+        incrementado (invalidando o último `raycasting`) e os :py:attr:`listeners`
+        são avisados.
+
+        Args:
+            x (int): Coluna da célula.
+            y (int): Linha da célula.
+            value (int): Id da textura da célula (``0`` para esvaziá-la).
+
+        Raises:
+            IndexError: Caso a célula esteja fora dos limites do mapa.
+        """
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f'Célula fora do mapa: ({x}, {y})')
+        if self.get(x, y) == value:
+            return
+        height, width = self.grid.shape
+        gx, gy = x - self.origin[0], y - self.origin[1]
+        if 0 <= gx < width and 0 <= gy < height:
+            self.cells[gy * width + gx] = value
+        if self.streamer is not None:
+            self.streamer.set_cell(x, y, value)
+        self.version += 1
+        for listener in self.listeners:
+            listener(x, y, value)
+
+    def region(self, x, y, width, height):
+        """Copia uma região retangular do mapa.
+
+        Args:
+            x (int): Coluna da primeira célula.
+            y (int): Linha da primeira célula.
+            width (int): Quantidade de colunas.
+            height (int): Quantidade de linhas.
+
+        Returns:
+            numpy.ndarray: Células ``(height, width)`` da região (vazias fora dos
+                limites do mapa).
+        """
+        out = np.zeros((height, width), np.uint8)
+        rows, columns = self.grid.shape
+        gx, gy = x - self.origin[0], y - self.origin[1]
+        if self.streamer is None or (0 <= gx and 0 <= gy and gx + width <= columns and gy + height <= rows):
+            # resident grid: clip to it (the whole map for the built-in one)
+            x0, y0 = max(gx, 0), max(gy, 0)
+            x1, y1 = min(gx + width, columns), min(gy + height, rows)
+            if x0 < x1 and y0 < y1:
+                out[y0 - gy:y1 - gy, x0 - gx:x1 - gx] = self.grid[y0:y1, x0:x1]
+            return out
+        size = self.chunk_size
+        for cy in range(max(y, 0) // size, min(y + height, self.height) // size + 1):
+            for cx in range(max(x, 0) // size, min(x + width, self.width) // size + 1):
+                x0, y0 = max(cx * size, x), max(cy * size, y)
+                x1, y1 = min((cx + 1) * size, x + width), min((cy + 1) * size, y + height)
+                if x0 < x1 and y0 < y1:
+                    chunk = self.streamer.get(cx, cy)
+                    out[y0 - y:y1 - y, x0 - x:x1 - x] = chunk[y0 - cy * size:y1 - cy * size,
+                                                              x0 - cx * size:x1 - cx * size]
+        return out
+
     def draw(self):
-        [pygame.draw.rect(self.game.screen, 'darkgray', (
-            pos[0] * 100,
-            pos[1] * 100, 
-            100, 
-            100
-        ), 2)
-         for pos in self.world_map]
+        """Renderiza o minimapa (ver :py:class:`loveiswar.minimap.Minimap`)."""
+        self.game.minimap.draw(self.game.screen)
         
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Formato binário de mapa dividido em blocos (`chunks`), lido por `mmap`.
+
+Cada plano do mapa (ex.: ``walls`` com o id da textura de parede de cada
+célula) é gravado bloco a bloco, de modo que as células de um bloco ocupam
+uma faixa contígua do arquivo e podem ser lidas sem percorrer o restante do
+mapa. Abrir um mapa lê apenas o cabeçalho; os blocos são copiados do
+mapeamento em memória sob demanda (ver :py:class:`loveiswar.streaming.ChunkStreamer`).
+
+Formato do arquivo (inteiros `little-endian`)::
+
+    cabeçalho  MAGIC, largura, altura (uint32), tamanho do bloco, quantidade de planos (uint16)
+    por plano  nome (8 bytes), bytes por célula (uint8: 1 ou 2), posição dos dados (uint64)
+    dados      blocos de cada plano, linha a linha de blocos, cada bloco com
+               ``tamanho * tamanho`` células linha a linha
+
+Os blocos da borda direita e inferior são completados com células vazias.
+"""
+
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from loveiswar import settings
+
+MAGIC = b'LIWMAP01'
+"""bytes: Identificação (e versão) do formato dos arquivos de mapa."""
+
+_HEADER = struct.Struct('<8sIIHH')
+_PLANE = struct.Struct('<8sB7xQ')
+_ALIGN = 4096
+
+DTYPES = {1: np.uint8, 2: np.uint16}
+"""dict: Tipo das células de um plano, indexado pela quantidade de bytes por célula."""
+
+def write_chunks(path, width, height, planes, chunk, chunk_size=settings.MAP_CHUNK_SIZE):
+    """Grava um mapa bloco a bloco, sem manter o mapa inteiro em memória.
+
+    Args:
+        path (str): Arquivo de destino.
+        width (int): Quantidade de colunas do mapa.
+        height (int): Quantidade de linhas do mapa.
+        planes (dict): Tipo (``numpy.uint8`` ou ``numpy.uint16``) de cada plano,
+            indexado pelo nome do plano (até 8 caracteres ASCII).
+        chunk (callable): Função ``chunk(name, cx, cy)`` que retorna as células
+            ``(chunk_size, chunk_size)`` do bloco ``(cx, cy)`` de um plano.
+        chunk_size (int): Tamanho (células por lado) de cada bloco.
+
+    Raises:
+        ValueError: Caso um plano não seja de 8 ou 16 bits.
+    """
+    chunks_x = -(-width // chunk_size)
+    chunks_y = -(-height // chunk_size)
+    itemsizes = {}
+    for name, dtype in planes.items():
+        itemsize = np.dtype(dtype).itemsize
+        if itemsize not in DTYPES:
+            raise ValueError(f"Plano de mapa com tipo não suportado: '{name}' ({np.dtype(dtype)}).")
+        itemsizes[name] = itemsize
+
+    offset = -(-(_HEADER.size + _PLANE.size * len(planes)) // _ALIGN) * _ALIGN
+    table = []
+    for name, itemsize in itemsizes.items():
+        table.append((name, itemsize, offset))
+        size = chunks_x * chunks_y * chunk_size * chunk_size * itemsize
+        offset += -(-size // _ALIGN) * _ALIGN
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, width, height, chunk_size, len(planes)))
+        for name, itemsize, position in table:
+            f.write(_PLANE.pack(name.encode('ascii'), itemsize, position))
+        for name, itemsize, position in table:
+            f.seek(position)
+            dtype = DTYPES[itemsize]
+            for cy in range(chunks_y):
+                for cx in range(chunks_x):
+                    f.write(np.ascontiguousarray(chunk(name, cx, cy), dtype=dtype).tobytes())
+        f.truncate(offset)
+    os.replace(temporary, path)
+
+def write(path, planes, chunk_size=settings.MAP_CHUNK_SIZE):
+    """Grava um mapa a partir de matrizes completas dos planos.
+
+    Args:
+        path (str): Arquivo de destino.
+        planes (dict): Matriz ``(altura, largura)`` de cada plano, indexada pelo nome.
+        chunk_size (int): Tamanho (células por lado) de cada bloco.
+    """
+    height, width = next(iter(planes.values())).shape
+
+    def chunk(name, cx, cy):
+        cells = np.zeros((chunk_size, chunk_size), planes[name].dtype)
+        block = planes[name][cy * chunk_size:(cy + 1) * chunk_size, cx * chunk_size:(cx + 1) * chunk_size]
+        cells[:block.shape[0], :block.shape[1]] = block
+        return cells
+
+    write_chunks(path, width, height, {name: plane.dtype for name, plane in planes.items()},
+                 chunk, chunk_size)
+
+def generate(path, width, height, seed=0, density=0.08, spawn=settings.PLAYER_POS,
+             chunk_size=settings.MAP_CHUNK_SIZE):
+    """Gera um mapa procedural de qualquer tamanho, para testes de `streaming`.
+
+    O mapa é cercado por paredes e recebe paredes soltas aleatórias (determinísticas
+    para cada bloco), mantendo livre a vizinhança de ``spawn``. O plano ``floor``
+    (16 bits) recebe um id de região por bloco.
+
+    Args:
+        path (str): Arquivo de destino.
+        width (int): Quantidade de colunas do mapa.
+        height (int): Quantidade de linhas do mapa.
+        seed (int): Semente do gerador.
+        density (float): Proporção de células com parede.
+        spawn (tuple): Posição mantida livre (posição inicial do player).
+        chunk_size (int): Tamanho (células por lado) de cada bloco.
+    """
+    chunks_x = -(-width // chunk_size)
+    rows, columns = np.mgrid[0:chunk_size, 0:chunk_size]
+
+    def chunk(name, cx, cy):
+        if name == 'floor':
+            region = (cy * chunks_x + cx) % np.iinfo(np.uint16).max
+            return np.full((chunk_size, chunk_size), region, np.uint16)
+        rng = np.random.default_rng((seed, cx, cy))
+        x, y = columns + cx * chunk_size, rows + cy * chunk_size
+        walls = np.where(rng.random((chunk_size, chunk_size)) < density,
+                         rng.integers(1, 6, (chunk_size, chunk_size)), 0)
+        walls[(x == 0) | (y == 0) | (x == width - 1) | (y == height - 1)] = 1
+        walls[(np.abs(x + 0.5 - spawn[0]) < 2) & (np.abs(y + 0.5 - spawn[1]) < 2)] = 0
+        walls[(x >= width) | (y >= height)] = 0
+        return walls
+
+    write_chunks(path, width, height, {'walls': np.uint8, 'floor': np.uint16}, chunk, chunk_size)
+
+class MapFile:
+    """Arquivo de mapa aberto por `mmap`.
+
+    Attributes:
+        path (str): Caminho do arquivo.
+        width (int): Quantidade de colunas do mapa.
+        height (int): Quantidade de linhas do mapa.
+        chunk_size (int): Tamanho (células por lado) de cada bloco.
+        chunks_x (int): Quantidade de blocos por linha.
+        chunks_y (int): Quantidade de linhas de blocos.
+        planes (dict): Tipo e posição dos dados de cada plano, indexados pelo nome.
+    """
+    def __init__(self, path):
+        """Abertura do arquivo e leitura do cabeçalho.
+
+        Args:
+            path (str): Caminho do arquivo.
+
+        Raises:
+            OSError: Caso o arquivo não exista ou não possa ser lido.
+            ValueError: Caso o arquivo não esteja no formato esperado.
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f'Arquivo de mapa vazio: {path}')
+        try:
+            magic, self.width, self.height, self.chunk_size, count = _HEADER.unpack_from(self._mm)
+            if magic != MAGIC:
+                raise ValueError(f'Arquivo de mapa inválido: {path}')
+            self.chunks_x = -(-self.width // self.chunk_size)
+            self.chunks_y = -(-self.height // self.chunk_size)
+            self.planes = {}
+            for i in range(count):
+                name, itemsize, position = _PLANE.unpack_from(self._mm, _HEADER.size + i * _PLANE.size)
+                size = self.chunks_x * self.chunks_y * self.chunk_size ** 2 * itemsize
+                if itemsize not in DTYPES or position + size > len(self._mm):
+                    raise ValueError(f'Arquivo de mapa truncado: {path}')
+                self.planes[name.rstrip(b'\0').decode('ascii')] = (DTYPES[itemsize], position)
+        except struct.error:
+            self.close()
+            raise ValueError(f'Arquivo de mapa truncado: {path}')
+        except ValueError:
+            self.close()
+            raise
+
+    def chunk(self, name, cx, cy):
+        """Copia as células de um bloco de um plano.
+
+        Apenas as páginas do arquivo ocupadas pelo bloco são lidas.
+
+        Args:
+            name (str): Nome do plano.
+            cx (int): Coluna do bloco.
+            cy (int): Linha do bloco.
+
+        Returns:
+            numpy.ndarray: Células ``(chunk_size, chunk_size)`` do bloco (vazias
+                caso o bloco esteja fora do mapa).
+
+        Raises:
+            KeyError: Caso o plano não exista no arquivo.
+        """
+        dtype, position = self.planes[name]
+        cells = self.chunk_size * self.chunk_size
+        if not (0 <= cx < self.chunks_x and 0 <= cy < self.chunks_y):
+            return np.zeros((self.chunk_size, self.chunk_size), dtype)
+        offset = position + (cy * self.chunks_x + cx) * cells * np.dtype(dtype).itemsize
+        return np.frombuffer(self._mm, dtype, cells, offset).reshape(self.chunk_size, self.chunk_size).copy()
+
+    def close(self):
+        """Fecha o mapeamento e o arquivo."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
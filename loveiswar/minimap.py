@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Minimapa desenhado a partir de superfícies em cache.
+
+Esse módulo apresenta a classe :py:class:`loveiswar.minimap.Minimap`. O mapa é
+desenhado uma única vez em blocos (`tiles`) de :py:data:`loveiswar.settings.MINIMAP_TILE`
+células, guardados em um :py:class:`loveiswar.cache.LRUCache`; a cada frame
+apenas os blocos visíveis ao redor do player são copiados para a tela, com o
+marcador do player por cima. Células alteradas por :py:meth:`loveiswar.map.Map.set`
+são redesenhadas individualmente, de modo que o custo por frame depende do
+tamanho da área visível e da quantidade de células alteradas, não do tamanho
+do mapa.
+"""
+
+import math
+
+import numpy as np
+import pygame
+
+from loveiswar import settings
+from loveiswar.cache import LRUCache, surface_bytes
+
+BACKGROUND = (16, 16, 16)
+"""tuple: Cor das células vazias do minimapa."""
+
+WALL = 'darkgray'
+"""str: Cor das células com parede do minimapa."""
+
+class Minimap:
+    """Minimapa em blocos cacheados, recortado ao redor do player.
+
+    Attributes:
+        game (loveiswar.main.Game): Objeto `Game` do contexto em execução.
+        enabled (bool): Define se o minimapa é desenhado.
+        cell (int): Tamanho em pixels de cada célula.
+        viewport (tuple): Quantidade de células ``(colunas, linhas)`` visíveis.
+        tile (int): Tamanho (células por lado) de cada bloco cacheado.
+        tiles (loveiswar.cache.LRUCache): Superfícies dos blocos, indexadas por ``(tx, ty)``.
+        dirty (set): Células ``(x, y)`` alteradas ainda não redesenhadas.
+        tiles_drawn (int): Quantidade de blocos desenhados por inteiro.
+        cells_redrawn (int): Quantidade de células redesenhadas após alterações.
+    """
+    def __init__(self, game, enabled=settings.MINIMAP_ENABLED, cell=settings.MINIMAP_CELL,
+                 viewport=settings.MINIMAP_VIEWPORT, tile=settings.MINIMAP_TILE,
+                 max_bytes=settings.MINIMAP_CACHE_BYTES):
+        """Args:
+            game (loveiswar.main.Game): Obj. `Game` em execução.
+            enabled (bool): Define se o minimapa é desenhado.
+            cell (int): Tamanho em pixels de cada célula.
+            viewport (tuple): Quantidade de células ``(colunas, linhas)`` visíveis.
+            tile (int): Tamanho (células por lado) de cada bloco cacheado.
+            max_bytes (int): Limite de memória das superfícies dos blocos.
+        """
+        self.game = game
+        self.enabled = enabled
+        self.cell = cell
+        self.viewport = viewport
+        self.tile = tile
+        self.tiles = LRUCache(max_bytes)
+        self.dirty = set()
+        self.tiles_drawn = 0
+        self.cells_redrawn = 0
+        game.map.listeners.append(self.mark_dirty)
+
+    def mark_dirty(self, x, y, value):
+        """Marca uma célula alterada para ser redesenhada no próximo frame.
+
+        Args:
+            x (int): Coluna da célula.
+            y (int): Linha da célula.
+            value (int): Novo id da textura da célula.
+        """
+        self.dirty.add((x, y))
+
+    def draw_cell(self, surface, x, y, value):
+        """Desenha uma célula em uma superfície de bloco.
+
+        Args:
+            surface (pygame.Surface): Superfície do bloco.
+            x (int): Coluna da célula no bloco.
+            y (int): Linha da célula no bloco.
+            value (int): Id da textura da célula.
+        """
+        rect = (x * self.cell, y * self.cell, self.cell, self.cell)
+        surface.fill(BACKGROUND, rect)
+        if value:
+            surface.fill(WALL, (rect[0], rect[1], self.cell - 1, self.cell - 1))
+
+    def render_tile(self, tx, ty):
+        """Desenha um bloco inteiro do minimapa.
+
+        Args:
+            tx (int): Coluna do bloco.
+            ty (int): Linha do bloco.
+
+        Returns:
+            pygame.Surface: Superfície do bloco.
+        """
+        side = self.tile * self.cell
+        surface = pygame.Surface((side, side), 0, self.game.screen)
+        surface.fill(BACKGROUND)
+        cells = self.game.map.region(tx * self.tile, ty * self.tile, self.tile, self.tile)
+        for y, x in np.argwhere(cells):
+            surface.fill(WALL, (x * self.cell, y * self.cell, self.cell - 1, self.cell - 1))
+        self.tiles_drawn += 1
+        return surface
+
+    def get_tile(self, tx, ty):
+        """Retorna a superfície de um bloco, desenhando-o caso não esteja no cache.
+
+        Args:
+            tx (int): Coluna do bloco.
+            ty (int): Linha do bloco.
+
+        Returns:
+            pygame.Surface: Superfície do bloco.
+        """
+        surface = self.tiles.get((tx, ty))
+        if surface is None:
+            surface = self.render_tile(tx, ty)
+            self.tiles.put((tx, ty), surface, surface_bytes(surface))
+        return surface
+
+    def flush(self):
+        """Redesenha as células alteradas dos blocos em cache.
+
+        Blocos fora do cache não são tocados: serão desenhados já com as
+        alterações quando voltarem a ficar visíveis.
+        """
+        for x, y in self.dirty:
+            key = (x // self.tile, y // self.tile)
+            if key in self.tiles:
+                self.draw_cell(self.tiles.get(key), x % self.tile, y % self.tile, self.game.map.get(x, y))
+                self.cells_redrawn += 1
+        self.dirty.clear()
+
+    def rect(self, screen):
+        """Calcula a área da tela ocupada pelo minimapa (canto superior direito).
+
+        Args:
+            screen (pygame.Surface): Superfície de destino.
+
+        Returns:
+            pygame.Rect: Área do minimapa.
+        """
+        width, height = self.viewport[0] * self.cell, self.viewport[1] * self.cell
+        return pygame.Rect(screen.get_width() - width - 8, 8, width, height)
+
+    def draw(self, screen):
+        """Desenha os blocos visíveis ao redor do player e o marcador do player.
+
+        Args:
+            screen (pygame.Surface): Superfície de destino.
+        """
+        if self.dirty:
+            self.flush()
+        area = self.rect(screen)
+        player = self.game.player
+        # Map pixel at the top-left corner of the viewport
+        left = round(player.x * self.cell) - area.width // 2
+        top = round(player.y * self.cell) - area.height // 2
+        side = self.tile * self.cell
+        columns = -(-self.game.map.width // self.tile)
+        rows = -(-self.game.map.height // self.tile)
+
+        clip = screen.get_clip()
+        screen.set_clip(area)
+        screen.fill(BACKGROUND, area)
+        for ty in range(max(top // side, 0), min((top + area.height - 1) // side + 1, rows)):
+            for tx in range(max(left // side, 0), min((left + area.width - 1) // side + 1, columns)):
+                screen.blit(self.get_tile(tx, ty), (area.x + tx * side - left, area.y + ty * side - top))
+
+        center = area.center
+        radius = max(self.cell // 2, 2)
+        pygame.draw.line(screen, 'yellow', center,
+                         (center[0] + 2 * radius * math.cos(player.angle),
+                          center[1] + 2 * radius * math.sin(player.angle)), 2)
+        pygame.draw.circle(screen, 'green', center, radius)
+        screen.set_clip(clip)
+        pygame.draw.rect(screen, WALL, area.inflate(2, 2), 1)
+
+    def stats(self):
+        """Resume o uso do cache do minimapa.
+
+        Returns:
+            dict: Contadores do cache de blocos, blocos desenhados por inteiro e
+                células redesenhadas após alterações.
+        """
+        stats = self.tiles.stats()
+        stats.update(tiles_drawn=self.tiles_drawn, cells_redrawn=self.cells_redrawn)
+        return stats
@@ -2,8 +2,16 @@
 # Copyright (c) MIT
 # Lucas Zunho <lucaszunho17@gmail.com>
 
+import time
+import statistics
+import numpy as np
 import pygame
 from loveiswar import settings
+from loveiswar.cache import WallColumnCache, SpriteScaleCache, build_mipmaps, surface_bytes
+from loveiswar.framebuffer import FramebufferWallRenderer
+from loveiswar.floorcast import FloorCaster
+from loveiswar.texture_cache import TextureCache
+from loveiswar.assets import placeholder, placeholder_mipmaps
 
 class ObjectRenderer:
     """Renderiza filas de renderização e importa texturas necessárias.
@@ -17,10 +25,33 @@ class ObjectRenderer:
 
     Attributes:
     	game (loveiswar.main.Game): Objeto `Game` do contexto em execução.
-        screen (pygame.Surface): Surface base do jogo, usada como estrutura
-        	de controle do `display`.
+        screen (pygame.Surface): Superfície de renderização interna do jogo
+        	(:py:attr:`loveiswar.main.Game.target`), do tamanho da resolução em uso.
+        texture_cache (loveiswar.texture_cache.TextureCache): Cache em disco das
+            texturas já escalonadas.
         wallTextures (pygame.Surface list): Lista de texturas pré-carregas das paredes.
+        wall_mipmaps (dict): Pirâmide de `mipmaps` de cada textura de parede, do nível
+            ``0`` (:py:data:`loveiswar.settings.TEXTURE_SIZE`) ao menor nível
+            (:py:data:`loveiswar.settings.MIPMAP_MIN_SIZE`).
+        column_cache (loveiswar.cache.WallColumnCache): Cache das colunas de parede
+            escalonadas, criado a partir dos `mipmaps` carregados.
+        sprite_cache (loveiswar.cache.SpriteScaleCache): Cache das imagens de sprite
+            escalonadas, compartilhado por todos os sprites.
         skyImage (pygame.Surface): textura de imagem do background (céu) do jogo.
+        wall_renderer (str): Renderizador de paredes em uso, ver
+            :py:data:`loveiswar.settings.WALL_RENDERER`.
+        framebuffer (loveiswar.framebuffer.FramebufferWallRenderer): Renderizador
+            vetorizado de paredes (``None`` até ser necessário).
+        floor_renderer (str): Renderizador do chão em uso, ver
+            :py:data:`loveiswar.settings.FLOOR_RENDERER`.
+        floor_caster (loveiswar.floorcast.FloorCaster): Renderizador de chão e teto
+            texturizados (``None`` com o chão de cor plana).
+        background_stats (dict): Pixels preenchidos pelo plano de fundo no último
+            frame (``filled``), pixels do plano de fundo visíveis entre as paredes
+            (``visible``), a razão entre eles (``overdraw``) e a quantidade de
+            retângulos desenhados (``runs``, com :py:data:`loveiswar.settings.BACKGROUND_SPANS`).
+        sprite_stats (dict): Quantidade de sprites desenhados inteiros, desenhados
+            parcialmente e descartados (encobertos) no último frame.
     """
     def __init__(self, game):
         """Atribuição das variáveis do contexto atual do jogo e carregamento
@@ -30,69 +61,433 @@ class ObjectRenderer:
         	game (loveiswar.main.Game): Obj. `Game` em execução.
         """
         self.game = game
-        self.screen = game.screen
-        self.wall_textures = self.load_wall_textures()
+        self.screen = game.target
+        self.texture_cache = TextureCache()
+        self.wall_mipmaps = self.load_wall_mipmaps()
+        self.wall_textures = {texture: levels[0] for texture, levels in self.wall_mipmaps.items()}
+        self.column_cache = WallColumnCache(self.wall_mipmaps)
+        self.sprite_cache = SpriteScaleCache()
+        self.wall_renderer = settings.WALL_RENDERER
+        self.framebuffer = None
+        self.sprite_stats = {'drawn': 0, 'partial': 0, 'hidden': 0}
+        if self.wall_renderer == 'framebuffer':
+            self.framebuffer = FramebufferWallRenderer(self.wall_textures, self.screen)
 
         self.sky_image = self.get_texture('assets/textures/sky.png',
-            (settings.WIDTH, settings.HALF_HEIGHT))
+            (settings.WIDTH, settings.HALF_HEIGHT), callback=self.set_sky_image)
         """pygame.Surface: Escalonagem da textura de céu para uso útil (1/2 da altura)."""
         
         self.sky_offset = 0
+        self._view_sky = None
+        self._floor_fill = None
+        self.background_stats = {'filled': 0, 'visible': 0, 'overdraw': 1.0, 'runs': 0}
+
+        self.floor_renderer = settings.FLOOR_RENDERER
+        self.floor_caster = None
+        if self.floor_renderer == 'textured':
+            self.floor_caster = FloorCaster(self.load_surface_texture('floor', settings.FLOOR_TEXTURE),
+                                            self.screen)
+            if settings.CEILING_TEXTURE:
+                self.floor_caster.set_texture('ceiling', self.load_surface_texture(
+                    'ceiling', settings.CEILING_TEXTURE), self.screen)
         
     def draw(self):
         """Chama os métodos de renderização do plano de fundo e os de objetos com
         	renderização específica. """
-        self.draw_background()
-        self.render_game_objects()
+        with self.game.profiler.stage('background'):
+            self.draw_background()
+        with self.game.profiler.stage('objects'):
+            self.render_game_objects()
         
     def draw_background(self):
-        """Renderiza o plano de fundo (céu) e o chão. """
+        """Renderiza o plano de fundo (céu) e o chão na resolução em uso.
+
+        Com :py:data:`loveiswar.settings.BACKGROUND_SPANS` ativo, o céu e o chão só
+        são desenhados nas faixas de cada coluna não cobertas pelas paredes (ver
+        :py:meth:`draw_background_spans`). Com o chão texturizado, o chão (e o
+        teto, se houver textura) é projetado por :py:attr:`floor_caster`.
+        """
+        view = self.game.view
         self.sky_offset = (self.sky_offset + 4.5 * self.game.player.rel) % settings.WIDTH
-        self.screen.blit(self.sky_image, (-self.sky_offset, 0))
-        self.screen.blit(self.sky_image, (-self.sky_offset + settings.WIDTH, 0))
-    
-        # Floor
-        pygame.draw.rect(self.screen, settings.FLOOR_COLOR, 
-                         (0, settings.HALF_HEIGHT, settings.WIDTH, settings.HEIGHT))
-        """pygame.Rect: renderização do chão do jogo com uma cor plana
-        	(:py:data:`loveiswar.settings.FLOOR_COLOR`). """
+        caster = self.floor_caster
+        sky, floor = caster is None or caster.ceiling is None, caster is None
+        if settings.BACKGROUND_SPANS:
+            self.draw_background_spans(sky, floor)
+        else:
+            filled = 0
+            if sky:
+                sky_image = self.get_view_sky()
+                sky_offset = self.sky_offset * view.resolution
+                self.screen.blit(sky_image, (-sky_offset, 0))
+                self.screen.blit(sky_image, (-sky_offset + view.width, 0))
+                filled += view.width * view.half_height
+            if floor:
+                # Floor
+                pygame.draw.rect(self.screen, settings.FLOOR_COLOR,
+                                 (0, view.half_height, view.width, view.height))
+                """pygame.Rect: renderização do chão do jogo com uma cor plana
+                	(:py:data:`loveiswar.settings.FLOOR_COLOR`). """
+                filled += view.width * (view.height - view.half_height)
+            self.background_stats['runs'] = 0
+            self.set_background_stats(filled, sky, floor, len(self.game.raycasting.wall_tops))
+
+        if caster is not None:
+            raycasting = self.game.raycasting
+            caster.draw(self.screen, view, self.game.player.pos, self.game.player.angle,
+                        raycasting.wall_tops, raycasting.wall_bottoms)
+
+    def draw_background_spans(self, sky=True, floor=True):
+        """Desenha o céu e o chão apenas nas faixas não cobertas pelas paredes.
+
+        As linhas livres acima e abaixo da parede de cada `ray`
+        (:py:attr:`loveiswar.raycasting.RayCasting.wall_tops` e
+        :py:attr:`loveiswar.raycasting.RayCasting.wall_bottoms`) são arredondadas
+        para fora em múltiplos de :py:data:`loveiswar.settings.BACKGROUND_SPAN_QUANT`
+        (as paredes, desenhadas depois, cobrem o excesso), e as `rays` vizinhas com
+        as mesmas faixas são agrupadas em um único retângulo. Todos os retângulos
+        são desenhados com uma única chamada a ``blits``.
+
+        Args:
+            sky (bool): Desenha o céu.
+            floor (bool): Desenha o chão com :py:data:`loveiswar.settings.FLOOR_COLOR`.
+        """
+        view = self.game.view
+        raycasting = self.game.raycasting
+        width, height, half, scale = view.width, view.height, view.half_height, view.scale
+        rays = min(len(raycasting.wall_tops), width // scale)
+        quant = settings.BACKGROUND_SPAN_QUANT
+        sky_rows = np.minimum(-(-raycasting.wall_tops[:rays] // quant) * quant, half)
+        floor_rows = np.maximum(raycasting.wall_bottoms[:rays] // quant * quant, half)
+
+        # Runs of neighbouring rays with the same gaps
+        starts = np.flatnonzero(np.diff(sky_rows * (height + 1) + floor_rows, prepend=-1))
+        x0 = (starts * scale).tolist()
+        x1 = x0[1:] + [rays * scale]
+        sky_rows, floor_rows = sky_rows[starts].tolist(), floor_rows[starts].tolist()
+        if rays * scale < width:
+            # Columns past the last ray have no wall
+            x0.append(rays * scale)
+            x1.append(width)
+            sky_rows.append(half)
+            floor_rows.append(half)
+
+        blits = []
+        filled = 0
+        if sky:
+            sky_image = self.get_view_sky()
+            # Same placement as the two full-width blits of the scrolling sky
+            sky_offset = self.sky_offset * view.resolution
+            first, second = int(-sky_offset), int(-sky_offset + width)
+            for left, right, rows in zip(x0, x1, sky_rows):
+                if left < second:
+                    end = min(right, second)
+                    blits.append((sky_image, (left, 0), (left - first, 0, end - left, rows)))
+                if right > second:
+                    start = max(left, second)
+                    blits.append((sky_image, (start, 0), (start - second, 0, right - start, rows)))
+                filled += (right - left) * rows
+        if floor:
+            floor_image = self.get_floor_fill()
+            for left, right, rows in zip(x0, x1, floor_rows):
+                blits.append((floor_image, (left, rows), (0, 0, right - left, height - rows)))
+                filled += (right - left) * (height - rows)
+        self.screen.blits(blits, doreturn=False)
+        self.background_stats['runs'] = len(x0)
+        self.set_background_stats(filled, sky, floor, rays)
+
+    def get_floor_fill(self):
+        """Retorna uma superfície com a cor do chão, do tamanho da metade inferior da resolução em uso.
+
+        Returns:
+            pygame.Surface: Superfície preenchida com :py:data:`loveiswar.settings.FLOOR_COLOR`.
+        """
+        view = self.game.view
+        size = (view.width, view.height - view.half_height)
+        if self._floor_fill is None or self._floor_fill.get_size() != size:
+            self._floor_fill = pygame.Surface(size, 0, self.screen)
+            self._floor_fill.fill(settings.FLOOR_COLOR)
+        return self._floor_fill
+
+    def set_background_stats(self, filled, sky, floor, rays):
+        """Atualiza :py:attr:`background_stats` com os pixels preenchidos no frame.
+
+        Args:
+            filled (int): Pixels preenchidos pelo plano de fundo.
+            sky (bool): Define se o céu foi desenhado.
+            floor (bool): Define se o chão foi desenhado.
+            rays (int): Quantidade de `rays` com parede desenhada.
+        """
+        view = self.game.view
+        raycasting = self.game.raycasting
+        rays = min(rays, view.width // view.scale)
+        bare = view.width - rays * view.scale
+        visible = 0
+        if sky:
+            visible += int(raycasting.wall_tops[:rays].sum()) * view.scale + bare * view.half_height
+        if floor:
+            visible += (int((view.height - raycasting.wall_bottoms[:rays]).sum()) * view.scale
+                        + bare * (view.height - view.half_height))
+        self.background_stats.update(filled=filled, visible=visible,
+                                     overdraw=filled / visible if visible else 1.0)
+        self.game.profiler.gauge('background_px', filled)
+        self.game.profiler.gauge('overdraw', f"{self.background_stats['overdraw']:.2f}")
+
+    def get_view_sky(self):
+        """Retorna a textura de céu no tamanho da resolução em uso.
+
+        A textura escalonada é guardada até que a resolução ou a textura mudem.
+
+        Returns:
+            pygame.Surface: Textura de céu com a largura e metade da altura de
+                :py:attr:`loveiswar.main.Game.view`.
+        """
+        view = self.game.view
+        size = (view.width, view.half_height)
+        if self.sky_image.get_size() == size:
+            return self.sky_image
+        if self._view_sky is None or self._view_sky[0] is not self.sky_image or self._view_sky[1].get_size() != size:
+            self._view_sky = (self.sky_image, pygame.transform.scale(self.sky_image, size))
+        return self._view_sky[1]
         
     def render_game_objects(self):
         """Renderiza os objetos específicos da lista de renderização do jogo.
 
         Nesse método que ocorre a renderização das rays através da lista de objetos
         do objeto de raycasting (:py:class:`loveiswar.raycasting.RayCasting`) da classe Game.
+        As paredes são desenhadas diretamente, sem ordenação, e os sprites são recortados
+        coluna a coluna contra o `depth buffer` das paredes (ver :py:meth:`render_sprites`).
+        """
+        if self.wall_renderer == 'framebuffer':
+            self.render_walls_framebuffer()
+        else:
+            self.screen.blits([(img, position) for depth, img, position
+                               in self.game.raycasting.objects_to_render], doreturn=False)
+        self.render_sprites()
+
+    def render_walls_framebuffer(self):
+        """Renderiza as paredes com :py:class:`loveiswar.framebuffer.FramebufferWallRenderer`."""
+        raycasting = self.game.raycasting
+        self.framebuffer.draw(self.screen, raycasting.projection_heights,
+                              raycasting.ray_textures, raycasting.offsets, self.game.view.scale)
+
+    def render_sprites(self):
+        """Renderiza os sprites visíveis, recortados contra o `depth buffer` das paredes.
+
+        Para cada sprite (do mais distante ao mais próximo), as `rays` cobertas pela
+        sua imagem são comparadas com :py:attr:`loveiswar.raycasting.RayCasting.depth_buffer`:
+        sprites totalmente atrás das paredes não são desenhados, e sprites parcialmente
+        encobertos só têm os trechos de colunas visíveis desenhados.
+        """
+        depth_buffer = self.game.raycasting.depth_buffer
+        rays = len(depth_buffer)
+        scale = self.game.view.scale
+        drawn = partial = hidden = 0
+
+        sprites = sorted(self.game.raycasting.sprites_to_render, key=lambda t: t[0], reverse=True)
+        for depth, img, position in sprites:
+            x, y = int(position[0]), position[1]
+            width = img.get_width()
+            first = max(x // scale, 0)
+            last = min((x + width - 1) // scale, rays - 1)
+            if first > last:
+                hidden += 1
+                continue
+
+            visible = depth < depth_buffer[first:last + 1]
+            if visible.all():
+                self.screen.blit(img, (x, y))
+                drawn += 1
+                continue
+            if not visible.any():
+                hidden += 1
+                continue
+
+            # Blit each run of visible columns
+            edges = np.flatnonzero(np.diff(np.concatenate(([False], visible, [False]))))
+            for start, end in zip(edges[::2], edges[1::2]):
+                left = max(x, (first + start) * scale)
+                right = min(x + width, (first + end) * scale)
+                self.screen.blit(img, (left, y), (left - x, 0, right - left, img.get_height()))
+            partial += 1
+        self.sprite_stats = {'drawn': drawn, 'partial': partial, 'hidden': hidden}
+
+    def compare_wall_renderers(self, frames=30):
+        """Compara o tempo e a imagem dos dois renderizadores de paredes.
+
+        Ambos os caminhos são executados sobre o mesmo resultado de `raycasting`
+        e o mesmo plano de fundo: a montagem e o `blit` coluna a coluna
+        (``'columns'``) e a escrita vetorizada nos pixels (``'framebuffer'``). O
+        caminho de colunas é medido com o cache de colunas já preenchido (câmera
+        parada) e vazio (câmera em movimento).
+
+        Args:
+            frames (int): Quantidade de repetições de cada caminho.
+
+        Returns:
+            dict: Mediana (ms) de cada caminho, o ganho de velocidade do
+                ``'framebuffer'`` sobre cada medição de colunas e a diferença
+                média por canal entre as imagens.
         """
-        objects_list = sorted(self.game.raycasting.objects_to_render, key=lambda t: t[0], reverse=True)
-        for depth, img, position in objects_list:
-            self.screen.blit(img, position)
+        if self.framebuffer is None:
+            self.framebuffer = FramebufferWallRenderer(self.wall_textures, self.screen)
+        raycasting = self.game.raycasting
+        self.draw_background()
+        background = self.screen.copy()
+
+        column_times, cold_times, framebuffer_times = [], [], []
+        for times in (cold_times, column_times):
+            for _ in range(frames):
+                if times is cold_times:
+                    self.column_cache.cache.clear()
+                self.screen.blit(background, (0, 0))
+                start = time.perf_counter()
+                raycasting.get_objects_to_render()
+                for depth, img, position in raycasting.objects_to_render:
+                    self.screen.blit(img, position)
+                times.append(time.perf_counter() - start)
+        columns = pygame.surfarray.array3d(self.screen).astype(np.int16)
+
+        for _ in range(frames):
+            self.screen.blit(background, (0, 0))
+            start = time.perf_counter()
+            self.framebuffer.draw(self.screen, raycasting.projection_heights,
+                                  raycasting.ray_textures, raycasting.offsets, self.game.view.scale)
+            framebuffer_times.append(time.perf_counter() - start)
+        framebuffer = pygame.surfarray.array3d(self.screen).astype(np.int16)
+
+        columns_ms = statistics.median(column_times) * 1000
+        columns_cold_ms = statistics.median(cold_times) * 1000
+        framebuffer_ms = statistics.median(framebuffer_times) * 1000
+        return {
+            'columns_ms': columns_ms,
+            'columns_cold_ms': columns_cold_ms,
+            'framebuffer_ms': framebuffer_ms,
+            'speedup': columns_ms / framebuffer_ms,
+            'speedup_cold': columns_cold_ms / framebuffer_ms,
+            'mean_abs_diff': float(np.abs(columns - framebuffer).mean()),
+        }
         
-    @staticmethod 
-    def get_texture(path, res=settings.TEXTURE_TUPLE):
+    def get_texture(self, path, res=settings.TEXTURE_TUPLE, callback=None):
         """Carrega uma imagem em alpha de um arquivo e o escalona sobre a resolução usada.
 
+        A textura escalonada é lida do cache em disco (:py:attr:`texture_cache`)
+        quando disponível.
+
         Args:
         	path (str): Caminho para a imagem da textura a ser carregada.
             res (int tuple): Tupla com a resolução 2d da textura (Default:
             	:py:data:`loveiswar.settings.TEXTURA_TUPLE`).
+            callback (callable): Caso informado (e :py:data:`loveiswar.settings.ASSET_ASYNC`
+                esteja ativo), a textura é carregada em segundo plano e entregue a essa
+                função, e uma textura provisória é retornada.
 
         Returns:
         	pygame.Surface: textura ajustada com a resolução correta.
         """
-        texture = pygame.image.load(path).convert_alpha()
-        return pygame.transform.scale(texture, res)
+        if callback is not None and settings.ASSET_ASYNC:
+            self.game.assets.submit(path, self.texture_cache.load, path, res,
+                                    callback=lambda levels: callback(levels[0]))
+            return placeholder(res, 'black')
+        return self.texture_cache.load(path, res)[0]
         
-    def load_wall_textures(self):
-        """Utiliza o módulo estático de carregamento de texturas para carregar as texturas
-        	padrão de renderização do mapa.
+    def load_wall_mipmaps(self):
+        """Carrega as texturas padrão de renderização do mapa com os seus `mipmaps`
+        	(ver :py:meth:`build_mipmaps`), a partir do cache em disco quando disponível.
+
+        Com :py:data:`loveiswar.settings.ASSET_ASYNC` ativo, as texturas são carregadas
+        em segundo plano e substituídas em :py:meth:`set_wall_texture` quando prontas.
 
         Returns:
-        	`pygame.Surface` list: Lista com os objetos carregados com index iniciado em '1'.
+        	dict: Níveis de cada textura indexados pelo id da textura (iniciado em '1').
         """
-        return {
-            1: self.get_texture('assets/textures/1.png'),
-            2: self.get_texture('assets/textures/2.png'),
-            3: self.get_texture('assets/textures/3.png'),
-            4: self.get_texture('assets/textures/4.png'),
-            5: self.get_texture('assets/textures/5.png')
-        }
+        walls = enumerate(self.texture_assets()[:-1], 1)
+        if not settings.ASSET_ASYNC:
+            return {texture: self.texture_cache.load(path, res, min_size)
+                    for texture, (path, res, min_size) in walls}
+
+        mipmaps = {}
+        for texture, (path, res, min_size) in walls:
+            mipmaps[texture] = placeholder_mipmaps(res[0], min_size)
+            self.game.assets.submit(path, self.texture_cache.load, path, res, min_size,
+                                    callback=lambda levels, texture=texture: self.set_wall_texture(texture, levels))
+        return mipmaps
+
+    def set_wall_texture(self, texture, levels):
+        """Substitui uma textura de parede (e os seus `mipmaps`) em todas as estruturas de renderização.
+
+        Args:
+            texture (int): Id da textura.
+            levels (`pygame.Surface` list): Níveis de `mipmap` da nova textura.
+        """
+        self.wall_mipmaps[texture] = levels
+        self.wall_textures[texture] = levels[0]
+        self.column_cache.set_texture(texture, levels)
+        if self.framebuffer is not None:
+            self.framebuffer.set_texture(texture, levels[0], self.screen)
+
+    def load_surface_texture(self, plane, path):
+        """Carrega a textura de chão ou de teto do renderizador texturizado.
+
+        Args:
+            plane (str): ``'floor'`` ou ``'ceiling'``.
+            path (str): Caminho da imagem da textura.
+
+        Returns:
+            pygame.Surface: Textura (provisória, caso seja carregada em segundo plano).
+        """
+        size = (settings.FLOOR_TEXTURE_SIZE, settings.FLOOR_TEXTURE_SIZE)
+        return self.get_texture(path, size, callback=lambda image: self.floor_caster.set_texture(
+            plane, image, self.screen))
+
+    def set_sky_image(self, image):
+        """Substitui a textura de céu.
+
+        Args:
+            image (pygame.Surface): Nova textura de céu.
+        """
+        self.sky_image = image
+
+    @staticmethod
+    def texture_assets():
+        """Lista as texturas carregadas pelo jogo, para o cache em disco
+        	(ver :py:func:`loveiswar.texture_cache.bake`).
+
+        Returns:
+            tuple list: Caminho, resolução e menor `mipmap` das texturas de parede
+                (na ordem dos ids) seguidas da textura de céu.
+        """
+        walls = [(f'assets/textures/{texture}.png', settings.TEXTURE_TUPLE, settings.MIPMAP_MIN_SIZE)
+                 for texture in range(1, 6)]
+        return walls + [('assets/textures/sky.png', (settings.WIDTH, settings.HALF_HEIGHT), None)]
+
+    @staticmethod
+    def build_mipmaps(texture, min_size=settings.MIPMAP_MIN_SIZE):
+        """Constrói a pirâmide de `mipmaps` de uma textura.
+
+        Ver :py:func:`loveiswar.cache.build_mipmaps`.
+
+        Args:
+            texture (pygame.Surface): Textura do nível ``0``.
+            min_size (int): Menor tamanho em pixels de um nível.
+
+        Returns:
+            `pygame.Surface` list: Níveis da pirâmide, começando pela própria textura.
+        """
+        return build_mipmaps(texture, min_size)
+
+    def mipmap_memory(self):
+        """Calcula a memória ocupada por cada nível dos `mipmaps` de parede.
+
+        Returns:
+            `dict` list: Para cada nível, o tamanho em pixels das texturas e a soma
+                dos bytes ocupados pelo nível em todas as texturas.
+        """
+        report = []
+        for level in range(max(len(levels) for levels in self.wall_mipmaps.values())):
+            surfaces = [levels[level] for levels in self.wall_mipmaps.values() if level < len(levels)]
+            report.append({
+                'level': level,
+                'size': surfaces[0].get_size(),
+                'bytes': sum(surface_bytes(surface) for surface in surfaces),
+            })
+        return report
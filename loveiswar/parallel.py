@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""`Raycasting` paralelo em faixas contíguas da tela.
+
+Esse módulo apresenta a classe :py:class:`loveiswar.parallel.ParallelRayCaster`,
+que divide o leque de `rays` (de tamanho variável, ver
+:py:class:`loveiswar.quality.View`) em faixas contíguas e calcula cada faixa com :py:func:`loveiswar.raycasting.cast_rays` em
+um `pool` de `threads` (as operações do NumPy liberam a GIL) ou de processos
+(com a grade do mapa, os ângulos e os resultados em memória compartilhada).
+"""
+
+import atexit
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from loveiswar import settings
+from loveiswar.raycasting import cast_rays
+
+_RESULTS = (('depth', np.float64), ('texture', np.intp), ('offset', np.float64))
+"""tuple: Nome e tipo de cada vetor de resultado (na ordem de :py:func:`cast_rays`)."""
+
+_worker = {}
+"""dict: Memória compartilhada acessada pelos processos do `pool`."""
+
+def _attach(grid_name, grid_shape, angles_name, result_names, rays):
+    """Inicializador dos processos: abre a memória compartilhada criada pelo jogo.
+
+    Args:
+        grid_name (str): Nome da memória compartilhada da grade do mapa.
+        grid_shape (tuple): Formato ``(altura, largura)`` da grade.
+        angles_name (str): Nome da memória compartilhada dos ângulos das `rays`.
+        result_names (str list): Nome da memória compartilhada de cada resultado.
+        rays (int): Quantidade máxima de `rays`.
+    """
+    blocks = [shared_memory.SharedMemory(name=name) for name in (grid_name, angles_name, *result_names)]
+    _worker['blocks'] = blocks
+    _worker['grid'] = np.ndarray(grid_shape, np.uint8, blocks[0].buf)
+    _worker['angles'] = np.ndarray(rays, np.float64, blocks[1].buf)
+    _worker['results'] = [np.ndarray(rays, dtype, block.buf)
+                          for (_, dtype), block in zip(_RESULTS, blocks[2:])]
+
+def _cast_band(ox, oy, start, stop):
+    """Calcula uma faixa de `rays` em um processo do `pool`, escrevendo na memória compartilhada.
+
+    Args:
+        ox (float): Coordenada 'X' da origem.
+        oy (float): Coordenada 'Y' da origem.
+        start (int): Primeira `ray` da faixa.
+        stop (int): `Ray` seguinte à última da faixa.
+    """
+    ray_angles = _worker['angles'][start:stop]
+    for out, values in zip(_worker['results'], cast_rays(_worker['grid'], ox, oy, ray_angles)):
+        out[start:stop] = values
+
+def split_bands(rays, workers):
+    """Divide as `rays` em faixas contíguas de tamanho semelhante.
+
+    Args:
+        rays (int): Quantidade de `rays`.
+        workers (int): Quantidade de faixas.
+
+    Returns:
+        tuple list: Intervalos ``(start, stop)`` de cada faixa.
+    """
+    edges = np.linspace(0, rays, workers + 1).astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(edges[:-1], edges[1:]) if stop > start]
+
+class ParallelRayCaster:
+    """Calcula o `raycasting` dividindo as `rays` em faixas entre vários `workers`.
+
+    O resultado é idêntico ao de :py:func:`loveiswar.raycasting.cast_rays` sobre
+    todas as `rays` de uma só vez.
+
+    Attributes:
+        workers (int): Quantidade de `workers` (e de faixas).
+        mode (str): ``'thread'`` ou ``'process'``, ver :py:data:`loveiswar.settings.RAYCASTING_POOL`.
+        rays (int): Quantidade máxima de `rays` de um cálculo.
+        bands (dict): Intervalos ``(start, stop)`` de cada faixa, indexados pela
+            quantidade de `rays`.
+        uploads (int): Quantidade de cópias da grade para a memória compartilhada.
+    """
+    def __init__(self, grid, workers=settings.RAYCASTING_WORKERS, mode=settings.RAYCASTING_POOL,
+                 rays=settings.NUM_RAYS):
+        """Criação do `pool` e, no modo de processos, da memória compartilhada.
+
+        Args:
+            grid (numpy.ndarray): Grade ``(altura, largura)`` do mapa.
+            workers (int): Quantidade de `workers` (``0`` utiliza todos os núcleos).
+            mode (str): ``'thread'`` ou ``'process'``.
+            rays (int): Quantidade máxima de `rays` (tamanho dos resultados compartilhados).
+
+        Raises:
+            ValueError: Caso ``mode`` não seja ``'thread'`` ou ``'process'``.
+        """
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"Pool de raycasting desconhecido: '{mode}'.")
+        self.workers = workers or os.cpu_count() or 1
+        self.mode = mode
+        self.rays = rays
+        self.bands = {rays: split_bands(rays, self.workers)}
+        self.uploads = 0
+        self._blocks = []
+        self._uploaded = None
+
+        if mode == 'thread':
+            self._pool = ThreadPoolExecutor(self.workers)
+        else:
+            self._blocks = [shared_memory.SharedMemory(create=True, size=grid.nbytes)]
+            self._blocks += [shared_memory.SharedMemory(create=True, size=rays * np.dtype(dtype).itemsize)
+                             for dtype in (np.float64, *(dtype for _, dtype in _RESULTS))]
+            self._grid = np.ndarray(grid.shape, np.uint8, self._blocks[0].buf)
+            self._angles = np.ndarray(rays, np.float64, self._blocks[1].buf)
+            self._results = [np.ndarray(rays, dtype, block.buf)
+                             for (_, dtype), block in zip(_RESULTS, self._blocks[2:])]
+            self._pool = ProcessPoolExecutor(
+                self.workers, initializer=_attach,
+                initargs=(self._blocks[0].name, grid.shape, self._blocks[1].name,
+                          [b.name for b in self._blocks[2:]], rays))
+        atexit.register(self.close)
+
+    def cast(self, grid, ox, oy, ray_angles, version=None):
+        """Calcula todas as `rays`, uma faixa por `worker`.
+
+        No modo de processos, a grade só é copiada para a memória compartilhada
+        quando ``version`` difere da versão da última cópia.
+
+        Args:
+            grid (numpy.ndarray): Grade ``(altura, largura)`` do mapa.
+            ox (float): Coordenada 'X' da origem (player).
+            oy (float): Coordenada 'Y' da origem (player).
+            ray_angles (numpy.ndarray): Ângulo de cada `ray` (no máximo :py:attr:`rays`).
+            version (hashable): Identifica o conteúdo da grade, ex.: origem e
+                :py:attr:`loveiswar.map.Map.version` (``None`` sempre copia a grade).
+
+        Returns:
+            tuple: Vetores de profundidade (sem correção de olho de peixe), textura
+                e deslocamento na textura de cada `ray`.
+
+        Raises:
+            ValueError: Caso haja mais `rays` que :py:attr:`rays` no modo de processos.
+        """
+        rays = len(ray_angles)
+        bands = self.bands.get(rays)
+        if bands is None:
+            bands = self.bands[rays] = split_bands(rays, self.workers)
+
+        if self.mode == 'thread':
+            results = [np.empty(len(ray_angles), dtype) for _, dtype in _RESULTS]
+
+            def cast_band(band):
+                start, stop = band
+                for out, values in zip(results, cast_rays(grid, ox, oy, ray_angles[start:stop])):
+                    out[start:stop] = values
+
+            list(self._pool.map(cast_band, bands))
+            return tuple(results)
+
+        if rays > self.rays:
+            raise ValueError(f'Quantidade de rays acima do limite do pool: {rays} > {self.rays}.')
+        if version is None or version != self._uploaded:
+            self._grid[:] = grid
+            self._uploaded = version
+            self.uploads += 1
+        self._angles[:rays] = ray_angles
+        futures = [self._pool.submit(_cast_band, ox, oy, start, stop) for start, stop in bands]
+        for future in futures:
+            future.result()
+        return tuple(result[:rays].copy() for result in self._results)
+
+    def close(self):
+        """Encerra o `pool` e libera a memória compartilhada."""
+        if self._pool is None:
+            return
+        atexit.unregister(self.close)
+        self._pool.shutdown()
+        self._pool = None
+        # The array views must be released before the blocks are closed
+        self._grid = self._angles = self._results = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+def scaling_report(grid, pose, max_workers=None, frames=100, mode=settings.RAYCASTING_POOL):
+    """Mede o tempo do `raycasting` paralelo com 1 a ``max_workers`` `workers`.
+
+    Args:
+        grid (numpy.ndarray): Grade ``(altura, largura)`` do mapa.
+        pose (tuple): Pose ``(x, y, angle)`` da câmera.
+        max_workers (int): Maior quantidade de `workers` medida (padrão: núcleos disponíveis).
+        frames (int): Quantidade de cálculos medidos em cada configuração.
+        mode (str): ``'thread'`` ou ``'process'``.
+
+    Returns:
+        dict: Tempo mediano do cálculo serial e, para cada quantidade de `workers`,
+            o tempo mediano e o ganho em relação ao serial (ms).
+    """
+    ox, oy, angle = pose
+    ray_angles = angle - settings.HALF_FOV + 0.0001 + np.arange(settings.NUM_RAYS) * settings.DELTA_ANGLE
+
+    def measure(cast):
+        cast()
+        samples = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            cast()
+            samples.append(time.perf_counter() - start)
+        return float(np.median(samples) * 1000)
+
+    serial = measure(lambda: cast_rays(grid, ox, oy, ray_angles))
+    report = {'mode': mode, 'cpu_count': os.cpu_count(), 'serial_ms': serial, 'workers': {}}
+    for workers in range(1, (max_workers or os.cpu_count() or 1) + 1):
+        caster = ParallelRayCaster(grid, workers, mode)
+        try:
+            ms = measure(lambda: caster.cast(grid, ox, oy, ray_angles, 0))
+        finally:
+            caster.close()
+        report['workers'][workers] = {'ms': ms, 'speedup': serial / ms}
+    return report
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Cálculo do próximo frame em paralelo ao desenho do frame atual.
+
+Esse módulo apresenta a classe :py:class:`loveiswar.pipeline.RenderPipeline`.
+Enquanto a `thread` principal desenha e exibe um frame, uma `thread` dedicada
+calcula o `raycasting` e a projeção dos sprites do frame seguinte, a partir de
+uma cópia da pose do player. Os resultados são escritos alternadamente em dois
+conjuntos de vetores (:py:class:`loveiswar.pipeline.FrameData`) e entregues ao
+:py:class:`loveiswar.raycasting.RayCasting` por referência, sem cópias.
+
+Cada frame é exibido com a pose lida um frame antes: no máximo um cálculo fica
+em andamento, de modo que a latência adicionada é limitada a um frame (ver
+:py:func:`compare`).
+"""
+
+import copy
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from loveiswar import settings
+from loveiswar.raycasting import cast_rays
+
+class FrameData:
+    """Resultado do `raycasting` e da projeção dos sprites de um frame.
+
+    Attributes:
+        depth (numpy.ndarray): Profundidade (com correção de olho de peixe) de cada `ray`.
+        projection_height (numpy.ndarray): Altura projetada da parede de cada `ray`.
+        texture (numpy.ndarray): Textura atingida por cada `ray`.
+        offset (numpy.ndarray): Deslocamento na textura de cada `ray`.
+        result (list): Resultados ``(depth, projection_height, texture, offset)`` por
+            `ray`, montados apenas para o renderizador de colunas.
+        sprites (tuple): Projeção dos sprites (ver
+            :py:meth:`loveiswar.sprite_object.SpriteManager.project`).
+        pose (tuple): Pose ``(x, y, angle)`` da câmera utilizada no cálculo.
+        view (loveiswar.quality.View): Cópia da resolução utilizada no cálculo.
+        input_time (float): Instante (``time.perf_counter``) da leitura da pose.
+        work_time (float): Duração (segundos) do cálculo.
+    """
+    def __init__(self):
+        self.depth = np.zeros(0)
+        self.projection_height = np.zeros(0)
+        self.texture = np.zeros(0, dtype=np.intp)
+        self.offset = np.zeros(0)
+        self.result = []
+        self.sprites = None
+        self.pose = None
+        self.view = None
+        self.input_time = 0.0
+        self.work_time = 0.0
+
+    def compute(self, grid, origin, pose, view, sprite_manager, columns):
+        """Calcula o `raycasting` e a projeção dos sprites de uma pose.
+
+        Os valores são os mesmos de :py:meth:`loveiswar.raycasting.RayCasting.ray_cast_numpy`
+        sem reaproveitamento.
+
+        Args:
+            grid (numpy.ndarray): Grade do mapa ao redor do player.
+            origin (tuple): Célula do mapa na posição ``(0, 0)`` da grade.
+            pose (tuple): Pose ``(x, y, angle)`` da câmera.
+            view (loveiswar.quality.View): Resolução utilizada (não alterada durante o cálculo).
+            sprite_manager (loveiswar.sprite_object.SpriteManager): Sprites projetados.
+            columns (bool): Monta :py:attr:`result` para o renderizador de colunas.
+
+        Returns:
+            loveiswar.pipeline.FrameData: O próprio objeto.
+        """
+        start = time.perf_counter()
+        x, y, angle = pose
+        rays = view.num_rays
+        if len(self.depth) != rays:
+            self.depth = np.empty(rays)
+            self.projection_height = np.empty(rays)
+        ray_angles = angle - settings.HALF_FOV + 0.0001 + np.arange(rays) * view.delta_angle
+        depth, self.texture, self.offset = cast_rays(grid, x - origin[0], y - origin[1], ray_angles)
+        np.multiply(depth, np.cos(angle - ray_angles), out=self.depth)
+        np.add(self.depth, 0.0001, out=self.projection_height)
+        np.divide(view.screen_dist, self.projection_height, out=self.projection_height)
+        self.result = (list(zip(self.depth.tolist(), self.projection_height.tolist(),
+                                self.texture.tolist(), self.offset.tolist())) if columns else [])
+        self.sprites = sprite_manager.project(x, y, angle, view)
+        self.pose = pose
+        self.view = view
+        self.work_time = time.perf_counter() - start
+        return self
+
+class RenderPipeline:
+    """Calcula o `raycasting` e os sprites do próximo frame em uma `thread` dedicada.
+
+    Attributes:
+        game (loveiswar.main.Game): Objeto `Game` do contexto em execução.
+        frames (tuple): Os dois :py:class:`loveiswar.pipeline.FrameData` utilizados
+            alternadamente.
+        wait_time (collections.deque): Espera (segundos) da `thread` principal pelo
+            cálculo de cada frame.
+        work_time (collections.deque): Duração (segundos) do cálculo de cada frame.
+        recomputed (int): Frames recalculados na `thread` principal por mudança de
+            resolução durante o cálculo.
+        reused (int): Frames entregues novamente por não haver mudança na câmera,
+            no mapa ou nos sprites.
+    """
+    def __init__(self, game):
+        """Args:
+            game (loveiswar.main.Game): Obj. `Game` em execução.
+        """
+        self.game = game
+        self.frames = (FrameData(), FrameData())
+        self.wait_time = deque(maxlen=settings.PROFILER_WINDOW)
+        self.work_time = deque(maxlen=settings.PROFILER_WINDOW)
+        self.recomputed = 0
+        self.reused = 0
+        self._next = 0
+        self._future = None
+        self._collected = None
+        self._key = None
+        self._pool = ThreadPoolExecutor(1, thread_name_prefix='render')
+
+    def snapshot(self):
+        """Copia o estado lido pelo cálculo de um frame.
+
+        A grade residente é alterada no lugar pela `thread` principal
+        (:py:meth:`loveiswar.map.Map.load_window` e :py:meth:`loveiswar.map.Map.set`)
+        enquanto o frame é calculado, portanto é copiada junto com a origem. A
+        cópia tem o tamanho da região residente, não do mapa.
+
+        Returns:
+            tuple: Cópia da grade, origem, pose do player e cópia da resolução em uso.
+        """
+        game = self.game
+        return game.map.grid.copy(), game.map.origin, game.player.pose, copy.copy(game.view)
+
+    def submit(self):
+        """Inicia o cálculo do próximo frame com a pose atual do player.
+
+        Caso nada que afete o cálculo tenha mudado desde o último frame, o mesmo
+        frame é entregue novamente, sem cálculo.
+        """
+        game = self.game
+        view = game.view
+        columns = game.object_renderer.wall_renderer == 'columns'
+        # The grid only changes with the window (origin) or with an edit (version)
+        key = (game.map.origin, game.map.version, game.player.pose, view.size, view.scale,
+               len(game.sprite_manager), columns)
+        if key == self._key and self._collected is not None:
+            self._future = self._collected
+            self.reused += 1
+            return
+        self._key = key
+        snapshot = self.snapshot()
+        frame = self.frames[self._next]
+        self._next ^= 1
+        frame.input_time = time.perf_counter()
+        self._future = self._pool.submit(frame.compute, *snapshot, game.sprite_manager, columns)
+
+    def collect(self):
+        """Aguarda o frame em cálculo (calculado na hora caso nenhum esteja em andamento).
+
+        Um frame calculado com outra resolução é recalculado com a resolução em
+        uso, mantendo a pose.
+
+        Returns:
+            loveiswar.pipeline.FrameData: Frame calculado.
+        """
+        if self._future is None:
+            self.submit()
+        start = time.perf_counter()
+        frame = self._future.result()
+        self._collected, self._future = self._future, None
+        self.wait_time.append(time.perf_counter() - start)
+        self.work_time.append(frame.work_time)
+
+        view = self.game.view
+        if (frame.view.width, frame.view.height, frame.view.scale) != (view.width, view.height, view.scale):
+            grid, origin, _, view = self.snapshot()
+            columns = self.game.object_renderer.wall_renderer == 'columns'
+            frame.compute(grid, origin, frame.pose, view, self.game.sprite_manager, columns)
+            self.recomputed += 1
+            self._key = None
+        return frame
+
+    def update(self):
+        """Entrega o frame calculado ao `raycasting` e inicia o cálculo do próximo.
+
+        O player é posicionado na pose do frame entregue (ver
+        :py:meth:`loveiswar.player.Player.show`) até o próximo passo de simulação.
+
+        Returns:
+            loveiswar.pipeline.FrameData: Frame entregue.
+        """
+        game = self.game
+        with game.profiler.stage('pipeline'):
+            frame = self.collect()
+        with game.profiler.stage('raycast'):
+            game.raycasting.set_results(frame.depth, frame.projection_height, frame.texture,
+                                        frame.offset, frame.result)
+        # The other buffer is no longer referenced by the raycasting
+        self.submit()
+        game.player.show(frame.pose)
+        with game.profiler.stage('sprites'):
+            game.animation_clock.update()
+            game.sprite_manager.emit(frame.sprites)
+        return frame
+
+    def stats(self):
+        """Resume o tempo de cálculo e de espera dos últimos frames.
+
+        Returns:
+            dict: Médias (ms) do cálculo e da espera da `thread` principal e os
+                frames recalculados e reaproveitados.
+        """
+        return {
+            'work_ms': float(np.mean(self.work_time) * 1000) if self.work_time else 0.0,
+            'wait_ms': float(np.mean(self.wait_time) * 1000) if self.wait_time else 0.0,
+            'recomputed': self.recomputed,
+            'reused': self.reused,
+        }
+
+    def close(self):
+        """Aguarda o cálculo em andamento e encerra a `thread`."""
+        self._pool.shutdown(wait=True)
+        self._future = self._collected = None
+
+def compare(game, frames=300, warmup=30, rounds=3):
+    """Mede a vazão e a latência do loop serial e do loop com `pipeline`.
+
+    Ambos os loops executam :py:meth:`loveiswar.main.Game.update` e
+    :py:meth:`loveiswar.main.Game.draw` sem limite de framerate, com o player
+    andando para frente e girando. As medições dos dois loops são intercaladas
+    em ``rounds`` rodadas, reduzindo a influência de variações da máquina.
+
+    Args:
+        game (loveiswar.main.Game): Jogo sem display.
+        frames (int): Quantidade de frames medidos por rodada em cada loop.
+        warmup (int): Quantidade de frames executados e descartados antes de cada rodada.
+        rounds (int): Quantidade de rodadas de cada loop.
+
+    Returns:
+        dict: Para cada loop, frames por segundo, mediana e p95 do tempo do frame
+            e a latência (ms e frames) entre a leitura da pose e a exibição do
+            frame, além do ganho de vazão e da latência adicionada pelo `pipeline`.
+    """
+    game.assets.wait()
+    fps, game.fps = game.fps, 0
+    pose = game.player.pose
+    modes = ('serial', 'pipelined')
+    frame_time = {name: [] for name in modes}
+    latency = {name: [] for name in modes}
+    stats = {}
+    for _ in range(rounds):
+        for name in modes:
+            game.set_pipeline(name == 'pipelined')
+            game.player.x, game.player.y, game.player.angle = pose
+            game.player.keys = (True, False, False, False)
+            for i in range(warmup + frames):
+                if i == warmup:
+                    game.latency.clear()
+                start = time.perf_counter()
+                game.player.turn = 2
+                game.update()
+                game.draw()
+                if i >= warmup:
+                    frame_time[name].append(time.perf_counter() - start)
+            latency[name].extend(game.latency)
+            if game.pipeline is not None:
+                stats = game.pipeline.stats()
+    game.set_pipeline(False)
+    game.fps = fps
+
+    report = {'frames': frames * rounds, 'cpu_count': os.cpu_count()}
+    for name in modes:
+        samples = np.array(frame_time[name]) * 1000
+        delays = np.array(latency[name]) * 1000
+        report[name] = {
+            'fps': 1000 / samples.mean(),
+            'frame_ms': float(np.median(samples)),
+            'frame_p95_ms': float(np.percentile(samples, 95)),
+            'latency_ms': float(delays.mean()),
+            'latency_p95_ms': float(np.percentile(delays, 95)),
+            'latency_frames': float(delays.mean() / samples.mean()),
+        }
+    report['pipelined'].update(stats)
+    report['speedup'] = report['pipelined']['fps'] / report['serial']['fps']
+    report['added_latency_ms'] = report['pipelined']['latency_ms'] - report['serial']['latency_ms']
+    report['added_latency_frames'] = report['added_latency_ms'] * report['pipelined']['fps'] / 1000
+    return report
@@ -16,6 +16,11 @@ class Player:
         angle (int): Armazena o valor de :py:data:`loveiswar.settings.PLAYER_ANGLE`.
         	Se referindo ao ângulo de visão do player (utilizado pelo raycasting).
         rel (tuple): Tupla com o valor de movimento do mouse no formato '(x, y)'.
+        keys (tuple): Teclas de movimento (W, S, A, D) pressionadas na última
+        	leitura da entrada, aplicadas a cada passo de simulação.
+        turn (float): Movimento do mouse acumulado desde o último passo de simulação.
+        prev_pose (tuple): Pose ``(x, y, angle)`` do passo de simulação anterior,
+        	utilizada na interpolação (:py:meth:`interpolate`).
     """
     def __init__(self, game):
         """Atribuição das variáveis do contexto atual do jogo e do player.
@@ -30,36 +35,44 @@ class Player:
         self.game = game
         self.x, self.y = settings.PLAYER_POS[0], settings.PLAYER_POS[1]
         self.angle = settings.PLAYER_ANGLE
+        self.rel = 0
+        self.keys = (False, False, False, False)
+        self.turn = 0
+        self.prev_pose = self.pose
+        self._pose = self.pose
+        self._drawn = self.pose
         
-    def movement(self):
-        """Verifica eventos relacionados ao movimento do player.
+    def movement(self, dt=settings.TICK_TIME):
+        """Aplica o movimento das teclas lidas (WASD) em um passo de simulação.
 
         Aqui são armazenados alguns valores relacionados à alteração espacial
-        do player e também ocorre a verificação dos eventos do teclado (WASD)
-        que têm a ver com o movimento.
+        do player a partir das teclas de movimento de :py:attr:`keys`.
+
+        Args:
+            dt (float): Duração (ms) do passo de simulação.
         """
         sin_a = math.sin(self.angle)
         cos_a = math.cos(self.angle)
         dx, dy = 0, 0
-        speed = settings.PLAYER_SPEED * self.game.dt
+        speed = settings.PLAYER_SPEED * dt
         speed_sin = speed * sin_a
         speed_cos = speed * cos_a
         
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_w]:
+        forward, backward, left, right = self.keys
+        if forward:
             dx += speed_cos
             dy += speed_sin
-        if keys[pygame.K_s]:
+        if backward:
             dx += -speed_cos
             dy += -speed_sin
-        if keys[pygame.K_a]:
+        if left:
             dx += speed_sin
             dy += -speed_cos
-        if keys[pygame.K_d]:
+        if right:
             dx += -speed_sin
             dy += speed_cos
             
-        self.check_wall_collision(dx, dy)
+        self.check_wall_collision(dx, dy, dt)
         """Verificação de colisão com base no movimento prestes a ocorrer
         	sobre as escalas do jogo (:py:mod:`loveiswar.settings`)."""
         
@@ -80,17 +93,22 @@ class Player:
         	bool: 'True' caso a coordenada esteja no mapa (colidindo) e 'False'
             	caso contrário.
         """
-        return (x, y) not in self.game.map.world_map
+        return not self.game.map.get(x, y)
     
-    def check_wall_collision(self, dx, dy):
+    def check_wall_collision(self, dx, dy, dt=settings.TICK_TIME):
         """Verifica a colisão nas duas dimensões, considerando a escala e a posição
         	atual do player.
 
+        A célula verificada fica a uma distância fixa do player no sentido do
+        movimento (a velocidade vezes :py:data:`loveiswar.settings.PLAYER_SIZE_SCALE`),
+        independente da duração do passo.
+
         Args:
         	dx (int): Valor de variação da posição do player na linha 'X' - horizontal.
             dy (int): Valor de variação da posição do player na linha 'Y' - vertical.
+            dt (float): Duração (ms) do passo em que a variação ocorre.
         """
-        scale = settings.PLAYER_SIZE_SCALE / self.game.dt
+        scale = settings.PLAYER_SIZE_SCALE / dt
         if self.check_wall(int(self.x + dx * scale), int(self.y)):
             self.x += dx
         if self.check_wall(int(self.x), int(self.y + dy * scale)):
@@ -113,18 +131,86 @@ class Player:
                             self.y * 100), 15)
     
     def mouse_control(self):
-        """Altera o angulo de acordo com a atual movimentação do mouse."""
+        """Lê a movimentação do mouse, acumulada em :py:attr:`turn` até o próximo passo."""
         mx, my = pygame.mouse.get_pos()
         if mx < settings.MOUSE_BORDER_LEFT or mx > settings.MOUSE_BORDER_RIGHT:
             pygame.mouse.set_pos([settings.HALF_WIDTH, settings.HALF_HEIGHT])
         self.rel = pygame.mouse.get_rel()[0]
         self.rel = max(-settings.MOUSE_MAX_REL, min(settings.MOUSE_MAX_REL, self.rel))
-        self.angle += self.rel * settings.MOUSE_SENSITIVITY * self.game.dt
-    
-    def update(self):
-        """Chama os métodos de verificação e alteração do movimento e da perspectiva do player."""
-        self.movement()
+        self.turn += self.rel
+
+    def read_input(self):
+        """Lê o teclado (WASD) e o mouse, uma vez por frame desenhado."""
+        keys = pygame.key.get_pressed()
+        self.keys = (keys[pygame.K_w], keys[pygame.K_s], keys[pygame.K_a], keys[pygame.K_d])
         self.mouse_control()
+
+    def step(self, dt=settings.TICK_TIME):
+        """Avança um passo de simulação com a última entrada lida.
+
+        O movimento do mouse acumulado é aplicado por inteiro no primeiro passo
+        após a leitura.
+
+        Args:
+            dt (float): Duração (ms) do passo.
+        """
+        self.prev_pose = self.pose
+        self.angle += self.turn * settings.MOUSE_SENSITIVITY * dt
+        self.turn = 0
+        self.movement(dt)
+
+    def begin_steps(self):
+        """Restaura a pose simulada antes de uma sequência de passos.
+
+        Caso a pose tenha sido alterada externamente desde a última interpolação
+        (ex.: teletransporte), ela passa a ser a pose simulada, sem interpolação
+        a partir da pose anterior.
+        """
+        if self.pose != self._drawn:
+            self._pose = self.prev_pose = self.pose
+        self.x, self.y, self.angle = self._pose
+
+    def interpolate(self, alpha):
+        """Guarda a pose simulada e posiciona o player entre os dois últimos passos.
+
+        Args:
+            alpha (float): Fração (0 a 1) do próximo passo já decorrida.
+        """
+        self._pose = self.pose
+        x0, y0, angle0 = self.prev_pose
+        x1, y1, angle1 = self._pose
+        turn = (angle1 - angle0 + math.pi) % math.tau - math.pi
+        self.x = x0 + (x1 - x0) * alpha
+        self.y = y0 + (y1 - y0) * alpha
+        self.angle = (angle0 + turn * alpha) % math.tau
+        self._drawn = self.pose
+
+    def show(self, pose):
+        """Posiciona o player em uma pose já desenhada, até o próximo passo de simulação.
+
+        Diferente de uma alteração externa, a pose não é tratada como
+        teletransporte em :py:meth:`begin_steps` (ver
+        :py:class:`loveiswar.pipeline.RenderPipeline`).
+
+        Args:
+            pose (tuple): Pose ``(x, y, angle)`` desenhada.
+        """
+        self.x, self.y, self.angle = pose
+        self._drawn = pose
+
+    def update(self):
+        """Chama os métodos de verificação e alteração do movimento e da perspectiva do player.
+
+        Lê a entrada e avança um único passo de simulação de :py:attr:`loveiswar.main.Game.dt`
+        (o loop principal utiliza :py:meth:`loveiswar.main.Game.simulate`).
+        """
+        self.read_input()
+        self.step(self.game.dt)
+
+    @property
+    def pose(self):
+        """tuple: Pose ``(x, y, angle)`` atual do player."""
+        return self.x, self.y, self.angle
         
     @property 
     def pos(self):
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Medição contínua do tempo de cada etapa dos frames do jogo.
+
+Esse módulo apresenta a classe :py:class:`loveiswar.profiler.FrameProfiler`,
+utilizada por :py:class:`loveiswar.main.Game` para medir as etapas chamadas em
+`update` e `draw`. Desativado, o custo de cada medição se resume a uma chamada
+de método e a um gerenciador de contexto vazio.
+"""
+
+import json
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from loveiswar import settings
+
+HISTOGRAM_BINS = (0.25, 0.5, 1, 2, 4, 8, 16, 33, 66)
+"""float tuple: Limites superiores (ms) das faixas do histograma de cada etapa."""
+
+class _NullStage:
+    """Gerenciador de contexto vazio utilizado com o profiler desativado."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class _Stage:
+    """Gerenciador de contexto que mede uma etapa e guarda o tempo na janela da etapa.
+
+    Attributes:
+        samples (collections.deque): Últimos tempos medidos (segundos).
+    """
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self._start)
+        return False
+
+class FrameProfiler:
+    """Janelas deslizantes de tempo por etapa, com `overlay` e registro em JSON-lines.
+
+    Attributes:
+        enabled (bool): Define se as etapas são medidas.
+        overlay (bool): Define se o `overlay` é desenhado na tela.
+        window (int): Quantidade de frames mantidos em cada janela.
+        dump_path (str): Arquivo JSON-lines de registro (``None`` desativa o registro).
+        dump_interval (int): Intervalo, em frames, entre os registros.
+        frame (int): Quantidade de frames encerrados.
+        stages (dict): Janela de cada etapa, indexada pelo nome da etapa.
+        worst (tuple): Maior tempo de frame da janela atual de registro e o contexto
+            (ex.: pose do player) em que ocorreu.
+        gauges (dict): Último valor de cada indicador (ex.: nível de qualidade),
+            indexado pelo nome do indicador.
+    """
+    def __init__(self, enabled=settings.PROFILER_ENABLED, overlay=settings.PROFILER_OVERLAY,
+                 window=settings.PROFILER_WINDOW, dump_path=settings.PROFILER_DUMP_PATH,
+                 dump_interval=settings.PROFILER_DUMP_INTERVAL):
+        """Args:
+            enabled (bool): Define se as etapas são medidas.
+            overlay (bool): Define se o `overlay` é desenhado na tela.
+            window (int): Quantidade de frames mantidos em cada janela.
+            dump_path (str): Arquivo JSON-lines de registro.
+            dump_interval (int): Intervalo, em frames, entre os registros.
+        """
+        self.enabled = enabled
+        self.overlay = overlay
+        self.window = window
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.frame = 0
+        self.stages = {}
+        self.worst = (0.0, None)
+        self.gauges = {}
+        self._null = _NullStage()
+        self._frame_start = None
+        self._font = None
+
+    def stage(self, name):
+        """Retorna o gerenciador de contexto que mede a etapa ``name``.
+
+        Args:
+            name (str): Nome da etapa.
+
+        Returns:
+            object: Gerenciador de contexto (vazio caso o profiler esteja desativado).
+        """
+        if not self.enabled:
+            return self._null
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = _Stage(self.window)
+        return stage
+
+    def gauge(self, name, value):
+        """Registra o valor atual de um indicador, exibido no `overlay` e no registro.
+
+        Args:
+            name (str): Nome do indicador.
+            value (object): Valor do indicador (serializável em JSON).
+        """
+        if self.enabled:
+            self.gauges[name] = value
+
+    def end_frame(self, context=None):
+        """Encerra o frame atual, registrando o tempo total e, se for o caso, o arquivo.
+
+        Args:
+            context (dict): Informações do frame guardadas caso ele seja o mais
+                lento do intervalo de registro (ex.: pose do player).
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            elapsed = now - self._frame_start
+            self.stage('frame').samples.append(elapsed)
+            if elapsed > self.worst[0]:
+                self.worst = (elapsed, context)
+        self._frame_start = now
+        self.frame += 1
+        if self.dump_path and self.frame % self.dump_interval == 0:
+            self.dump()
+
+    def percentiles(self, name):
+        """Calcula os percentis da janela de uma etapa.
+
+        Args:
+            name (str): Nome da etapa.
+
+        Returns:
+            dict: p50, p95, p99 e máximo da janela, em milissegundos.
+        """
+        ms = np.asarray(self.stages[name].samples) * 1000
+        if not ms.size:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        p50, p95, p99 = np.percentile(ms, (50, 95, 99))
+        return {'p50': float(p50), 'p95': float(p95), 'p99': float(p99), 'max': float(ms.max())}
+
+    def histogram(self, name):
+        """Calcula o histograma da janela de uma etapa.
+
+        Args:
+            name (str): Nome da etapa.
+
+        Returns:
+            int list: Quantidade de amostras em cada faixa de :py:data:`HISTOGRAM_BINS`,
+                mais uma faixa final para os tempos acima do último limite.
+        """
+        ms = np.asarray(self.stages[name].samples) * 1000
+        return np.bincount(np.searchsorted(HISTOGRAM_BINS, ms),
+                           minlength=len(HISTOGRAM_BINS) + 1).tolist()
+
+    def report(self):
+        """Resume todas as etapas medidas.
+
+        Returns:
+            dict: Percentis e histograma de cada etapa.
+        """
+        return {name: dict(self.percentiles(name), histogram=self.histogram(name))
+                for name in self.stages}
+
+    def dump(self):
+        """Adiciona uma linha com o resumo atual ao arquivo :py:attr:`dump_path`."""
+        record = {
+            'frame': self.frame,
+            'time': time.time(),
+            'stages': self.report(),
+            'worst': {'ms': self.worst[0] * 1000, 'context': self.worst[1]},
+            'gauges': dict(self.gauges),
+        }
+        with open(self.dump_path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        self.worst = (0.0, None)
+
+    def draw_overlay(self, screen):
+        """Desenha os percentis de cada etapa e os indicadores no canto superior esquerdo da tela.
+
+        Args:
+            screen (pygame.Surface): Superfície de destino.
+        """
+        if not (self.enabled and self.overlay):
+            return
+        if self._font is None:
+            self._font = pygame.font.Font(None, 22)
+        y = 8
+        for name in self.stages:
+            stats = self.percentiles(name)
+            columns = (name, f"p50 {stats['p50']:.2f}", f"p95 {stats['p95']:.2f}",
+                       f"p99 {stats['p99']:.2f} ms")
+            for x, text in zip((8, 100, 180, 260), columns):
+                screen.blit(self._font.render(text, True, 'yellow', 'black'), (x, y))
+            y += 20
+        for name, value in self.gauges.items():
+            screen.blit(self._font.render(f'{name}: {value}', True, 'yellow', 'black'), (8, y))
+            y += 20
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Resolução dinâmica: parâmetros de renderização em uso e controle adaptativo.
+
+Esse módulo apresenta a classe :py:class:`loveiswar.quality.View`, com os valores
+de renderização lidos a cada frame (resolução interna, quantidade de `rays`,
+largura de cada `ray` e distância da tela), e a classe
+:py:class:`loveiswar.quality.QualityController`, que acompanha o tempo dos frames
+e altera o nível de qualidade (ver :py:data:`loveiswar.settings.QUALITY_LEVELS`)
+para manter o jogo dentro do orçamento de tempo de cada frame.
+"""
+
+import math
+from collections import deque
+
+from loveiswar import settings
+
+class View:
+    """Parâmetros de renderização do nível de qualidade em uso.
+
+    Com resolução ``1.0`` e largura de `ray` :py:data:`loveiswar.settings.SCALE`,
+    os valores são iguais às constantes de :py:mod:`loveiswar.settings`.
+
+    Attributes:
+        resolution (float): Proporção da resolução interna em relação a
+            :py:data:`loveiswar.settings.RES`.
+        width (int): Largura da superfície de renderização interna.
+        height (int): Altura da superfície de renderização interna.
+        half_width (int): Metade de :py:attr:`width`.
+        half_height (int): Metade de :py:attr:`height`.
+        scale (int): Largura em pixels de cada `ray`.
+        num_rays (int): Quantidade de `rays`.
+        half_num_rays (int): Metade de :py:attr:`num_rays`.
+        delta_angle (float): Ângulo entre `rays` vizinhas.
+        screen_dist (float): Distância da tela de projeção.
+    """
+    def __init__(self, resolution=1.0, scale=settings.SCALE):
+        """Args:
+            resolution (float): Proporção da resolução interna.
+            scale (int): Largura em pixels de cada `ray`.
+        """
+        self.set(resolution, scale)
+
+    def set(self, resolution, scale):
+        """Recalcula os parâmetros para uma resolução interna e largura de `ray`.
+
+        Args:
+            resolution (float): Proporção da resolução interna.
+            scale (int): Largura em pixels de cada `ray`.
+        """
+        self.resolution = resolution
+        self.width = int(settings.WIDTH * resolution)
+        self.height = int(settings.HEIGHT * resolution)
+        self.half_width = self.width // 2
+        self.half_height = self.height // 2
+        self.scale = scale
+        self.num_rays = self.width // scale
+        self.half_num_rays = self.num_rays // 2
+        self.delta_angle = settings.FOV / self.num_rays
+        self.screen_dist = self.half_width / math.tan(settings.HALF_FOV)
+
+    @property
+    def size(self):
+        """int tuple: Tamanho ``(width, height)`` da superfície de renderização interna."""
+        return self.width, self.height
+
+class QualityController:
+    """Ajusta o nível de qualidade conforme o tempo de trabalho dos últimos frames.
+
+    O nível diminui (menos `rays` e/ou menor resolução interna) quando a média da
+    janela de frames supera o orçamento, e aumenta quando a média fica abaixo de
+    :py:data:`loveiswar.settings.QUALITY_UP` vezes o orçamento. Entre as duas faixas
+    nada muda, e após cada mudança a janela é esvaziada e nenhuma nova mudança
+    ocorre durante :py:data:`loveiswar.settings.QUALITY_COOLDOWN` frames, evitando
+    oscilações.
+
+    Attributes:
+        game (loveiswar.main.Game): Objeto `Game` do contexto em execução.
+        enabled (bool): Define se o nível é ajustado automaticamente.
+        levels (tuple): Níveis ``(resolução, largura da ray)``, do melhor ao pior.
+        level (int): Índice do nível em uso.
+        budget (float): Orçamento de tempo de cada frame, em milissegundos.
+        samples (collections.deque): Tempos de trabalho (ms) dos últimos frames.
+        changes (int): Quantidade de mudanças de nível.
+    """
+    def __init__(self, game, enabled=settings.DYNAMIC_RESOLUTION, levels=settings.QUALITY_LEVELS,
+                 budget=settings.QUALITY_BUDGET_MS, window=settings.QUALITY_WINDOW,
+                 up=settings.QUALITY_UP, cooldown=settings.QUALITY_COOLDOWN):
+        """Args:
+            game (loveiswar.main.Game): Obj. `Game` em execução.
+            enabled (bool): Define se o nível é ajustado automaticamente.
+            levels (tuple): Níveis ``(resolução, largura da ray)``, do melhor ao pior.
+            budget (float): Orçamento de tempo de cada frame (ms).
+            window (int): Quantidade de frames da média.
+            up (float): Proporção do orçamento abaixo da qual o nível aumenta.
+            cooldown (int): Quantidade mínima de frames entre mudanças.
+        """
+        self.game = game
+        self.enabled = enabled
+        self.levels = levels
+        self.level = 0
+        self.budget = budget
+        self.samples = deque(maxlen=window)
+        self.up = up
+        self.cooldown = cooldown
+        self.changes = 0
+        self._frames_since_change = 0
+
+    def record(self, work_time):
+        """Registra o tempo de trabalho de um frame e ajusta o nível se necessário.
+
+        Args:
+            work_time (float): Tempo do frame sem a espera do `framerate`, em segundos.
+
+        Returns:
+            bool: ``True`` caso o nível tenha mudado.
+        """
+        if not self.enabled:
+            return False
+        self.samples.append(work_time * 1000)
+        self._frames_since_change += 1
+        if len(self.samples) < self.samples.maxlen or self._frames_since_change < self.cooldown:
+            return False
+
+        mean = sum(self.samples) / len(self.samples)
+        if mean > self.budget and self.level + 1 < len(self.levels):
+            self.set_level(self.level + 1)
+            return True
+        if mean < self.budget * self.up and self.level > 0:
+            self.set_level(self.level - 1)
+            return True
+        return False
+
+    def set_level(self, level):
+        """Aplica um nível de qualidade ao jogo.
+
+        Args:
+            level (int): Índice do nível em :py:attr:`levels`.
+        """
+        if level != self.level:
+            self.changes += 1
+        self.level = level
+        self.samples.clear()
+        self._frames_since_change = 0
+        self.game.set_view(*self.levels[level])
+
+    def stats(self):
+        """Resume o estado do controle, para instrumentação.
+
+        Returns:
+            dict: Nível, resolução interna, quantidade de `rays`, média da janela
+                (ms), orçamento (ms) e quantidade de mudanças.
+        """
+        view = self.game.view
+        return {
+            'level': self.level,
+            'resolution': list(view.size),
+            'num_rays': view.num_rays,
+            'mean_ms': sum(self.samples) / len(self.samples) if self.samples else 0.0,
+            'budget_ms': self.budget,
+            'changes': self.changes,
+        }
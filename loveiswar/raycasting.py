@@ -4,8 +4,102 @@
 
 import pygame
 import math
+import numpy as np
 from loveiswar import settings
 
+def _first_hit(grid, xs, ys):
+    """Localiza a primeira célula ocupada de cada `ray` ao longo dos seus passos.
+
+    Args:
+        grid (numpy.ndarray): Grade ``(altura, largura)`` com as texturas do mapa
+            (``0`` para células vazias).
+        xs (numpy.ndarray): Coordenadas 'X' de cada passo, no formato ``(rays, passos)``.
+        ys (numpy.ndarray): Coordenadas 'Y' de cada passo, no formato ``(rays, passos)``.
+
+    Returns:
+        tuple: Textura encontrada por `ray` (``1`` caso nada seja atingido) e o
+            índice do passo da colisão (número de passos caso nada seja atingido).
+    """
+    height, width = grid.shape
+    # int() truncates towards zero, as the loop backend does
+    ix = np.trunc(np.clip(xs, -1, width)).astype(np.intp)
+    iy = np.trunc(np.clip(ys, -1, height)).astype(np.intp)
+    inside = (ix >= 0) & (ix < width) & (iy >= 0) & (iy < height)
+
+    cells = np.zeros(xs.shape, dtype=grid.dtype)
+    cells[inside] = grid[iy[inside], ix[inside]]
+    hit = cells > 0
+
+    step = np.argmax(hit, axis=1)
+    found = hit.any(axis=1)
+    texture = np.where(found, cells[np.arange(len(step)), step], 1)
+    step = np.where(found, step, xs.shape[1])
+    return texture, step
+
+def cast_rays(grid, ox, oy, ray_angles, max_depth=settings.MAX_DEPTH):
+    """Calcula o `raycasting` (DDA) de todas as `rays` em operações vetorizadas.
+
+    Equivalente ao laço de :py:meth:`loveiswar.raycasting.RayCasting.ray_cast_loop`,
+    porém computando as interseções horizontais e verticais de todas as `rays`
+    como matrizes ``(rays, passos)`` do NumPy. A origem pode ser diferente para
+    cada `ray`, permitindo calcular as `rays` de vários players em uma única
+    chamada (ver :py:class:`loveiswar.env.BatchEnv`).
+
+    Args:
+        grid (numpy.ndarray): Grade ``(altura, largura)`` com as texturas do mapa.
+        ox (float): Coordenada 'X' da origem (player), ou um vetor com a origem de cada `ray`.
+        oy (float): Coordenada 'Y' da origem (player), ou um vetor com a origem de cada `ray`.
+        ray_angles (numpy.ndarray): Ângulo de cada `ray`.
+        max_depth (int): Quantidade máxima de passos por `ray`.
+
+    Returns:
+        tuple: Matrizes de profundidade (sem correção de olho de peixe), textura
+            e deslocamento na textura de cada `ray`.
+    """
+    # Same truncation as int(), for scalars and per-ray origins
+    x_map, y_map = np.trunc(ox), np.trunc(oy)
+    sin_a = np.sin(ray_angles)
+    cos_a = np.cos(ray_angles)
+    steps = np.arange(max_depth)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # Intersections with horizontals
+        y_hor = np.where(sin_a > 0, y_map + 1, y_map - 1e-6)
+        dy = np.where(sin_a > 0, 1.0, -1.0)
+        horizontal_depth = (y_hor - oy) / sin_a
+        x_hor = ox + horizontal_depth * cos_a
+        delta_depth = dy / sin_a
+        dx = delta_depth * cos_a
+
+        horizontal_texture, step = _first_hit(
+            grid, x_hor[:, None] + steps * dx[:, None], y_hor[:, None] + steps * dy[:, None])
+        horizontal_depth = horizontal_depth + step * delta_depth
+        x_hor = x_hor + step * dx
+
+        # Intersections with verticals
+        x_vert = np.where(cos_a > 0, x_map + 1, x_map - 1e-6)
+        dx = np.where(cos_a > 0, 1.0, -1.0)
+        vertical_depth = (x_vert - ox) / cos_a
+        y_vert = oy + vertical_depth * sin_a
+        delta_depth = dx / cos_a
+        dy = delta_depth * sin_a
+
+        vertical_texture, step = _first_hit(
+            grid, x_vert[:, None] + steps * dx[:, None], y_vert[:, None] + steps * dy[:, None])
+        vertical_depth = vertical_depth + step * delta_depth
+        y_vert = y_vert + step * dy
+
+        # Set Depth & Texture Offset
+        vertical = vertical_depth < horizontal_depth
+        depth = np.where(vertical, vertical_depth, horizontal_depth)
+        texture = np.where(vertical, vertical_texture, horizontal_texture)
+        y_vert %= 1
+        x_hor %= 1
+        offset = np.where(vertical,
+                          np.where(cos_a > 0, y_vert, 1 - y_vert),
+                          np.where(sin_a > 0, 1 - x_hor, x_hor))
+    return depth, texture, offset
+
 class RayCasting:
     """Implementação e projeção de raycasting no contexto do jogo.
 
@@ -14,8 +108,30 @@ class RayCasting:
         rayCastingResult (vector): Lista com os valores de escala e textura para renderização e
         	projeção das `rays`.
         objectsToRender (vector): Lista de obj. descrevendo as `rays` já prontas para renderização.
+        sprites_to_render (list): Lista ``(depth, image, position)`` dos sprites projetados
+            no frame, recortados contra :py:attr:`depth_buffer` na renderização.
         textures (pygame.Surface list): Lista das texturas de parede do jogo - refere-se à
         	:py:class:`loveiswar.main.Game`.
+        backend (str): Implementação do `raycasting` em uso, ver
+            :py:data:`loveiswar.settings.RAYCASTING_BACKEND`.
+        depths (numpy.ndarray): Profundidade corrigida de cada `ray` no último cálculo.
+        projection_heights (numpy.ndarray): Altura projetada da parede de cada `ray`.
+        ray_textures (numpy.ndarray): Id da textura atingida por cada `ray`.
+        offsets (numpy.ndarray): Deslocamento horizontal (0 a 1) na textura de cada `ray`.
+        wall_tops (numpy.ndarray): Primeira linha da tela coberta pela parede de cada `ray`.
+        wall_bottoms (numpy.ndarray): Linha seguinte à última coberta pela parede de
+            cada `ray` (as linhas fora de ``[wall_tops, wall_bottoms)`` pertencem ao
+            plano de fundo).
+        parallel (loveiswar.parallel.ParallelRayCaster): `Pool` do backend ``'parallel'``
+            (``None`` até ser necessário).
+        reuse (bool): Define se o último cálculo é reaproveitado, ver
+            :py:data:`loveiswar.settings.RAYCASTING_REUSE`.
+        last_reuse (str): Caminho do último cálculo: ``'hit'`` (câmera parada),
+            ``'shift'`` (rotação por múltiplo inteiro do ângulo entre `rays`) ou
+            ``'miss'`` (cálculo completo).
+        reuse_counts (dict): Quantidade de cálculos de cada caminho.
+        rays_cast (int): Quantidade de `rays` efetivamente calculadas.
+        rays_total (int): Quantidade de `rays` solicitadas (incluindo as reaproveitadas).
     """
     def __init__(self, game):
         """Atribuição das variáveis do atual contexto do jogo e inicialização das listas
@@ -27,47 +143,232 @@ class RayCasting:
         self.game = game
         self.ray_casting_result = []
         self.objects_to_render = []
+        self.sprites_to_render = []
         self.textures = self.game.object_renderer.wall_textures
+        self.backend = settings.RAYCASTING_BACKEND
+        num_rays = self.game.view.num_rays
+        self.depths = np.zeros(num_rays)
+        self.projection_heights = np.zeros(num_rays)
+        self.ray_textures = np.ones(num_rays, dtype=np.intp)
+        self.offsets = np.zeros(num_rays)
+        self.wall_tops = np.full(num_rays, self.game.view.half_height)
+        self.wall_bottoms = self.wall_tops.copy()
+        self.parallel = None
+        self.reuse = settings.RAYCASTING_REUSE
+        self.last_reuse = 'miss'
+        self.reuse_counts = {'hit': 0, 'shift': 0, 'miss': 0}
+        self.rays_cast = 0
+        self.rays_total = 0
+        self._state = None
+        self._raw = None
+        self._columns_state = None
         
     def get_objects_to_render(self):
         """Cria a lista de renderização de acordo com cada `ray` e sua respectiva textura.
 
         O método verifica cada valor resultante do raycasting (:py:meth:`loveiswar.raycasting.Raycasting.ray_cast`)
         e ajusta a escala da textura sobre cada `ray` para definir a perspectiva correta
-        na tela, alocando-a na lista de renderização.
+        na tela, alocando-a na lista de renderização. As colunas escalonadas são obtidas
+        do cache :py:class:`loveiswar.cache.WallColumnCache`, na largura e altura da
+        resolução em uso (:py:class:`loveiswar.quality.View`), e as linhas cobertas
+        por cada coluna são guardadas em :py:attr:`wall_tops` e :py:attr:`wall_bottoms`.
         """
         self.objects_to_render = []
+        column_cache = self.game.object_renderer.column_cache
+        scale, height = self.game.view.scale, self.game.view.height
+        tops, bottoms = [], []
         for ray, values in enumerate(self.ray_casting_result):
             depth, projection_height, texture, offset = values
-            
-            if projection_height < settings.HEIGHT:
-                wall_column = self.textures[texture].subsurface(
-                    offset * (settings.TEXTURE_SIZE - settings.SCALE), 0, settings.SCALE, settings.TEXTURE_SIZE
-                )
-                wall_column = pygame.transform.scale(wall_column, (settings.SCALE, projection_height))
-                wall_position = (ray * settings.SCALE, settings.HALF_HEIGHT - projection_height // 2)
-            else:
-                texture_height = settings.TEXTURE_SIZE * settings.HEIGHT / projection_height
-                wall_column = self.textures[texture].subsurface(
-                    offset * (settings.TEXTURE_SIZE - settings.SCALE),
-                    settings.HALF_TEXTURE_SIZE - texture_height // 2,
-                    settings.SCALE, texture_height
-                )
-                wall_column = pygame.transform.scale(wall_column, (settings.SCALE, settings.HEIGHT))
-                wall_position = (ray * settings.SCALE, 0)
-                
-            self.objects_to_render.append((depth, wall_column, wall_position))
+            wall_column, top = column_cache.get(texture, offset, projection_height, scale, height)
+            self.objects_to_render.append((depth, wall_column, (ray * scale, top)))
+            tops.append(top)
+            bottoms.append(top + wall_column.get_height())
+        self.wall_tops = np.clip(tops, 0, height)
+        self.wall_bottoms = np.clip(bottoms, 0, height)
+
+    def get_wall_spans(self):
+        """Calcula as linhas cobertas pelas paredes escritas por
+        	:py:class:`loveiswar.framebuffer.FramebufferWallRenderer`.
+
+        Uma linha é coberta quando está entre o topo da parede (``metade da altura
+        - altura projetada / 2``) e o topo somado à altura projetada.
+        """
+        height = self.game.view.height
+        top = height // 2 - self.projection_heights / 2
+        self.wall_tops = np.clip(np.ceil(top), 0, height).astype(np.intp)
+        self.wall_bottoms = np.clip(np.ceil(top + self.projection_heights), 0, height).astype(np.intp)
         
+    def camera_state(self):
+        """Retorna o estado da câmera que determina o resultado do `raycasting`.
+
+        Returns:
+            tuple: Posição e ângulo do player, quantidade, ângulo e distância de
+                projeção das `rays` em uso, origem da grade do mapa e versão do mapa.
+        """
+        view = self.game.view
+        return (self.game.player.x, self.game.player.y, self.game.player.angle,
+                view.num_rays, view.delta_angle, view.screen_dist, self.game.map.origin,
+                self.game.map.version)
+
+    def rotation_shift(self, state):
+        """Calcula o deslocamento (em `rays`) entre o último cálculo e uma rotação pura.
+
+        Args:
+            state (tuple): Estado da câmera (ver :py:meth:`camera_state`).
+
+        Returns:
+            int: Quantidade de `rays` do deslocamento (positiva no sentido do
+                ângulo), ou ``None`` caso a câmera tenha se movido, a rotação não
+                seja um múltiplo inteiro do ângulo entre `rays` ou não haja
+                resultados para reaproveitar.
+        """
+        last = self._state
+        if last is None or self._raw is None or state[:2] != last[:2] or state[3:] != last[3:]:
+            return None
+        num_rays, delta_angle = state[3], state[4]
+        rotation = (state[2] - last[2] + math.pi) % math.tau - math.pi
+        shift = round(rotation / delta_angle)
+        if abs(rotation / delta_angle - shift) > settings.RAYCASTING_REUSE_TOLERANCE:
+            return None
+        if not 0 < abs(shift) < num_rays:
+            return None
+        return shift
+
+    def invalidate(self):
+        """Descarta o último cálculo (ex.: após alterações no mapa)."""
+        self._state = None
+        self._raw = None
+        self._columns_state = None
+
+    def reuse_stats(self):
+        """Resume o reaproveitamento de cálculos.
+
+        Returns:
+            dict: Quantidade de cálculos de cada caminho, a proporção de cálculos
+                reaproveitados (total ou parcialmente) e a proporção de `rays` que
+                não precisaram ser calculadas.
+        """
+        frames = sum(self.reuse_counts.values())
+        return {
+            **self.reuse_counts,
+            'hit_rate': (frames - self.reuse_counts['miss']) / frames if frames else 0.0,
+            'rays_cast': self.rays_cast,
+            'rays_total': self.rays_total,
+            'ray_reuse_rate': 1 - self.rays_cast / self.rays_total if self.rays_total else 0.0,
+        }
+
     def ray_cast(self):
-        """Cálculo do `raycasting` para a projeção 3D."""
+        """Cálculo do `raycasting` para a projeção 3D através do backend selecionado.
+
+        Com :py:attr:`reuse` ativo, o cálculo é ignorado quando o estado da câmera
+        (:py:meth:`camera_state`) não mudou desde o último cálculo, e os backends
+        vetorizados calculam apenas as `rays` das bordas nas rotações puras (ver
+        :py:meth:`rotation_shift`).
+
+        Raises:
+            ValueError: Caso :py:attr:`backend` não seja ``'numpy'``, ``'parallel'`` ou ``'loop'``.
+        """
+        state = self.camera_state()
+        self.rays_total += state[3]
+        if self.reuse and state == self._state:
+            self.last_reuse = 'hit'
+            self.reuse_counts['hit'] += 1
+            return
+        if self.backend == 'numpy':
+            self.ray_cast_numpy()
+        elif self.backend == 'parallel':
+            self.ray_cast_parallel()
+        elif self.backend == 'loop':
+            self.ray_cast_loop()
+        else:
+            raise ValueError(f"Backend de raycasting desconhecido: '{self.backend}'.")
+        self.reuse_counts[self.last_reuse] += 1
+        self._state = state
+
+    def ray_cast_numpy(self, caster=cast_rays):
+        """Cálculo vetorizado do `raycasting` (ver :py:func:`loveiswar.raycasting.cast_rays`).
+
+        Produz a mesma lista de resultados de :py:meth:`ray_cast_loop`, no formato
+        ``(depth, projection_height, texture, offset)``. Nas rotações puras (ver
+        :py:meth:`rotation_shift`), os resultados anteriores (sem correção de olho
+        de peixe) são deslocados e apenas as `rays` expostas nas bordas são calculadas.
+
+        Args:
+            caster (callable): Função com a assinatura de :py:func:`cast_rays`
+                utilizada no cálculo.
+        """
+        ox, oy = self.game.player.pos
+        angle = self.game.player.angle
+        view = self.game.view
+        ray_angles = angle - settings.HALF_FOV + 0.0001 + np.arange(view.num_rays) * view.delta_angle
+
+        # The grid may only hold the region around the player
+        gx, gy = ox - self.game.map.origin[0], oy - self.game.map.origin[1]
+        shift = self.rotation_shift(self.camera_state()) if self.reuse else None
+        if shift is None:
+            depth, texture, offset = caster(self.game.map.grid, gx, gy, ray_angles)
+            self.rays_cast += view.num_rays
+            self.last_reuse = 'miss'
+        else:
+            # Ray i now looks where ray i + shift looked; only the exposed edge is cast
+            kept = view.num_rays - abs(shift)
+            if shift > 0:
+                src, dst, edge = slice(shift, None), slice(None, kept), slice(kept, None)
+            else:
+                src, dst, edge = slice(None, kept), slice(-shift, None), slice(None, -shift)
+            edge_values = cast_rays(self.game.map.grid, gx, gy, ray_angles[edge])
+            depth, texture, offset = (np.empty_like(values) for values in self._raw)
+            for out, values, edge_out in zip((depth, texture, offset), self._raw, edge_values):
+                out[dst] = values[src]
+                out[edge] = edge_out
+            self.rays_cast += abs(shift)
+            self.last_reuse = 'shift'
+        self._raw = (depth, texture, offset)
+        depth = depth * np.cos(angle - ray_angles)
+
+        # RayCasting debug lines
+        if settings.RAYCASTING_DEBUG:
+            for ray_depth, ray_angle in zip(depth, ray_angles):
+                pygame.draw.line(self.game.screen, 'yellow',
+                                 (100 * ox,
+                                  100 * oy),
+                                 (100 * ox + 100 * ray_depth * math.cos(ray_angle),
+                                  100 * oy + 100 * ray_depth * math.sin(ray_angle)), 2)
+
+        # Projection
+        projection_height = view.screen_dist / (depth + 0.0001)
+
+        self.depths, self.projection_heights = depth, projection_height
+        self.ray_textures, self.offsets = texture, offset
+        self.ray_casting_result = list(zip(depth.tolist(), projection_height.tolist(),
+                                           texture.tolist(), offset.tolist()))
+
+    def ray_cast_parallel(self):
+        """Cálculo vetorizado do `raycasting` dividido em faixas entre vários `workers`
+        	(ver :py:class:`loveiswar.parallel.ParallelRayCaster`)."""
+        if self.parallel is None:
+            from loveiswar.parallel import ParallelRayCaster
+            # Sized for the widest fan of rays (one per screen column)
+            self.parallel = ParallelRayCaster(self.game.map.grid, rays=settings.WIDTH)
+        # The resident grid only changes with the window (origin) or with an edit (version)
+        version = (self.game.map.origin, self.game.map.version)
+        self.ray_cast_numpy(lambda grid, ox, oy, ray_angles:
+                            self.parallel.cast(grid, ox, oy, ray_angles, version))
+
+    def ray_cast_loop(self):
+        """Cálculo do `raycasting` para a projeção 3D, `ray` a `ray`, em Python puro."""
         self.ray_casting_result = []
         ox, oy = self.game.player.pos
-        x_map, y_map = self.game.player.map_pos
+        ox, oy = ox - self.game.map.origin[0], oy - self.game.map.origin[1]
+        x_map, y_map = int(ox), int(oy)
+        cells = self.game.map.cells
+        height, width = self.game.map.grid.shape
+        view = self.game.view
         
         vertical_texture, horizontal_texture = 1, 1
         
         ray_angle = self.game.player.angle - settings.HALF_FOV + 0.0001
-        for ray in range(settings.NUM_RAYS):
+        for ray in range(view.num_rays):
             sin_a = math.sin(ray_angle)
             cos_a = math.cos(ray_angle)
             
@@ -86,9 +387,9 @@ class RayCasting:
             dx = delta_depth * cos_a
             
             for i in range(settings.MAX_DEPTH):
-                tile_hor = int(x_hor), int(y_hor)
-                if tile_hor in self.game.map.world_map:
-                    horizontal_texture = self.game.map.world_map[tile_hor]
+                tile_x, tile_y = int(x_hor), int(y_hor)
+                if 0 <= tile_x < width and 0 <= tile_y < height and cells[tile_y * width + tile_x]:
+                    horizontal_texture = cells[tile_y * width + tile_x]
                     break
                 x_hor += dx
                 y_hor += dy
@@ -109,9 +410,9 @@ class RayCasting:
             dy = delta_depth * sin_a
             
             for i in range(settings.MAX_DEPTH):
-                tile_vert = int(x_vert), int(y_vert)
-                if tile_vert in self.game.map.world_map:
-                    vertical_texture = self.game.map.world_map[tile_vert]
+                tile_x, tile_y = int(x_vert), int(y_vert)
+                if 0 <= tile_x < width and 0 <= tile_y < height and cells[tile_y * width + tile_x]:
+                    vertical_texture = cells[tile_y * width + tile_x]
                     break
                 x_vert += dx
                 y_vert += dy
@@ -148,14 +449,85 @@ class RayCasting:
                                   100 * oy + 100 * depth * sin_a), 2)
                 
             # Projection
-            projection_height = settings.SCREEN_DIST / (depth + 0.0001)
+            projection_height = view.screen_dist / (depth + 0.0001)
             
             # Defining RayCasting result
             self.ray_casting_result.append((depth, projection_height, texture, offset))
             
-            ray_angle += settings.DELTA_ANGLE
+            ray_angle += view.delta_angle
+
+        depth, projection_height, texture, offset = zip(*self.ray_casting_result)
+        self.depths, self.projection_heights = np.array(depth), np.array(projection_height)
+        self.ray_textures, self.offsets = np.array(texture, dtype=np.intp), np.array(offset)
+        # Corrected depths cannot be shifted
+        self._raw = None
+        self.rays_cast += view.num_rays
+        self.last_reuse = 'miss'
     
+    def set_results(self, depth, projection_height, texture, offset, result):
+        """Substitui o resultado do `raycasting` por um calculado fora do objeto
+        	(ver :py:class:`loveiswar.pipeline.RenderPipeline`).
+
+        Os vetores são referenciados, sem cópia, e a lista de sprites é esvaziada
+        como em :py:meth:`update`. Um resultado entregue novamente (a mesma
+        lista ``result``) é contado como reaproveitado.
+
+        Args:
+            depth (numpy.ndarray): Profundidade (com correção de olho de peixe) de cada `ray`.
+            projection_height (numpy.ndarray): Altura projetada da parede de cada `ray`.
+            texture (numpy.ndarray): Textura atingida por cada `ray`.
+            offset (numpy.ndarray): Deslocamento na textura de cada `ray`.
+            result (list): Resultados ``(depth, projection_height, texture, offset)``
+                por `ray` (necessários apenas ao renderizador de colunas).
+        """
+        self.rays_total += len(depth)
+        if result is self.ray_casting_result:
+            self.last_reuse = 'hit'
+        else:
+            self.depths, self.projection_heights = depth, projection_height
+            self.ray_textures, self.offsets = texture, offset
+            self.ray_casting_result = result
+            # The next serial cast has nothing to reuse
+            self._state = None
+            self._raw = None
+            self.last_reuse = 'miss'
+            self.rays_cast += len(depth)
+        self.reuse_counts[self.last_reuse] += 1
+        self.sprites_to_render = []
+        self.refresh_objects_to_render()
+
+    @property
+    def depth_buffer(self):
+        """numpy.ndarray: Profundidade da parede de cada `ray` (ver :py:attr:`depths`),
+            utilizada no recorte dos sprites."""
+        return self.depths
+
     def update(self):
-        """Calcula e atualiza a lista de renderização do `raycasting`."""
+        """Calcula e atualiza a lista de renderização do `raycasting`.
+
+        As colunas de parede só são montadas quando o renderizador de paredes em uso
+        é o de colunas (ver :py:data:`loveiswar.settings.WALL_RENDERER`). A lista de
+        sprites é esvaziada para receber as projeções do frame.
+        """
         self.ray_cast()
+        self.sprites_to_render = []
+        self.refresh_objects_to_render()
+
+    def refresh_objects_to_render(self):
+        """Monta a lista de colunas de parede caso o renderizador em uso seja o de colunas.
+
+        A lista anterior é mantida quando o último cálculo foi reaproveitado por
+        inteiro e as texturas não mudaram. Nos demais renderizadores, apenas as
+        linhas cobertas pelas paredes são calculadas (:py:meth:`get_wall_spans`).
+        """
+        if self.game.object_renderer.wall_renderer != 'columns':
+            self.objects_to_render = []
+            self._columns_state = None
+            self.get_wall_spans()
+            return
+        column_cache = self.game.object_renderer.column_cache
+        columns_state = (self._state, column_cache.generation)
+        if self.last_reuse == 'hit' and columns_state == self._columns_state:
+            return
         self.get_objects_to_render()
+        self._columns_state = columns_state
@@ -16,6 +16,30 @@ import math
 RAYCASTING_DEBUG = False
 """bool: Define a visibilidade das linhas de debug do raycasting."""
 
+RAYCASTING_BACKEND = 'numpy'
+"""str: Implementação utilizada pelo :py:meth:`loveiswar.raycasting.RayCasting.ray_cast`.
+
+Os valores aceitos são ``'numpy'``, que calcula todas as rays em operações
+vetorizadas, ``'parallel'``, que divide as rays vetorizadas em faixas entre
+vários workers (ver :py:class:`loveiswar.parallel.ParallelRayCaster`), e
+``'loop'``, que percorre cada ray em Python puro (útil para comparação).
+"""
+
+RAYCASTING_WORKERS = 0
+"""int: Quantidade de workers do backend ``'parallel'`` (``0`` utiliza todos os núcleos)."""
+
+RAYCASTING_POOL = 'thread'
+"""str: Pool do backend ``'parallel'``: ``'thread'`` ou ``'process'`` (memória compartilhada)."""
+
+RAYCASTING_REUSE = True
+"""bool: Reaproveita o último raycasting quando a câmera não muda e, nas rotações
+	por múltiplos inteiros do ângulo entre rays, desloca os resultados e calcula
+	apenas as rays das bordas (ver :py:meth:`loveiswar.raycasting.RayCasting.ray_cast`)."""
+
+RAYCASTING_REUSE_TOLERANCE = 1e-6
+"""float: Tolerância (fração do ângulo entre rays) para considerar uma rotação
+	como múltiplo inteiro do ângulo entre rays."""
+
 WIDTH = 1366
 HEIGHT = 768
 HALF_WIDTH = WIDTH // 2
@@ -32,6 +56,94 @@ Clock do pygame para atualizá-lo com o tempo certo de delay de
 cada chamada.
 """
 
+TICK_RATE = 60
+"""int: Passos de simulação (movimento, rotação e colisão do player) por segundo.
+
+A simulação avança em passos fixos, independentes do framerate, e a pose do
+player desenhada é interpolada entre os dois últimos passos (ver
+:py:meth:`loveiswar.main.Game.simulate`).
+"""
+
+TICK_TIME = 1000 / TICK_RATE
+"""float: Duração (ms) de cada passo de simulação."""
+
+MAX_TICKS_PER_FRAME = 8
+"""int: Quantidade máxima de passos de simulação por frame.
+
+Em frames mais longos que ``MAX_TICKS_PER_FRAME * TICK_TIME``, o tempo
+excedente é descartado (o jogo fica mais lento em vez de acumular passos).
+"""
+
+PIPELINE = False
+"""bool: Calcula o `raycasting` e a projeção dos sprites do próximo frame em uma
+	`thread` dedicada enquanto o frame atual é desenhado.
+
+Cada frame passa a exibir a pose lida um frame antes (ver
+:py:class:`loveiswar.pipeline.RenderPipeline`).
+"""
+
+PROFILER_ENABLED = False
+"""bool: Ativa a medição das etapas de cada frame (ver :py:class:`loveiswar.profiler.FrameProfiler`).
+
+Desativada, a medição tem custo praticamente nulo.
+"""
+
+PROFILER_OVERLAY = False
+"""bool: Exibe os percentis de cada etapa sobre a tela (alternável com F3)."""
+
+PROFILER_WINDOW = 300
+"""int: Quantidade de frames considerada nos percentis e histogramas do profiler."""
+
+PROFILER_DUMP_PATH = None
+"""str: Arquivo JSON-lines em que o profiler registra o resumo periodicamente
+	(``None`` desativa o registro)."""
+
+PROFILER_DUMP_INTERVAL = 300
+"""int: Intervalo, em frames, entre os registros do profiler."""
+
+MAP_PATH = None
+"""str: Arquivo de mapa binário aberto por `mmap` (ver :py:mod:`loveiswar.mapfile`).
+
+Com ``None``, o mapa embutido :py:data:`loveiswar.map.mini_map` é utilizado.
+"""
+
+MAP_CHUNK_SIZE = 32
+"""int: Tamanho (células por lado) dos blocos dos arquivos de mapa."""
+
+MAP_WINDOW_RADIUS = 1
+"""int: Quantidade de blocos mantidos ao redor do bloco do player na grade do raycasting.
+
+A grade tem ``2 * MAP_WINDOW_RADIUS + 1`` blocos por lado; paredes além dela
+não são enxergadas (ver :py:data:`loveiswar.settings.MAX_DEPTH`).
+"""
+
+MAP_PREFETCH_CHUNKS = 2
+"""int: Quantidade de blocos antecipados no sentido do movimento do player."""
+
+MAP_CACHE_BYTES = 4 * 1024 * 1024
+"""int: Limite de memória (bytes) dos blocos de mapa residentes.
+
+Ver :py:class:`loveiswar.streaming.ChunkStreamer`.
+"""
+
+MINIMAP_ENABLED = False
+"""bool: Define se o minimapa é desenhado no início do jogo (alternado com ``Tab``)."""
+
+MINIMAP_CELL = 8
+"""int: Tamanho em pixels de cada célula do minimapa."""
+
+MINIMAP_VIEWPORT = (32, 20)
+"""tuple: Quantidade de células ``(colunas, linhas)`` visíveis no minimapa ao redor do player."""
+
+MINIMAP_TILE = 32
+"""int: Tamanho (células por lado) dos blocos do minimapa mantidos em cache."""
+
+MINIMAP_CACHE_BYTES = 8 * 1024 * 1024
+"""int: Limite de memória (bytes) das superfícies dos blocos do minimapa.
+
+Ver :py:class:`loveiswar.minimap.Minimap`.
+"""
+
 PLAYER_POS = (1.5, 5)
 """tuple: Representação do local de \"nascimento\" do jogador dentro do mapa do jogo.
 
@@ -144,4 +256,135 @@ TEXTURE_TUPLE = (TEXTURE_SIZE, TEXTURE_SIZE)
 Ver :py:data:`loveiswar.settings.TEXTURE_SIZE`.
 """
 
+TEXTURE_CACHE_DIR = '.cache/textures'
+"""str: Diretório do cache em disco das texturas já escalonadas (``None`` desativa o cache).
+
+Ver :py:class:`loveiswar.texture_cache.TextureCache`.
+"""
+
+ASSET_ASYNC = True
+"""bool: Carrega as texturas e imagens de sprite em segundo plano, iniciando o jogo
+	com superfícies provisórias (ver :py:class:`loveiswar.assets.AssetLoader`)."""
+
+ASSET_WORKERS = 0
+"""int: Quantidade de threads do carregamento de assets (``0`` utiliza todos os núcleos)."""
+
+PLACEHOLDER_COLOR = 'dimgray'
+"""str: Cor das texturas provisórias exibidas enquanto as texturas são carregadas."""
+
+ATLAS_PATH = '.cache/atlas/atlas.json'
+"""str: Manifesto dos atlas de sprites (ver :py:mod:`loveiswar.atlas`). Sem o manifesto,
+	as imagens de sprite são carregadas arquivo a arquivo."""
+
+ATLAS_MAX_SIZE = 2048
+"""int: Tamanho máximo em pixels (largura e altura) de cada atlas de sprites."""
+
+ANIMATION_FRAME_TIME = 120
+"""int: Duração padrão (ms) de cada quadro das animações."""
+
 HALF_TEXTURE_SIZE = TEXTURE_SIZE // 2
+
+MIPMAP_MIN_SIZE = 16
+"""int: Menor tamanho em pixels dos níveis de `mipmap` das texturas de parede
+	e das imagens de sprite.
+
+Ver :py:meth:`loveiswar.object_renderer.ObjectRenderer.build_mipmaps`.
+"""
+
+WALL_RENDERER = 'columns'
+"""str: Renderizador das paredes em :py:meth:`loveiswar.object_renderer.ObjectRenderer.render_game_objects`.
+
+Os valores aceitos são ``'columns'``, que realiza um `blit` por coluna de
+parede, e ``'framebuffer'``, que escreve todas as paredes de uma só vez nos
+pixels da tela (ver :py:class:`loveiswar.framebuffer.FramebufferWallRenderer`).
+"""
+
+BACKGROUND_SPANS = True
+"""bool: Desenha o céu e o chão apenas nas faixas de cada coluna não cobertas pelas
+	paredes (ver :py:meth:`loveiswar.object_renderer.ObjectRenderer.draw_background_spans`)."""
+
+BACKGROUND_SPAN_QUANT = 8
+"""int: Passo de arredondamento (pixels) das faixas livres do plano de fundo.
+
+Valores maiores agrupam mais colunas vizinhas em cada retângulo (menos chamadas
+de desenho) às custas de mais pixels desenhados sob as paredes.
+"""
+
+FLOOR_RENDERER = 'flat'
+"""str: Renderizador do chão em :py:meth:`loveiswar.object_renderer.ObjectRenderer.draw_background`.
+
+Os valores aceitos são ``'flat'``, que preenche o chão com
+:py:data:`loveiswar.settings.FLOOR_COLOR`, e ``'textured'``, que projeta
+:py:data:`loveiswar.settings.FLOOR_TEXTURE` no chão (ver
+:py:class:`loveiswar.floorcast.FloorCaster`).
+"""
+
+FLOOR_TEXTURE = 'assets/textures/4.png'
+"""str: Textura do chão do renderizador ``'textured'`` (uma repetição por célula do mapa)."""
+
+CEILING_TEXTURE = None
+"""str: Textura do teto do renderizador ``'textured'`` (``None`` mantém o céu)."""
+
+FLOOR_TEXTURE_SIZE = 256
+"""int: Tamanho em pixels (potência de 2) das texturas de chão e teto extraídas."""
+
+COLUMN_CACHE_BYTES = 32 * 1024 * 1024
+"""int: Limite de memória (bytes) do cache de colunas de parede escalonadas.
+
+Ver :py:class:`loveiswar.cache.WallColumnCache`.
+"""
+
+COLUMN_CACHE_QUANT = 2
+"""int: Passo de quantização (pixels) da altura projetada das colunas de parede.
+
+Valores maiores aumentam a taxa de acerto do cache
+:py:class:`loveiswar.cache.WallColumnCache` às custas de precisão na altura
+das paredes.
+"""
+
+SPRITE_CACHE_BYTES = 16 * 1024 * 1024
+"""int: Limite de memória (bytes) do cache de imagens de sprite escalonadas e de suas pirâmides de `mipmaps`.
+
+Ver :py:class:`loveiswar.cache.SpriteScaleCache`.
+"""
+
+SPRITE_CACHE_QUANT = 4
+"""int: Passo de quantização (pixels) da altura projetada dos sprites."""
+
+DYNAMIC_RESOLUTION = False
+"""bool: Ajusta a quantidade de rays e a resolução interna de renderização conforme o
+	tempo dos frames (ver :py:class:`loveiswar.quality.QualityController`)."""
+
+QUALITY_LEVELS = ((1.0, 2), (1.0, 3), (0.75, 3), (0.5, 3), (0.5, 4))
+"""tuple: Níveis de qualidade ``(resolução, largura da ray)``, do melhor ao pior.
+
+A resolução é a proporção da superfície de renderização interna em relação a
+:py:data:`loveiswar.settings.RES` (escalonada para a tela ao final do frame) e a
+largura da ray é a quantidade de pixels de cada coluna. O primeiro nível
+equivale a :py:data:`loveiswar.settings.NUM_RAYS` rays em resolução nativa.
+"""
+
+QUALITY_BUDGET_MS = 1000 / FPS
+"""float: Orçamento de tempo (ms) de cada frame, sem a espera do `framerate`."""
+
+QUALITY_WINDOW = 30
+"""int: Quantidade de frames da média comparada com :py:data:`loveiswar.settings.QUALITY_BUDGET_MS`."""
+
+QUALITY_UP = 0.7
+"""float: Proporção do orçamento abaixo da qual o nível de qualidade aumenta.
+
+A faixa entre esse valor e o orçamento não altera o nível, evitando oscilações.
+"""
+
+QUALITY_COOLDOWN = 60
+"""int: Quantidade mínima de frames entre duas mudanças do nível de qualidade."""
+
+ENV_RAYS = 64
+"""int: Quantidade de rays observadas por instância em :py:class:`loveiswar.env.BatchEnv`."""
+
+ENV_CAST_RAYS = 16384
+"""int: Quantidade máxima de rays (somando as instâncias) de cada chamada de
+	:py:func:`loveiswar.raycasting.cast_rays` em :py:class:`loveiswar.env.BatchEnv`.
+
+Limita a memória dos vetores intermediários ``(rays, passos)`` do cálculo.
+"""
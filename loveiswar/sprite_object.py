@@ -3,11 +3,13 @@
 # Lucas Zunho <lucaszunho17@gmail.com>
 
 import math
+import numpy as np
 import pygame
 import os
 from collections import deque
 
 from loveiswar import settings
+from loveiswar.assets import load_image, placeholder
 
 class SpriteObject:
     """Manuseio de sprites, suas projeções e demais efeitos.
@@ -32,7 +34,7 @@ class SpriteObject:
         SPRITE_SCALE (float): Valor de escala de exibição do sprite.
         SPRITE_HEIGHT_SHIFT (float): Valor de deslocamento do sprite na vertical.
     """
-    def __init__(self, game, path, pos, scale=1.0, shift=0.0):
+    def __init__(self, game, path, pos, scale=1.0, shift=0.0, image=None):
         """Inicializa os atributos e define o contexto inicial do sprite.
 
         Esse construtor, além de definir os valor padrões através dos argumentos
@@ -45,11 +47,17 @@ class SpriteObject:
             pos (float tuple): Posição de exibição do sprite no mapa.
             scale (float): Escala de exibição do sprite.
             shift (float): Valor de deslocamento do sprite na linha vertical.
+            image (pygame.Surface): Imagem já carregada do sprite (evita o
+                carregamento de ``path``, que também é evitado caso a imagem
+                esteja no atlas do jogo).
         """
         self.game = game
         self.player = game.player
         self.x, self.y = pos
-        self.image = pygame.image.load(path).convert_alpha()
+        if image is None:
+            atlas = game.atlas
+            image = atlas.frame(path) if atlas is not None and path in atlas else load_image(path)
+        self.image = image
         self.IMAGE_WIDTH = self.image.get_width()
         self.IMAGE_HALF_WIDTH = self.image.get_width() // 2
         self.IMAGE_RATIO = self.IMAGE_WIDTH / self.image.get_height()
@@ -67,20 +75,23 @@ class SpriteObject:
         """Calcula e coloca o sprite na lista de renderização.
 
         A imagem de sprite é escalonada conforme as definições de tela e a
-        escala pré definida no construtor. Define-se o devido item de renderização
-        do sprite e sua adição à lista de renderização é feita.
+        escala pré definida no construtor (através do cache
+        :py:class:`loveiswar.cache.SpriteScaleCache`). Define-se o devido item de
+        renderização do sprite e sua adição à lista de renderização é feita.
         """
-        projection = settings.SCREEN_DIST / self.normal_distance * self.SPRITE_SCALE
+        view = self.game.view
+        projection = view.screen_dist / self.normal_distance * self.SPRITE_SCALE
         projection_width = projection * self.IMAGE_RATIO
         projection_height = projection 
         
-        image = pygame.transform.scale(self.image, (projection_width, projection_height))
+        image = self.game.object_renderer.sprite_cache.get(self.image, projection_width, projection_height)
+        projection_width, projection_height = image.get_size()
         
         self.sprite_half_width = projection_width // 2
         height_shift = projection_height * self.SPRITE_HEIGHT_SHIFT
-        pos = self.screen_x - self.sprite_half_width, settings.HALF_HEIGHT - projection_height // 2 + height_shift
+        pos = self.screen_x - self.sprite_half_width, view.half_height - projection_height // 2 + height_shift
         
-        self.game.raycasting.objects_to_render.append((self.normal_distance, image, pos))
+        self.game.raycasting.sprites_to_render.append((self.normal_distance, image, pos))
 
     def get_sprite(self):
         """Cálculo das normativas de distância e perspectiva do sprite.
@@ -99,12 +110,13 @@ class SpriteObject:
         if (dx > 0 and self.player.angle > math.pi) or (dx < 0 and dy < 0):
             delta += math.tau
             
-        delta_rays = delta / settings.DELTA_ANGLE
-        self.screen_x = (settings.HALF_NUM_RAYS + delta_rays) * settings.SCALE
+        view = self.game.view
+        delta_rays = delta / view.delta_angle
+        self.screen_x = (view.half_num_rays + delta_rays) * view.scale
         
         self.distance = math.hypot(dx, dy)
         self.normal_distance = self.distance * math.cos(delta)
-        if -self.IMAGE_HALF_WIDTH < self.screen_x < (settings.WIDTH + self.IMAGE_HALF_WIDTH) and self.normal_distance > 0.5:
+        if -self.IMAGE_HALF_WIDTH < self.screen_x < (view.width + self.IMAGE_HALF_WIDTH) and self.normal_distance > 0.5:
             self.get_sprite_projection()
             
     def update(self):
@@ -117,81 +129,236 @@ class SpriteObject:
         """
         self.get_sprite()
 
+class SpriteManager:
+    """Conjunto de sprites estáticos calculados em lote.
+
+    Diferente de :py:class:`loveiswar.sprite_object.SpriteObject`, que calcula a
+    projeção de um único sprite em Python, o `SpriteManager` guarda posições,
+    escalas e deslocamentos de todos os seus sprites em matrizes paralelas e
+    calcula ângulo, ``screen_x`` e distância normalizada de todos eles em uma
+    única passada do NumPy. Os sprites fora da tela ou próximos demais são
+    descartados em lote, e somente os restantes geram itens de renderização.
+
+    Attributes:
+        game (loveiswar.main.Game): Objeto `Game` do contexto em execução.
+        player (loveiswar.player.Player): Objeto de representação do player.
+        images (pygame.Surface list): Imagens distintas utilizadas pelos sprites.
+        x (numpy.ndarray): Posição horizontal de cada sprite.
+        y (numpy.ndarray): Posição vertical de cada sprite.
+        scale (numpy.ndarray): Escala de exibição de cada sprite.
+        shift (numpy.ndarray): Deslocamento vertical de cada sprite.
+        image_index (numpy.ndarray): Índice em :py:attr:`images` da imagem de cada sprite.
+        visible (int): Quantidade de sprites projetados no último `update`.
+    """
+    def __init__(self, game):
+        """Args:
+            game (loveiswar.main.Game): Obj. `Game` em execução.
+        """
+        self.game = game
+        self.player = game.player
+        self.images = []
+        self.paths = {}
+        self.image_ratio = np.empty(0)
+        self.image_half_width = np.empty(0)
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+        self.scale = np.empty(0)
+        self.shift = np.empty(0)
+        self.image_index = np.empty(0, dtype=np.intp)
+        self.visible = 0
+
+    def __len__(self):
+        return len(self.x)
+
+    def load_image(self, path):
+        """Carrega (uma única vez por caminho) a imagem de um sprite.
+
+        A imagem é obtida do atlas do jogo (:py:class:`loveiswar.atlas.Atlas`)
+        quando disponível.
+
+        Args:
+            path (str): Caminho do arquivo de imagem.
+
+        Returns:
+            int: Índice da imagem em :py:attr:`images`.
+        """
+        index = self.paths.get(path)
+        if index is None:
+            index = self.paths[path] = len(self.images)
+            self.images.append(None)
+            self.image_ratio = np.append(self.image_ratio, 1.0)
+            self.image_half_width = np.append(self.image_half_width, 0)
+            atlas = self.game.atlas
+            if atlas is not None and path in atlas:
+                self.set_image(index, atlas.frame(path))
+            elif settings.ASSET_ASYNC:
+                # Transparent until the image is decoded in the background
+                self.set_image(index, placeholder((1, 1), None))
+                self.game.assets.submit(path, load_image, path,
+                                        callback=lambda image: self.set_image(index, image))
+            else:
+                self.set_image(index, load_image(path))
+        return index
+
+    def set_image(self, index, image):
+        """Substitui uma das imagens dos sprites.
+
+        Args:
+            index (int): Índice da imagem em :py:attr:`images`.
+            image (pygame.Surface): Nova imagem.
+        """
+        self.images[index] = image
+        self.image_ratio[index] = image.get_width() / image.get_height()
+        self.image_half_width[index] = image.get_width() // 2
+
+    def add(self, path, positions, scale=1.0, shift=0.0):
+        """Adiciona sprites que compartilham a mesma imagem.
+
+        Args:
+            path (str): Caminho do arquivo de imagem dos sprites.
+            positions (float tuple list): Posições ``(x, y)`` dos sprites no mapa
+                (uma única tupla adiciona um único sprite).
+            scale (float): Escala de exibição dos sprites.
+            shift (float): Valor de deslocamento dos sprites na linha vertical.
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        count = len(positions)
+        index = self.load_image(path)
+        self.x = np.concatenate((self.x, positions[:, 0]))
+        self.y = np.concatenate((self.y, positions[:, 1]))
+        self.scale = np.concatenate((self.scale, np.full(count, scale)))
+        self.shift = np.concatenate((self.shift, np.full(count, shift)))
+        self.image_index = np.concatenate((self.image_index, np.full(count, index, dtype=np.intp)))
+
+    def update(self):
+        """Calcula a projeção de todos os sprites e adiciona os visíveis à lista de renderização.
+
+        Os cálculos seguem :py:meth:`loveiswar.sprite_object.SpriteObject.get_sprite`
+        e :py:meth:`loveiswar.sprite_object.SpriteObject.get_sprite_projection`.
+        """
+        self.emit(self.project(self.player.x, self.player.y, self.player.angle, self.game.view))
+
+    def project(self, x, y, angle, view):
+        """Calcula a projeção de todos os sprites para uma pose da câmera.
+
+        Apenas operações do NumPy são utilizadas, permitindo o cálculo fora da
+        `thread` principal (ver :py:class:`loveiswar.pipeline.RenderPipeline`).
+
+        Args:
+            x (float): Coordenada 'X' da câmera.
+            y (float): Coordenada 'Y' da câmera.
+            angle (float): Ângulo da câmera.
+            view (loveiswar.quality.View): Resolução em uso.
+
+        Returns:
+            tuple: Índice da imagem, distância normalizada, ``screen_x``, largura,
+                altura e deslocamento vertical projetados dos sprites visíveis, ou
+                ``None`` caso nenhum sprite esteja visível.
+        """
+        dx = self.x - x
+        dy = self.y - y
+
+        delta = np.arctan2(dy, dx) - angle
+        delta[((dx > 0) & (angle > math.pi)) | ((dx < 0) & (dy < 0))] += math.tau
+        screen_x = (view.half_num_rays + delta / view.delta_angle) * view.scale
+        normal_distance = np.hypot(dx, dy) * np.cos(delta)
+
+        image_index = self.image_index
+        half_width = self.image_half_width[image_index]
+        visible = np.flatnonzero((-half_width < screen_x) & (screen_x < view.width + half_width)
+                                 & (normal_distance > 0.5))
+        if not len(visible):
+            return None
+
+        projection = view.screen_dist / normal_distance[visible] * self.scale[visible]
+        projection_width = projection * self.image_ratio[image_index[visible]]
+        return (image_index[visible], normal_distance[visible], screen_x[visible],
+                projection_width, projection, self.shift[visible])
+
+    def emit(self, projection):
+        """Adiciona os sprites projetados à lista de renderização do `raycasting`.
+
+        Args:
+            projection (tuple): Resultado de :py:meth:`project` (``None`` não
+                adiciona sprites).
+        """
+        self.visible = 0 if projection is None else len(projection[0])
+        if not self.visible:
+            return
+        half_height = self.game.view.half_height
+        sprite_cache = self.game.object_renderer.sprite_cache
+        sprites_to_render = self.game.raycasting.sprites_to_render
+        for i, distance, sprite_x, width, height, shift in zip(*(values.tolist() for values in projection)):
+            image = sprite_cache.get(self.images[i], width, height)
+            width, height = image.get_size()
+            pos = sprite_x - width // 2, half_height - height // 2 + height * shift
+            sprites_to_render.append((distance, image, pos))
+
 class AnimatedSpriteObject(SpriteObject):
     """Objeto de animações e carregamento de seus respectivos conjuntos de dados.
     
-    Esse objeto apresenta métodos de carregamento e parsing dos dados de imagens (spritesheets)
-    em estruturas requeridas para manutenção da animação. Também, com métodos de verificação constante
-    do tempo de animação pré definido com o tickrate do jogo, esse objeto define o estado atual
-    da animação para sua renderização correta.
+    Os quadros da animação são obtidos do :py:class:`loveiswar.animation.FrameStore`
+    do jogo, carregados uma única vez por diretório e compartilhados entre todas as
+    instâncias. O quadro atual de cada instância é calculado em lote pelo
+    :py:class:`loveiswar.animation.AnimationClock` do jogo, a partir do tempo
+    decorrido e da fase da instância.
 
     Attributes:
         animation_time (int): Tempo de animação em milisegundos.
         path (str): Caminho da pasta que contém os sprites da animação.
-        images (pygame.Surface list): Sprites da animação já manipuladas para o jogo.
-        animation_time_prev (int): Tempo passado desde a inicialização do pygame até essa chamada, 
-            esse atributo é utilizado como referência para a substituição das imagens (ele é atualizado
-            a cada substituição).
-        animation_trigger (bool): Booleano para definir se a estrutura de imagens deve ser atualizada, 
-            substituindo a imagem atual da animação pela sucessora.
+        images (pygame.Surface tuple): Sprites da animação já manipuladas para o jogo,
+            compartilhadas entre as instâncias da mesma animação.
+        slot (int): Posição da animação no relógio de animação do jogo.
     """
-    def __init__(self, game, path, pos, shift, scale=1.0, animation_time=120):
-        """Chamada do construtor da classe mãe e carregamento das imagens da animação.
+    def __init__(self, game, path, pos, shift, scale=1.0, animation_time=120, phase=0):
+        """Chamada do construtor da classe mãe e registro da animação no relógio do jogo.
         
         A chamada do construtor da classe `loveiswar.sprite_object.SpriteObject` ocorre para as
         definições iniciais de sprite, assim bastando atualizar esse objeto para criar a animação.
 
         Args:
             game (loveiswar.main.Game): Obj. `Game` em execução.
-            path (str): Caminho da pasta dos sprites da animação.
+            path (str): Caminho de um dos sprites da animação (os quadros são todas as
+                imagens da mesma pasta).
             pos (float tuple): Posição de exibição da animação no mapa do jogo.
             scale (float): Escala de exibição dos sprites da animação.
             shift (float): Valor de deslocamento dos sprites na linha vertical.
+            animation_time (int): Duração de cada quadro, em milisegundos.
+            phase (int): Deslocamento (ms) da animação, para que instâncias da mesma
+                animação não fiquem sincronizadas.
         """
-        super().__init__(game, path, pos, scale, shift)
-        self.animation_time = animation_time
         self.path = path.rsplit('/', 1)[0]
-        self.images = self.get_images(self.path)
-        self.animation_time_prev = pygame.time.get_ticks()
-        self.animation_trigger = False
+        self.images = game.animation_frames.get(self.path)
+        super().__init__(game, path, pos, scale, shift, image=self.images[0])
+        self.animation_time = animation_time
+        self.slot = game.animation_clock.register(len(self.images), animation_time, phase)
+        self.animate(self.images)
+
+    @property
+    def animation_trigger(self):
+        """bool: Define se o quadro da animação mudou na última atualização do relógio."""
+        return bool(self.game.animation_clock.changed[self.slot])
 
     def update(self):
         """Chamada dos métodos necessários para a atualização da animação em cada frame.
         
-        Esse método chama o método de atualização da classe mãe `loveiswar.sprite_object.SpriteObject`,
-        que carrega sprites estáticos, e também chama o método de verificação do tempo conforme os
-        sprites da animação (sincronização sobre tickrate) e a verificação de trigger.
+        O quadro atual (já calculado pelo relógio de animação do jogo) é selecionado
+        antes da atualização da classe mãe `loveiswar.sprite_object.SpriteObject`,
+        que realiza a projeção do sprite.
         """
-        super().update()
-        self.check_animation_time()
         self.animate(self.images)
+        super().update()
         
     def animate(self, images):
-        """Reorganiza a estrutura de imagens conforme a animação.
+        """Seleciona o quadro atual da animação conforme o relógio de animação do jogo.
         
         Args:
-            images (pygame.Surface list): Lista de imagens carregadas no construtor para
-                a animação.
-        """
-        if self.animation_trigger:
-            images.rotate(-1)
-            self.image = images[0]
-        
-    def check_animation_time(self):
-        """Verifica o tempo de animação conforme o tick do jogo.
-
-        Aqui a variável `animation_trigger` é alterada com base na
-        verificação do tempo já passado em relação ao tempo de animação
-        pre estabelecido para o objeto de animação.
+            images (pygame.Surface tuple): Quadros da animação.
         """
-        self.animation_trigger = False
-        time_now = pygame.time.get_ticks()
-        if time_now - self.animation_time_prev > self.animation_time:
-            self.animation_time_prev = time_now
-            self.animation_trigger = True
+        self.image = images[self.game.animation_clock.index[self.slot]]
 
     @staticmethod
-    def get_images(path):
+    def get_images(path, loader=None):
         """Converte e adiciona todas as imagens do diretório em uma lista.
 
         Todos os arquivos de imagem no diretório são convertidos para um formato
@@ -200,17 +367,33 @@ class AnimatedSpriteObject(SpriteObject):
 
         Args:
         	path (str): Diretório de imagens a carregar.
+            loader (loveiswar.assets.AssetLoader): Caso informado, as imagens são
+                decodificadas em paralelo no `pool` do `loader`.
 
         Returns:
         	images (pygame.Surface list): Lista das imagens já convertidas para
             	formato de convenção do pygame.
         """
-        images = deque()
-        for filename in os.listdir(path):
-            if os.path.isfile(os.path.join(path, filename)):
-                img = pygame.image.load(path + '/' + filename).convert_alpha()
-                images.append(img)
-        return images
+        files = [os.path.join(path, filename) for filename in os.listdir(path)
+                 if os.path.isfile(os.path.join(path, filename))]
+        if loader is not None:
+            return deque(loader.map(load_image, files))
+        return deque(load_image(filename) for filename in files)
+
+_sheets = {}
+"""dict: Cache de `SpriteSheets` do processo, indexado pelo caminho absoluto, pela
+	conversão (`per pixel alpha` ou opaca) e pelo formato do display."""
+
+def _display_format():
+    """Formato de pixel do display em uso, do qual dependem as imagens convertidas.
+
+    Returns:
+        tuple: Bits por pixel e máscaras do display (``None`` sem display).
+    """
+    surface = pygame.display.get_surface()
+    if surface is None:
+        return None
+    return surface.get_bitsize(), surface.get_masks()
 
 class SpriteSheet:
     """Manuseio e definições básicas sobre `SpriteSheets`.
@@ -220,6 +403,12 @@ class SpriteSheet:
     conforme necessário, com uma configuração pré difinida em arquivo de metadado ou através
     dos argumento postos na construção do obj. e/ou nos métodos estáticos de carregamento.
 
+    Cada arquivo é decodificado uma única vez por processo (ver :py:meth:`load_sheet`),
+    e os sprites recortados são, por padrão, `subsurfaces` que compartilham os pixels do
+    `SpriteSheet`. Cópias só são feitas quando uma `color key` é aplicada (ou quando
+    ``view=False``), sempre no mesmo formato (opaco ou com `per pixel alpha`) do
+    `SpriteSheet`.
+
     Attributes:
         filepath (str): Caminho do arquivo de imagem `SpriteSheet`.
 
@@ -235,8 +424,13 @@ class SpriteSheet:
         self.sprites_res = sprites_res
         self.color_key = color_key
 
-    def load_sprites(self):
-        """Carrega e armazena todas imagens de sprites do `SpriteSheet`."""
+    def load_sprites(self, view=True):
+        """Carrega e armazena todas imagens de sprites do `SpriteSheet`.
+
+        Args:
+            view (bool): Sem `color key`, armazena `subsurfaces` do `SpriteSheet`
+                em vez de cópias.
+        """
         self.images = deque()
         for height_c in range(self.sheet.get_height()//self.sprites_res[1]):
             for width_c in range(self.sheet.get_width()//self.sprites_res[0]):
@@ -244,33 +438,73 @@ class SpriteSheet:
                     (width_c*self.sprites_res[0], height_c*self.sprites_res[1]), 
                     (self.sprites_res[0], self.sprites_res[1])
                 )
-                image = pygame.Surface(rect.size).convert()
-                image.blit(self.sheet, (0, 0), rect)
-                if self.color_key is not None:
-                    if self.color_key == -1:
-                        self.color_key = image.get_at((0,0))
-                    image.set_colorkey(self.color_key, pygame.RLEACCEL)
+                image, self.color_key = self.cut(self.sheet, rect, self.color_key, view)
                 self.images.append(image)
 
     @staticmethod
-    def load_sheet(filepath):
+    def cut(sheet, rect, color_key=None, view=True):
+        """Recorta um sprite de um `SpriteSheet` já carregado.
+
+        Args:
+            sheet (pygame.Surface): Imagem do `SpriteSheet`.
+            rect (pygame.Rect): Coordenadas do sprite.
+            color_key (float tuple): Cor de composição da imagem (``-1`` utiliza a
+                cor do primeiro pixel do sprite).
+            view (bool): Sem `color key`, retorna uma `subsurface` do `SpriteSheet`.
+
+        Returns:
+            tuple: Imagem recortada, no formato do `SpriteSheet`, e a `color key` utilizada.
+        """
+        image = sheet.subsurface(rect)
+        if color_key is None and view:
+            return image, None
+        # The color key needs a surface of its own; copy() keeps the sheet's format and alpha
+        image = image.copy()
+        if color_key is not None:
+            if color_key == -1:
+                color_key = image.get_at((0, 0))
+            image.set_colorkey(color_key, pygame.RLEACCEL)
+        return image, color_key
+
+    @staticmethod
+    def load_sheet(filepath, alpha=False):
         """Carrega toda a imagem do `SpriteSheet` e a retorna.
 
+        A imagem convertida é mantida em um cache do processo, de modo que cada
+        arquivo é decodificado uma única vez por formato do display (ver
+        :py:meth:`clear_cache`).
+
         Args:
             filepath (str): Caminho do `SpriteSheet`.
+            alpha (bool): Converte a imagem com `per pixel alpha`.
         Returns:
             sprite_sheet (pygame.Surface): Imagem de todo o `SpriteSheet`
         """
-        sprite_sheet = None
+        key = (os.path.abspath(filepath), alpha, _display_format())
+        sprite_sheet = _sheets.get(key)
+        if sprite_sheet is not None:
+            return sprite_sheet
         try:
-            sprite_sheet = pygame.image.load(filepath).convert()
+            sprite_sheet = pygame.image.load(filepath)
         except pygame.error as e:
             print(f"Não foi possível carregar o 'SpriteSheet' {filepath}.")
             raise SystemExit(e)
+        sprite_sheet = sprite_sheet.convert_alpha() if alpha else sprite_sheet.convert()
+        _sheets[key] = sprite_sheet
         return sprite_sheet
 
     @staticmethod
-    def get_image_from(filepath, rect, color_key=None):
+    def clear_cache():
+        """Descarta todos os `SpriteSheets` do cache do processo.
+
+        Chamado após cada ``pygame.display.set_mode`` do jogo (ver
+        :py:class:`loveiswar.main.Game`), já que as imagens convertidas para o
+        display anterior não são mais utilizadas.
+        """
+        _sheets.clear()
+
+    @staticmethod
+    def get_image_from(filepath, rect, color_key=None, view=True):
         """Carrega uma imagem específica de um `SpriteSheet` e a retorna.
         
         Args:
@@ -278,31 +512,34 @@ class SpriteSheet:
             rect (int tuple): Lista de 4 números inteiros de representação das coordenadas
                 de retirada do sprite no `SpriteSheet`.
             color_key (float tuple): Cor de composição da imagem após carregamento.
+            view (bool): Sem `color key`, retorna uma `subsurface` do `SpriteSheet`.
         Returns:
             image (pygame.Surface): Imagem recortada conforme as coordenadas.
         """
         sheet = SpriteSheet.load_sheet(filepath)
-        rect = pygame.Rect(rect)
-        image = pygame.Surface(rect.size).convert()
-        image.blit(sheet, (0, 0), rect)
-        if color_key is not None:
-            if color_key == -1:
-                color_key = image.get_at((0, 0))
-            image.set_colorkey(color_key, pygame.RLEACCEL)
-        return image
+        return SpriteSheet.cut(sheet, pygame.Rect(rect), color_key, view)[0]
 
     @staticmethod
-    def get_images_from(filepath, rects, color_key=None):
+    def get_images_from(filepath, rects, color_key=None, view=True, alpha=False):
         """Carrega várias imagens de um `SpriteSheet` e as retorna.
         
+        Por padrão, as imagens são recortadas do `SpriteSheet` opaco (como em
+        :py:meth:`get_image_from`), e a `color key`, se houver, é convertida em
+        transparência (``convert_alpha``). Com ``alpha``, são recortadas da versão
+        com `per pixel alpha` do `SpriteSheet` (convertida uma única vez).
+
         Args:
             filepath (str): Caminho do `SpriteSheet`.
             rects (2 dim. int tuple): Lista de coordenadas de retirada dos sprites.
             color_key (float tuple): Cor de composição das imagens após carregamento.
+            view (bool): Sem `color key`, retorna `subsurfaces` do `SpriteSheet`.
+            alpha (bool): Mantém a transparência (`per pixel alpha`) do arquivo.
         Returns:
             images (pygame.Surface list): Lista de imagens recortadas conforme as coordenadas.
         """
         images = deque()
+        sheet = SpriteSheet.load_sheet(filepath, alpha)
         for rect in rects:
-            images.append(SpriteSheet.get_image_from(filepath, rect, color_key).convert_alpha())
+            image = SpriteSheet.cut(sheet, pygame.Rect(rect), color_key, view)[0]
+            images.append(image.convert_alpha() if color_key is not None else image)
         return images
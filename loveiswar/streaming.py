@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Carregamento sob demanda dos blocos de um mapa em arquivo.
+
+Esse módulo apresenta a classe :py:class:`loveiswar.streaming.ChunkStreamer`,
+que mantém em memória apenas os blocos (`chunks`) recentemente utilizados de um
+:py:class:`loveiswar.mapfile.MapFile`, em um :py:class:`loveiswar.cache.LRUCache`
+limitado por bytes, e antecipa a leitura dos blocos no sentido do movimento do
+player em uma `thread` dedicada.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from loveiswar import settings
+from loveiswar.cache import LRUCache
+
+class ChunkStreamer:
+    """Blocos residentes de um plano do mapa, com leitura antecipada em segundo plano.
+
+    Attributes:
+        map_file (loveiswar.mapfile.MapFile): Arquivo do mapa.
+        plane (str): Nome do plano carregado.
+        cache (loveiswar.cache.LRUCache): Blocos residentes, indexados por ``(cx, cy)``.
+        edited (dict): Blocos alterados (ver :py:meth:`set_cell`), mantidos fora do
+            cache para que nunca sejam descartados e relidos do arquivo.
+        prefetched (int): Quantidade de blocos lidos antecipadamente.
+        stalls (int): Quantidade de blocos aguardados pela `thread` principal
+            (não residentes no momento do uso).
+        stall_time (float): Tempo total (segundos) aguardando blocos.
+    """
+    def __init__(self, map_file, plane='walls', max_bytes=settings.MAP_CACHE_BYTES):
+        """Args:
+            map_file (loveiswar.mapfile.MapFile): Arquivo do mapa.
+            plane (str): Nome do plano carregado.
+            max_bytes (int): Limite de memória dos blocos residentes.
+        """
+        self.map_file = map_file
+        self.plane = plane
+        self.cache = LRUCache(max_bytes)
+        self.edited = {}
+        self.prefetched = 0
+        self.stalls = 0
+        self.stall_time = 0.0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pool = ThreadPoolExecutor(1, thread_name_prefix='map')
+
+    def _load(self, key):
+        chunk = self.map_file.chunk(self.plane, *key)
+        with self._lock:
+            self.cache.put(key, chunk, chunk.nbytes)
+            self._pending.pop(key, None)
+        return chunk
+
+    def get(self, cx, cy):
+        """Retorna as células de um bloco, lendo-o do arquivo caso não esteja residente.
+
+        Args:
+            cx (int): Coluna do bloco.
+            cy (int): Linha do bloco.
+
+        Returns:
+            numpy.ndarray: Células ``(tamanho, tamanho)`` do bloco.
+        """
+        key = (cx, cy)
+        edited = self.edited.get(key)
+        if edited is not None:
+            return edited
+        with self._lock:
+            chunk = self.cache.get(key)
+            future = self._pending.get(key)
+        if chunk is not None:
+            return chunk
+
+        start = time.perf_counter()
+        chunk = future.result() if future is not None else self._load(key)
+        self.stalls += 1
+        self.stall_time += time.perf_counter() - start
+        return chunk
+
+    def set_cell(self, x, y, value):
+        """Altera uma célula, mantendo o bloco alterado em memória.
+
+        Args:
+            x (int): Coluna da célula no mapa.
+            y (int): Linha da célula no mapa.
+            value (int): Novo valor da célula.
+        """
+        size = self.map_file.chunk_size
+        key = (x // size, y // size)
+        chunk = self.edited.get(key)
+        if chunk is None:
+            chunk = self.edited[key] = self.get(*key).copy()
+        chunk[y % size, x % size] = value
+
+    def prefetch(self, keys):
+        """Agenda a leitura, em segundo plano, dos blocos ainda não residentes.
+
+        Args:
+            keys (tuple list): Blocos ``(cx, cy)`` a antecipar.
+
+        Returns:
+            int: Quantidade de blocos agendados.
+        """
+        scheduled = 0
+        with self._lock:
+            for key in keys:
+                if key in self.edited or key in self.cache or key in self._pending:
+                    continue
+                self._pending[key] = self._pool.submit(self._load, key)
+                scheduled += 1
+        self.prefetched += scheduled
+        return scheduled
+
+    def wait(self):
+        """Aguarda a leitura de todos os blocos agendados."""
+        with self._lock:
+            futures = list(self._pending.values())
+        for future in futures:
+            future.result()
+
+    def stats(self):
+        """Resume o uso dos blocos.
+
+        Returns:
+            dict: Blocos residentes e pendentes, bytes ocupados, contadores do
+                cache, blocos antecipados e esperas da `thread` principal.
+        """
+        with self._lock:
+            stats = self.cache.stats()
+            stats['pending'] = len(self._pending)
+        stats.update(edited=len(self.edited), prefetched=self.prefetched, stalls=self.stalls,
+                     stall_ms=self.stall_time * 1000)
+        return stats
+
+    def close(self):
+        """Encerra a `thread` de leitura e fecha o arquivo do mapa."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self.map_file.close()
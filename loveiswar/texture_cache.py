@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Cache em disco das texturas já decodificadas e escalonadas.
+
+Esse módulo apresenta a classe :py:class:`loveiswar.texture_cache.TextureCache`,
+que guarda os pixels das texturas (e dos seus `mipmaps`) prontos para uso em
+arquivos binários mapeáveis em memória. Cada arquivo é identificado pelo `hash`
+da imagem original, pela resolução alvo e pelo menor nível de `mipmap`, de modo
+que alterações nas imagens ou nas configurações invalidam o cache automaticamente.
+
+Formato do arquivo (inteiros `little-endian`)::
+
+    cabeçalho  MAGIC, quantidade de níveis (uint32)
+    por nível  largura, altura (uint32), pixels RGBA (largura * altura * 4 bytes)
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+import pygame
+
+from loveiswar import settings
+from loveiswar.cache import build_mipmaps
+
+MAGIC = b'LIWTEX01'
+"""bytes: Identificação (e versão) do formato dos arquivos do cache."""
+
+_LEVEL = struct.Struct('<II')
+
+def source_hash(path):
+    """Calcula o `hash` do conteúdo de uma imagem.
+
+    Args:
+        path (str): Caminho da imagem.
+
+    Returns:
+        str: `Hash` SHA-1 do arquivo, em hexadecimal.
+    """
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+def decode(path, res, min_size=None):
+    """Decodifica e escalona uma imagem, construindo os `mipmaps` se solicitado.
+
+    Args:
+        path (str): Caminho da imagem.
+        res (int tuple): Resolução do nível ``0``.
+        min_size (int): Menor tamanho dos `mipmaps` (``None`` para apenas o nível ``0``).
+
+    Returns:
+        `pygame.Surface` list: Níveis da textura, começando pelo nível ``0``.
+    """
+    texture = pygame.transform.scale(pygame.image.load(path).convert_alpha(), res)
+    return build_mipmaps(texture, min_size) if min_size else [texture]
+
+class TextureCache:
+    """Cache em disco de texturas prontas para uso.
+
+    Attributes:
+        directory (str): Diretório dos arquivos do cache (``None`` desativa o cache).
+        hits (int): Quantidade de texturas carregadas do cache.
+        misses (int): Quantidade de texturas decodificadas das imagens originais.
+    """
+    def __init__(self, directory=settings.TEXTURE_CACHE_DIR):
+        """Args:
+            directory (str): Diretório dos arquivos do cache.
+        """
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, path, res, min_size=None):
+        """Retorna o arquivo do cache de uma textura.
+
+        Args:
+            path (str): Caminho da imagem original.
+            res (int tuple): Resolução do nível ``0``.
+            min_size (int): Menor tamanho dos `mipmaps`.
+
+        Returns:
+            str: Caminho do arquivo do cache.
+        """
+        name = f'{source_hash(path)}_{res[0]}x{res[1]}_mip{min_size or 0}.bin'
+        return os.path.join(self.directory, name)
+
+    def load(self, path, res=settings.TEXTURE_TUPLE, min_size=None):
+        """Carrega uma textura do cache, decodificando-a (e gravando-a no cache) se necessário.
+
+        Args:
+            path (str): Caminho da imagem original.
+            res (int tuple): Resolução do nível ``0``.
+            min_size (int): Menor tamanho dos `mipmaps` (``None`` para apenas o nível ``0``).
+
+        Returns:
+            `pygame.Surface` list: Níveis da textura, começando pelo nível ``0``.
+        """
+        if not self.directory:
+            return decode(path, res, min_size)
+        cache_path = self.path_for(path, res, min_size)
+        try:
+            levels = self.read(cache_path)
+        except (OSError, ValueError):
+            levels = None
+        if levels is not None:
+            self.hits += 1
+            return levels
+
+        self.misses += 1
+        levels = decode(path, res, min_size)
+        self.write(cache_path, levels)
+        return levels
+
+    @staticmethod
+    def read(cache_path):
+        """Lê os níveis de uma textura de um arquivo do cache, mapeando-o em memória.
+
+        Args:
+            cache_path (str): Arquivo do cache.
+
+        Returns:
+            `pygame.Surface` list: Níveis da textura.
+
+        Raises:
+            OSError: Caso o arquivo não exista ou não possa ser lido.
+            ValueError: Caso o arquivo não esteja no formato esperado.
+        """
+        with open(cache_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                if view[:len(MAGIC)] != MAGIC:
+                    raise ValueError(f'Arquivo de cache inválido: {cache_path}')
+                position = len(MAGIC)
+                count, = struct.unpack_from('<I', view, position)
+                position += 4
+                levels = []
+                for _ in range(count):
+                    width, height = _LEVEL.unpack_from(view, position)
+                    position += _LEVEL.size
+                    size = width * height * 4
+                    if position + size > len(view):
+                        raise ValueError(f'Arquivo de cache truncado: {cache_path}')
+                    pixels = pygame.image.frombuffer(view[position:position + size], (width, height), 'RGBA')
+                    # convert_alpha() copies the pixels, releasing the mapping
+                    levels.append(pixels.convert_alpha())
+                    del pixels
+                    position += size
+            finally:
+                view.release()
+        return levels
+
+    @staticmethod
+    def write(cache_path, levels):
+        """Grava os níveis de uma textura em um arquivo do cache.
+
+        A gravação é feita em um arquivo temporário renomeado ao final, de modo que
+        um arquivo incompleto nunca é lido.
+
+        Args:
+            cache_path (str): Arquivo do cache.
+            levels (`pygame.Surface` list): Níveis da textura.
+        """
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        temporary = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(MAGIC + struct.pack('<I', len(levels)))
+            for level in levels:
+                f.write(_LEVEL.pack(*level.get_size()))
+                f.write(pygame.image.tobytes(level, 'RGBA'))
+        os.replace(temporary, cache_path)
+
+    def stats(self):
+        """Retorna os contadores do cache.
+
+        Returns:
+            dict: Diretório, acertos e falhas.
+        """
+        return {'directory': self.directory, 'hits': self.hits, 'misses': self.misses}
+
+def bake(textures, directory=settings.TEXTURE_CACHE_DIR):
+    """Grava no cache um conjunto de texturas, decodificando-as novamente.
+
+    Deve ser executado com um `display` inicializado (ver
+    :py:class:`loveiswar.main.Game` com ``headless=True``), pois as texturas são
+    convertidas para o formato de pixel da tela.
+
+    Args:
+        textures (tuple list): Argumentos ``(path, res, min_size)`` de
+            :py:meth:`TextureCache.load` de cada textura (ver
+            :py:meth:`loveiswar.object_renderer.ObjectRenderer.texture_assets`).
+        directory (str): Diretório dos arquivos do cache.
+
+    Returns:
+        str list: Arquivos do cache gravados.
+    """
+    cache = TextureCache(directory)
+    baked = []
+    for path, res, min_size in textures:
+        cache_path = cache.path_for(path, res, min_size)
+        cache.write(cache_path, decode(path, res, min_size))
+        baked.append(cache_path)
+    return baked
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Recursos compartilhados pelos testes.
+
+Os testes rodam sem display (driver ``dummy`` do SDL) a partir da raiz do
+repositório, onde estão os assets.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+@pytest.fixture(scope='session')
+def game():
+    """loveiswar.main.Game: Jogo sem display com os assets já carregados."""
+    from loveiswar.main import Game
+    os.chdir(ROOT)
+    game = Game(headless=True)
+    game.assets.wait()
+    return game
+
+@pytest.fixture
+def rng():
+    """numpy.random.Generator: Gerador com semente fixa."""
+    return np.random.default_rng(2024)
+
+def free_poses(grid, rng, count):
+    """Sorteia poses ``(x, y, angle)`` dentro de células vazias da grade.
+
+    Args:
+        grid (numpy.ndarray): Grade ``(linhas, colunas)`` do mapa.
+        rng (numpy.random.Generator): Gerador de números aleatórios.
+        count (int): Quantidade de poses.
+
+    Returns:
+        tuple list: Poses sorteadas.
+    """
+    ys, xs = np.nonzero(grid == 0)
+    cells = rng.integers(0, len(xs), count)
+    return [(xs[i] + rng.uniform(0.05, 0.95), ys[i] + rng.uniform(0.05, 0.95), rng.uniform(0, 2 * np.pi))
+            for i in cells]
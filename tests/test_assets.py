@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Carregamento dos `assets` em segundo plano."""
+
+import time
+
+import pygame
+
+from loveiswar import settings
+
+def test_poll_replaces_placeholders(game, monkeypatch):
+    from loveiswar.main import Game
+    monkeypatch.setattr(settings, 'ASSET_ASYNC', True)
+    async_game = Game(headless=True)
+    try:
+        renderer = async_game.object_renderer
+        placeholders = dict(renderer.wall_textures)
+        deadline = time.perf_counter() + 30
+        while async_game.assets.ready_time is None:
+            assert time.perf_counter() < deadline, 'assets não carregados'
+            async_game.assets.poll()
+            time.sleep(0.01)
+
+        report = async_game.assets.report()
+        assert report['loaded'] == report['total'] > 0 and report['ready_ms'] is not None
+        walls = renderer.texture_assets()[:-1]
+        assert renderer.column_cache.generation == len(walls)
+        for texture, (path, res, min_size) in enumerate(walls, 1):
+            assert path in report['timings']
+            surface = renderer.wall_textures[texture]
+            assert surface is not placeholders[texture]
+            assert surface is renderer.wall_mipmaps[texture][0]
+            expected = game.object_renderer.wall_textures[texture]
+            assert pygame.image.tobytes(surface, 'RGB') == pygame.image.tobytes(expected, 'RGB')
+            # The column cache slices the delivered texture, not the placeholder
+            assert renderer.column_cache.columns[texture][0][0].get_parent() is surface
+    finally:
+        async_game.assets.close()
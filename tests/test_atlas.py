@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Empacotamento de retângulos em atlas."""
+
+import numpy as np
+import pytest
+
+from loveiswar.atlas import shelf_pack
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('padding', [0, 1, 3])
+def test_shelf_pack_no_overlap_within_bounds(seed, padding):
+    rng = np.random.default_rng(seed)
+    max_size = int(rng.choice([64, 128, 256]))
+    limit = int(rng.choice([max_size // 4, max_size]))
+    sizes = [tuple(int(v) for v in rng.integers(1, limit + 1, 2)) for _ in range(rng.integers(1, 120))]
+    placements, atlases = shelf_pack(sizes, max_size, padding)
+
+    assert len(placements) == len(sizes)
+    rects = {}
+    for (atlas, x, y), (width, height) in zip(placements, sizes):
+        assert 0 <= atlas < len(atlases)
+        assert x >= 0 and y >= 0
+        assert x + width <= atlases[atlas][0] <= max_size
+        assert y + height <= atlases[atlas][1] <= max_size
+        rects.setdefault(atlas, []).append((x, y, width, height))
+    for placed in rects.values():
+        for i, (x, y, w, h) in enumerate(placed):
+            for x2, y2, w2, h2 in placed[i + 1:]:
+                # Rectangles keep at least 'padding' pixels between them
+                assert (x + w + padding <= x2 or x2 + w2 + padding <= x
+                        or y + h + padding <= y2 or y2 + h2 + padding <= y)
+
+def test_shelf_pack_opens_new_atlas():
+    placements, atlases = shelf_pack([(64, 64)] * 5, 128, 0)
+    assert len(atlases) == 2 and atlases[0] == (128, 128)
+    assert sorted(placements)[-1] == (1, 0, 0)
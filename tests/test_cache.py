@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Caches limitados por memória."""
+
+import gc
+
+import pygame
+
+from loveiswar.cache import LRUCache, SpriteScaleCache, surface_bytes
+
+def test_lru_evicts_least_recent_by_bytes():
+    cache = LRUCache(100)
+    cache.put('a', 1, 40)
+    cache.put('b', 2, 40)
+    assert cache.get('a') == 1
+    # 'b' is now the least recently used entry
+    cache.put('c', 3, 40)
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert cache.size == 80 and cache.evictions == 1
+
+    cache.put('a', 4, 90)
+    assert cache.get('a') == 4 and 'c' not in cache
+    assert cache.size == 90 <= cache.max_bytes
+    assert cache.get('b') is None
+    assert cache.stats() == {'entries': 1, 'bytes': 90, 'max_bytes': 100, 'hits': 2, 'misses': 1,
+                             'evictions': 2, 'hit_rate': 2 / 3}
+
+def test_lru_keeps_single_oversized_entry():
+    cache = LRUCache(10)
+    cache.put('a', 1, 5)
+    cache.put('b', 2, 50)
+    assert len(cache) == 1 and cache.get('b') == 2 and cache.size == 50
+
+def test_sprite_cache_is_bounded_and_does_not_pin_images():
+    image = pygame.Surface((256, 256))
+    scaled = SpriteScaleCache(max_bytes=64 * 1024, quant=1).get(image, 20, 20)
+    assert scaled.get_size() == (20, 20)
+
+    cache = SpriteScaleCache(max_bytes=512 * 1024, quant=1)
+    for size in range(8, 256, 8):
+        cache.get(image, size, size)
+        assert cache.cache.size <= cache.cache.max_bytes
+    assert cache.cache.evictions > 0
+
+    images = [pygame.Surface((128, 128)) for _ in range(4)]
+    for surface in images:
+        cache.get(surface, 30, 30)
+    tokens = [cache.token(surface) for surface in images]
+    assert len(set(tokens)) == len(tokens)
+    del images, surface
+    gc.collect()
+    # Dropped images free their numbers, which are never handed out again
+    assert cache.token(pygame.Surface((128, 128))) > max(tokens)
+    assert surface_bytes(image) == 256 * 256 * image.get_bytesize()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Ambiente em lote."""
+
+import numpy as np
+
+from loveiswar.env import ACTIONS, BatchEnv, load_grid
+from conftest import free_poses
+
+def test_workers_match_local(rng):
+    grid = load_grid()
+    count = 7
+    poses = np.array(free_poses(grid, rng, count))
+    local = BatchEnv(count, rays=48, workers=0, grid=grid)
+    pooled = BatchEnv(count, rays=48, workers=3, grid=grid)
+    try:
+        observations = local.reset(poses), pooled.reset(poses)
+        for step in range(30):
+            for key in ('pose', 'depth', 'texture'):
+                np.testing.assert_array_equal(observations[0][key], observations[1][key],
+                                              err_msg=f'{key} no passo {step}')
+            actions = np.zeros((count, len(ACTIONS)))
+            actions[:, :4] = rng.integers(0, 2, (count, 4))
+            actions[:, 4] = rng.uniform(-40, 40, count)
+            observations = local.step(actions)[0], pooled.step(actions)[0]
+        assert not np.array_equal(observations[0]['pose'], poses)
+    finally:
+        local.close()
+        pooled.close()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Gravação e leitura de mapas em blocos."""
+
+import numpy as np
+import pytest
+
+from loveiswar import mapfile
+from loveiswar.mapfile import MapFile
+from loveiswar.streaming import ChunkStreamer
+
+def test_round_trip_by_chunks(tmp_path, rng):
+    # Neither side is a multiple of the chunk size, so the edge chunks are padded
+    walls = rng.integers(0, 6, (70, 45)).astype(np.uint8)
+    floor = rng.integers(0, 1000, (70, 45)).astype(np.uint16)
+    path = str(tmp_path / 'mapa.liw')
+    mapfile.write(path, {'walls': walls, 'floor': floor}, chunk_size=16)
+
+    map_file = MapFile(path)
+    streamer = ChunkStreamer(map_file, max_bytes=4 * 16 * 16)
+    try:
+        assert (map_file.width, map_file.height, map_file.chunk_size) == (45, 70, 16)
+        assert (map_file.chunks_x, map_file.chunks_y) == (3, 5)
+        streamer.prefetch([(cx, 0) for cx in range(map_file.chunks_x)])
+        streamer.wait()
+
+        grid = np.zeros((map_file.chunks_y * 16, map_file.chunks_x * 16), np.uint8)
+        for cy in range(map_file.chunks_y):
+            for cx in range(map_file.chunks_x):
+                grid[cy * 16:(cy + 1) * 16, cx * 16:(cx + 1) * 16] = streamer.get(cx, cy)
+                np.testing.assert_array_equal(
+                    map_file.chunk('floor', cx, cy)[:70 - cy * 16, :45 - cx * 16],
+                    floor[cy * 16:(cy + 1) * 16, cx * 16:(cx + 1) * 16])
+        np.testing.assert_array_equal(grid[:70, :45], walls)
+        assert not grid[70:].any() and not grid[:, 45:].any()
+        # Chunks outside the map are empty
+        assert not streamer.get(-1, 0).any() and not streamer.get(3, 5).any()
+        assert streamer.stats()['evictions'] > 0
+    finally:
+        streamer.close()
+        map_file.close()
+
+def test_rejects_invalid_file(tmp_path):
+    path = tmp_path / 'invalido.liw'
+    path.write_bytes(b'NOTAMAP!' + bytes(64))
+    with pytest.raises(ValueError):
+        MapFile(str(path))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""`Raycasting` paralelo em faixas."""
+
+import numpy as np
+import pytest
+
+from loveiswar import settings
+from loveiswar.parallel import ParallelRayCaster, split_bands
+from loveiswar.raycasting import cast_rays
+from conftest import free_poses
+
+@pytest.mark.parametrize('rays', [1, 2, 7, 64, 321, 1600])
+@pytest.mark.parametrize('workers', [1, 2, 3, 8, 16])
+def test_split_bands_covers_every_ray(rays, workers):
+    bands = split_bands(rays, workers)
+    assert len(bands) == min(rays, workers)
+    assert bands[0][0] == 0 and bands[-1][1] == rays
+    for (_, stop), (start, _) in zip(bands, bands[1:]):
+        assert stop == start
+    sizes = [stop - start for start, stop in bands]
+    assert min(sizes) >= 1 and max(sizes) - min(sizes) <= 1
+
+@pytest.mark.parametrize('mode', ['thread', 'process'])
+def test_parallel_matches_numpy(game, rng, mode):
+    grid = game.map.grid.copy()
+    caster = ParallelRayCaster(grid, workers=3, mode=mode, rays=settings.WIDTH)
+    try:
+        for i, (x, y, angle) in enumerate(free_poses(grid, rng, 12)):
+            rays = (settings.NUM_RAYS, settings.WIDTH, 37)[i % 3]
+            ray_angles = angle - settings.HALF_FOV + np.arange(rays) * settings.FOV / rays
+            if i == 6:
+                # An edit must reach the workers through a new version
+                cell = free_poses(grid, rng, 1)[0]
+                grid[int(cell[1]), int(cell[0])] = 2
+            for expected, values in zip(cast_rays(grid, x, y, ray_angles),
+                                        caster.cast(grid, x, y, ray_angles, i >= 6)):
+                np.testing.assert_array_equal(values, expected)
+        if mode == 'process':
+            assert caster.uploads == 2
+            with pytest.raises(ValueError):
+                caster.cast(grid, x, y, np.zeros(settings.WIDTH + 1))
+    finally:
+        caster.close()
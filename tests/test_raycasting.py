@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# Copyright (c) MIT
+# Lucas Zunho <lucaszunho17@gmail.com>
+"""Equivalência dos backends de `raycasting`."""
+
+import numpy as np
+
+from loveiswar import settings
+from loveiswar.raycasting import cast_rays
+from conftest import free_poses
+
+def test_numpy_matches_loop(game, rng):
+    raycasting = game.raycasting
+    raycasting.reuse = False
+    for x, y, angle in free_poses(game.map.grid, rng, 50):
+        game.player.x, game.player.y, game.player.angle = x, y, angle
+        raycasting.ray_cast_loop()
+        loop = np.array(raycasting.ray_casting_result)
+        raycasting.ray_cast_numpy()
+        vectorized = np.array(raycasting.ray_casting_result)
+
+        assert loop.shape == vectorized.shape == (game.view.num_rays, 4)
+        np.testing.assert_array_equal(loop[:, 2], vectorized[:, 2])
+        np.testing.assert_allclose(loop[:, [0, 1, 3]], vectorized[:, [0, 1, 3]], rtol=1e-6, atol=1e-6)
+
+def test_cast_rays_per_ray_origins(game, rng):
+    grid = game.map.grid
+    poses = free_poses(grid, rng, 4)
+    ray_angles = -settings.HALF_FOV + np.arange(32) * settings.DELTA_ANGLE
+    ox = np.repeat([x for x, _, _ in poses], len(ray_angles))
+    oy = np.repeat([y for _, y, _ in poses], len(ray_angles))
+    angles = np.concatenate([angle + ray_angles for _, _, angle in poses])
+
+    batched = cast_rays(grid, ox, oy, angles)
+    for i, (x, y, angle) in enumerate(poses):
+        band = slice(i * len(ray_angles), (i + 1) * len(ray_angles))
+        for values, single in zip(batched, cast_rays(grid, x, y, angle + ray_angles)):
+            np.testing.assert_array_equal(values[band], single)